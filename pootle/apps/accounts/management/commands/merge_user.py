@@ -32,11 +32,24 @@ class Command(UserCommand):
             default=True,
             help="Don't delete user after merging.",
         )
+        parser.add_argument(
+            "--background",
+            action="store_true",
+            default=False,
+            help="Merge user in a background job.",
+        )
 
     def handle(self, **options):
         src_user = self.get_user(username=options['user'][0])
-        utils.UserMerger(src_user,
-                         self.get_user(username=options['other_user'][0])).merge()
+        target_user = self.get_user(username=options['other_user'][0])
+        if options["background"]:
+            job = utils.queue_user_merge(
+                src_user, target_user, delete=options["delete"])
+            self.stdout.write(
+                "Queued merging user: %s --> %s (job %s)\n"
+                % (src_user.username, target_user.username, job.id))
+            return
+        utils.UserMerger(src_user, target_user).merge()
 
         if options["delete"]:
             self.stdout.write("Deleting user: %s...\n" % src_user.username)
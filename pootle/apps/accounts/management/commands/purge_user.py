@@ -7,11 +7,28 @@
 # AUTHORS file for copyright and authorship information.
 
 from . import UserCommand
+from ... import utils
 
 
 class Command(UserCommand):
     help = "Delete user and all related objects"
 
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            "--background",
+            action="store_true",
+            default=False,
+            help="Purge users in background jobs.",
+        )
+
     def handle(self, **options):
         for user in options['user']:
-            self.get_user(user).delete(purge=True)
+            user = self.get_user(user)
+            if options["background"]:
+                job = utils.queue_user_deletion(user, purge=True)
+                self.stdout.write(
+                    "Queued purging user: %s (job %s)\n"
+                    % (user.username, job.id))
+                continue
+            user.delete(purge=True)
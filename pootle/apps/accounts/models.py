@@ -158,11 +158,15 @@ class User(AbstractBaseUser):
             raise ProtectedError('Cannot remove meta user instances', None)
 
         purge = kwargs.pop("purge", False)
+        progress = kwargs.pop("progress", None)
 
         if purge:
-            UserPurger(self).purge()
+            UserPurger(self, progress=progress).purge()
         else:
-            UserMerger(self, User.objects.get_nobody_user()).merge()
+            UserMerger(
+                self,
+                User.objects.get_nobody_user(),
+                progress=progress).merge()
 
         super(User, self).delete(*args, **kwargs)
 
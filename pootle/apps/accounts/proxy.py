@@ -29,10 +29,8 @@ class DisplayUser(object):
 
     @property
     def display_name(self):
-        return (
-            self.full_name.strip()
-            if self.full_name.strip()
-            else self.username)
+        full_name = (self.full_name or "").strip()
+        return full_name or self.username
 
     @property
     def email_hash(self):
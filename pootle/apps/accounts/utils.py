@@ -13,18 +13,23 @@ import sys
 from django.contrib.auth import get_user_model
 from django.core.validators import ValidationError, validate_email
 from django.db.models import Count
+from django_rq.queues import get_queue
+from rq import get_current_job
 
 from allauth.account.models import EmailAddress
 from allauth.account.utils import sync_user_email_addresses
+from bulk_update.helper import bulk_update
 
-from pootle.core.contextmanagers import keep_data
+from pootle.core.contextmanagers import keep_data, replica_scope
 from pootle.core.delegate import score_updater
 from pootle.core.models import Revision
-from pootle.core.signals import update_data, update_revisions
+from pootle.core.signals import update_data, update_revisions, update_scores
+from pootle.core.utils.db import useable_connection
 from pootle_app.models import Directory
-from pootle_statistics.models import SubmissionFields
-from pootle_store.constants import FUZZY, UNTRANSLATED
-from pootle_store.models import SuggestionState
+from pootle_statistics.models import Submission
+from pootle_store.constants import UNTRANSLATED
+from pootle_store.models import (
+    Store, Suggestion, SuggestionState, Unit, UnitChange)
 
 
 logger = logging.getLogger(__name__)
@@ -71,14 +76,21 @@ def write_stdout(start_msg, end_msg="DONE\n", fail_msg="FAILED\n"):
 
 class UserMerger(object):
 
-    def __init__(self, src_user, target_user):
+    def __init__(self, src_user, target_user, progress=None):
         """Purges src_user from site reverting any changes that they have made.
 
         :param src_user: `User` instance to merge from.
         :param target_user: `User` instance to merge to.
+        :param progress: optional callable, called with the name of each
+            step as the merge reaches it.
         """
         self.src_user = src_user
         self.target_user = target_user
+        self.progress = progress
+
+    def update_progress(self, stage):
+        if self.progress is not None:
+            self.progress(stage)
 
     @write_stdout("Merging user: "
                   "%(src_user)s --> %(target_user)s...\n",
@@ -91,12 +103,16 @@ class UserMerger(object):
         - submissions: submitter
         - suggestions: user, reviewer
         """
-        self.merge_submitted()
-        self.merge_commented()
-        self.merge_reviewed()
-        self.merge_submissions()
-        self.merge_suggestions()
-        self.merge_reviews()
+        steps = (
+            ("submitted", self.merge_submitted),
+            ("commented", self.merge_commented),
+            ("reviewed", self.merge_reviewed),
+            ("submissions", self.merge_submissions),
+            ("suggestions", self.merge_suggestions),
+            ("reviews", self.merge_reviews))
+        for stage, merge in steps:
+            self.update_progress(stage)
+            merge()
 
     @write_stdout(" * Merging units comments: "
                   "%(src_user)s --> %(target_user)s... ")
@@ -152,12 +168,21 @@ class UserMerger(object):
 
 class UserPurger(object):
 
-    def __init__(self, user):
+    batch_size = 500
+
+    def __init__(self, user, progress=None):
         """Purges user from site reverting any changes that they have made.
 
         :param user: `User` to purge.
+        :param progress: optional callable, called with the name of each
+            step as the purge reaches it.
         """
         self.user = user
+        self.progress = progress
+
+    def update_progress(self, stage):
+        if self.progress is not None:
+            self.progress(stage)
 
     @write_stdout("Purging user: %(user)s... \n", "User purged: %(user)s \n")
     def purge(self):
@@ -170,16 +195,19 @@ class UserPurger(object):
         - Revert unit comments by user.
         - Revert unit state changes by user.
         - Delete any remaining submissions and suggestions.
-        - Expire caches for relevant directories
+        - Update data, scores and revisions for the affected stores
         """
-
-        stores = set()
+        steps = (
+            ("units_created", self.remove_units_created),
+            ("units_edited", self.revert_units_edited),
+            ("units_reviewed", self.revert_units_reviewed),
+            ("units_commented", self.revert_units_commented),
+            ("units_state_changed", self.revert_units_state_changed))
+        store_ids = set()
         with keep_data():
-            stores |= self.remove_units_created()
-            stores |= self.revert_units_edited()
-            stores |= self.revert_units_reviewed()
-            stores |= self.revert_units_commented()
-            stores |= self.revert_units_state_changed()
+            for stage, revert in steps:
+                self.update_progress(stage)
+                store_ids |= revert()
 
             # Delete remaining submissions.
             logger.debug("Deleting remaining submissions for: %s", self.user)
@@ -188,200 +216,321 @@ class UserPurger(object):
             # Delete remaining suggestions.
             logger.debug("Deleting remaining suggestions for: %s", self.user)
             self.user.suggestions.all().delete()
-        for store in stores:
+        self.update_progress("updating_stores")
+        self.update_stores(store_ids)
+
+    def update_stores(self, store_ids):
+        """Update data and scores once for each of the stores affected by
+        the purge, and expire the revisions of their directories.
+        """
+        stores = Store.objects.filter(
+            id__in=store_ids).select_related("parent")
+        parents = set()
+        for store in stores.iterator():
+            parents.add(store.parent_id)
             update_data.send(store.__class__, instance=store)
+            update_scores.send(store.__class__, instance=store)
         update_revisions.send(
             Directory,
-            object_list=Directory.objects.filter(
-                id__in=set(store.parent.id for store in stores)))
+            object_list=Directory.objects.filter(id__in=parents))
+
+    def bulk_update(self, objects, fields):
+        if objects:
+            bulk_update(
+                objects,
+                update_fields=fields,
+                batch_size=self.batch_size)
+
+    def latest_by_unit(self, submissions, fields, order_by=("pk", )):
+        """Map unit ids to the `fields` of the latest of `submissions` on
+        each unit that was made by another user.
+        """
+        latest = {}
+        submissions = (
+            submissions.exclude(submitter=self.user)
+                       .order_by("unit_id", *order_by)
+                       .values_list("unit_id", *fields))
+        for submission in submissions.iterator():
+            latest[submission[0]] = submission[1:]
+        return latest
 
     @write_stdout(" * Removing units created by: %(user)s... ")
     def remove_units_created(self):
         """Remove units created by user that have not had further
         activity.
         """
-
-        stores = set()
+        units = self.user.get_units_created()
+        store_ids = set(
+            units.order_by().values_list("store_id", flat=True).distinct())
         # Delete units created by user without submissions by others.
-        for unit in self.user.get_units_created().iterator():
-            stores.add(unit.store)
-            # Find submissions by other users on this unit.
-            other_subs = unit.submission_set.exclude(submitter=self.user)
-
-            if not other_subs.exists():
-                unit.delete()
-                logger.debug("Unit deleted: %s", repr(unit))
-        return stores
+        other_subs = Submission.objects.filter(
+            unit__unit_source__created_by=self.user).exclude(
+                submitter=self.user)
+        deleted, __ = units.exclude(
+            id__in=other_subs.values("unit_id")).delete()
+        logger.debug("Units deleted: %s", deleted)
+        return store_ids
 
     @write_stdout(" * Reverting unit comments by: %(user)s... ")
     def revert_units_commented(self):
         """Revert comments made by user on units to previous comment or else
         just remove the comment.
         """
-        stores = set()
         # Revert unit comments where self.user is latest commenter.
-        for unit_change in self.user.commented.select_related("unit").iterator():
-            unit = unit_change.unit
-            stores.add(unit.store)
-
-            # Find comments by other self.users
-            comments = unit.get_comments().exclude(submitter=self.user)
-            change = {}
-            if comments.exists():
-                # If there are previous comments by others update the
-                # translator_comment, commented_by, and commented_on
-                last_comment = comments.latest('pk')
-                translator_comment = last_comment.new_value
-                change["commented_by_id"] = last_comment.submitter_id
-                change["commented_on"] = last_comment.creation_time
-                logger.debug("Unit comment reverted: %s", repr(unit))
-            else:
-                translator_comment = ""
-                change["commented_by"] = None
-                change["commented_on"] = None
-                logger.debug("Unit comment removed: %s", repr(unit))
-            unit_change.__class__.objects.filter(id=unit_change.id).update(
-                **change)
-            unit.__class__.objects.filter(id=unit.id).update(
-                translator_comment=translator_comment,
-                revision=Revision.incr())
-        return stores
+        changes = self.user.commented.values_list(
+            "id", "unit_id", "unit__store_id")
+        comments = self.latest_by_unit(
+            Submission.objects.get_unit_comments().filter(
+                unit__change__commented_by=self.user),
+            ("new_value", "submitter_id", "creation_time"))
+        revision = Revision.incr()
+        store_ids = set()
+        unit_changes = []
+        units = []
+        for change_id, unit_id, store_id in changes.iterator():
+            store_ids.add(store_id)
+            # If there are previous comments by others update the
+            # translator_comment, commented_by, and commented_on
+            comment, commented_by, commented_on = comments.get(
+                unit_id, ("", None, None))
+            unit_changes.append(
+                UnitChange(
+                    id=change_id,
+                    commented_by_id=commented_by,
+                    commented_on=commented_on))
+            units.append(
+                Unit(
+                    id=unit_id,
+                    translator_comment=comment,
+                    revision=revision))
+        self.bulk_update(unit_changes, ["commented_by", "commented_on"])
+        self.bulk_update(units, ["translator_comment", "revision"])
+        logger.debug("Unit comments reverted: %s", len(units))
+        return store_ids
 
     @write_stdout(" * Reverting units edited by: %(user)s... ")
     def revert_units_edited(self):
         """Revert unit edits made by a user to previous edit.
         """
-        stores = set()
         # Revert unit target where user is the last submitter.
-        for unit_change in self.user.submitted.select_related("unit").iterator():
-            unit = unit_change.unit
-            stores.add(unit.store)
-
-            # Find the last submission by different user that updated the
-            # unit.target.
-            edits = unit.get_edits().exclude(submitter=self.user)
-            updates = {}
-            unit_updates = {}
-            if edits.exists():
-                last_edit = edits.latest("pk")
-                unit_updates["target_f"] = last_edit.new_value
-                updates["submitted_by_id"] = last_edit.submitter_id
-                updates["submitted_on"] = last_edit.creation_time
-                logger.debug("Unit edit reverted: %s", repr(unit))
-            else:
-                # if there is no previous submissions set the target to "" and
-                # set the unit.change.submitted_by to None
-                unit_updates["target_f"] = ""
-                updates["submitted_by"] = None
-                updates["submitted_on"] = unit.creation_time
-                logger.debug("Unit edit removed: %s", repr(unit))
-
-            # Increment revision
-            unit_change.__class__.objects.filter(id=unit_change.id).update(
-                **updates)
-            unit.__class__.objects.filter(id=unit.id).update(
-                revision=Revision.incr(),
-                **unit_updates)
-        return stores
+        changes = self.user.submitted.values_list(
+            "id", "unit_id", "unit__store_id", "unit__creation_time")
+        # Find the last submission by different user that updated the
+        # unit.target.
+        edits = self.latest_by_unit(
+            Submission.objects.get_unit_edits().filter(
+                unit__change__submitted_by=self.user),
+            ("new_value", "submitter_id", "creation_time"))
+        revision = Revision.incr()
+        store_ids = set()
+        unit_changes = []
+        units = []
+        for change_id, unit_id, store_id, created in changes.iterator():
+            store_ids.add(store_id)
+            # if there is no previous submissions set the target to "" and
+            # set the unit.change.submitted_by to None
+            target, submitted_by, submitted_on = edits.get(
+                unit_id, ("", None, created))
+            unit_changes.append(
+                UnitChange(
+                    id=change_id,
+                    submitted_by_id=submitted_by,
+                    submitted_on=submitted_on))
+            units.append(
+                Unit(
+                    id=unit_id,
+                    target_f=target,
+                    revision=revision))
+        self.bulk_update(unit_changes, ["submitted_by", "submitted_on"])
+        self.bulk_update(units, ["target_f", "revision"])
+        logger.debug("Unit edits reverted: %s", len(units))
+        return store_ids
 
     @write_stdout(" * Reverting units reviewed by: %(user)s... ")
     def revert_units_reviewed(self):
         """Revert reviews made by user on suggestions to previous state.
         """
-
-        stores = set()
         pending = SuggestionState.objects.get(name="pending")
 
         # Revert reviews by this user.
-        for review in self.user.get_suggestion_reviews().iterator():
-            suggestion = review.suggestion
-            stores.add(suggestion.unit.store)
-            if suggestion.user_id == self.user.id:
-                # If the suggestion was also created by this user then remove
-                # both review and suggestion.
-                suggestion.delete()
-                logger.debug("Suggestion removed: %s", (suggestion))
-            elif suggestion.reviewer_id == self.user.id:
-                # If the suggestion is showing as reviewed by the user, then
-                # set the suggestion back to pending and update
-                # reviewer/review_time.
-                suggestion.state = pending
-                suggestion.reviewer = None
-                suggestion.review_time = None
-                suggestion.save()
-                logger.debug("Suggestion reverted: %s", (suggestion))
-
-            # Remove the review.
-            review.delete()
-
-        for unit_change in self.user.reviewed.select_related("unit").iterator():
-            unit = unit_change.unit
-            stores.add(unit.store)
-            unit.suggestion_set.filter(reviewer=self.user).update(
-                state=SuggestionState.objects.get(name="pending"),
-                reviewer=None)
-            unit_updates = {}
-            updates = {}
-            if not unit.target:
-                unit_updates["state"] = UNTRANSLATED
-                updates["reviewed_by"] = None
-                updates["reviewed_on"] = None
+        reviews = self.user.get_suggestion_reviews()
+        store_ids = set(
+            reviews.order_by().values_list(
+                "suggestion__unit__store_id", flat=True).distinct())
+        reviewed = Suggestion.objects.filter(
+            id__in=reviews.values("suggestion_id"))
+        # If the suggestion is showing as reviewed by the user, then
+        # set the suggestion back to pending and update
+        # reviewer/review_time.
+        reviewed.exclude(user=self.user).filter(reviewer=self.user).update(
+            state=pending,
+            reviewer=None,
+            review_time=None)
+        # If the suggestion was also created by this user then remove
+        # both review and suggestion.
+        reviewed.filter(user=self.user).delete()
+        # Remove the reviews.
+        self.user.get_suggestion_reviews().delete()
+
+        Suggestion.objects.filter(
+            unit__change__reviewed_by=self.user,
+            reviewer=self.user).update(state=pending, reviewer=None)
+        changes = self.user.reviewed.values_list(
+            "id", "unit_id", "unit__store_id", "unit__target_f")
+        state_subs = self.latest_by_unit(
+            Submission.objects.get_unit_state_changes().filter(
+                unit__change__reviewed_by=self.user),
+            ("new_value", "submitter_id", "creation_time"),
+            order_by=("creation_time", "pk"))
+        revision = Revision.incr()
+        unit_changes = []
+        units = []
+        units_state = []
+        for change_id, unit_id, store_id, target in changes.iterator():
+            store_ids.add(store_id)
+            if not target:
+                state, reviewed_by, reviewed_on = UNTRANSLATED, None, None
+            elif unit_id in state_subs:
+                state, reviewed_by, reviewed_on = state_subs[unit_id]
             else:
-                old_state_sub = unit.submission_set.exclude(
-                    submitter=self.user).filter(
-                        field=SubmissionFields.STATE).order_by(
-                            "-creation_time", "-pk").first()
-                if old_state_sub:
-                    unit_updates["state"] = old_state_sub.new_value
-                    updates["reviewed_by"] = old_state_sub.submitter
-                    updates["reviewed_on"] = old_state_sub.creation_time
-            logger.debug("Unit reviewed_by removed: %s", repr(unit))
-            unit_change.__class__.objects.filter(id=unit_change.id).update(
-                **updates)
-            # Increment revision
-            unit.__class__.objects.filter(id=unit.id).update(
-                revision=Revision.incr(),
-                **unit_updates)
-        return stores
+                units.append(Unit(id=unit_id, revision=revision))
+                continue
+            unit_changes.append(
+                UnitChange(
+                    id=change_id,
+                    reviewed_by_id=reviewed_by,
+                    reviewed_on=reviewed_on))
+            units_state.append(
+                Unit(id=unit_id, state=int(state), revision=revision))
+        self.bulk_update(unit_changes, ["reviewed_by", "reviewed_on"])
+        self.bulk_update(units, ["revision"])
+        self.bulk_update(units_state, ["state", "revision"])
+        logger.debug(
+            "Unit reviewed_by removed: %s", len(units) + len(units_state))
+        return store_ids
 
     @write_stdout(" * Reverting unit state changes by: %(user)s... ")
     def revert_units_state_changed(self):
-        """Revert unit edits made by a user to previous edit.
+        """Revert unit state changes made by a user to the previous state.
         """
-        stores = set()
         # Delete orphaned submissions.
         self.user.submission_set.filter(unit__isnull=True).delete()
 
-        for submission in self.user.get_unit_states_changed().iterator():
-            unit = submission.unit
-            stores.add(unit.store)
-
-            # We have to get latest by pk as on mysql precision is not to
-            # microseconds - so creation_time can be ambiguous
-            if submission != unit.get_state_changes().latest('pk'):
-                # If the unit has been changed more recently we don't need to
-                # revert the unit state.
-                submission.delete()
-                return
-            submission.delete()
-            other_submissions = (unit.get_state_changes()
-                                     .exclude(submitter=self.user))
-            if other_submissions.exists():
-                new_state = other_submissions.latest('pk').new_value
-            else:
-                new_state = UNTRANSLATED
-            if new_state != unit.state:
-                if unit.state == FUZZY:
-                    unit.markfuzzy(False)
-                elif new_state == FUZZY:
-                    unit.markfuzzy(True)
-                unit.state = new_state
-
-                # Increment revision
-                unit.__class__.objects.filter(id=unit.id).update(
-                    revision=Revision.incr())
-                logger.debug("Unit state reverted: %s", repr(unit))
-        return stores
+        state_changes = self.user.get_unit_states_changed()
+        store_ids = set(
+            state_changes.order_by().values_list(
+                "unit__store_id", flat=True).distinct())
+        # We have to get latest by pk as on mysql precision is not to
+        # microseconds - so creation_time can be ambiguous
+        all_changes = (
+            Submission.objects.get_unit_state_changes()
+                              .filter(unit_id__in=state_changes.values(
+                                  "unit_id"))
+                              .order_by("unit_id", "pk")
+                              .values_list(
+                                  "unit_id", "submitter_id", "new_value",
+                                  "unit__state"))
+        latest = {}
+        for unit_id, submitter_id, new_value, state in all_changes.iterator():
+            last_submitter, new_state, state = latest.get(
+                unit_id, (None, UNTRANSLATED, state))
+            if submitter_id != self.user.id:
+                new_state = int(new_value)
+            latest[unit_id] = (submitter_id, new_state, state)
+        state_changes.delete()
+
+        # If the unit has been changed more recently by another user we
+        # don't need to revert the unit state.
+        revision = Revision.incr()
+        units = [
+            Unit(id=unit_id, state=new_state, revision=revision)
+            for unit_id, (last_submitter, new_state, state)
+            in latest.items()
+            if (last_submitter == self.user.id
+                and new_state != state)]
+        self.bulk_update(units, ["state", "revision"])
+        logger.debug("Unit states reverted: %s", len(units))
+        return store_ids
+
+
+def _job_progress():
+    job = get_current_job()
+
+    def progress(stage, **kwargs):
+        if job is None:
+            return
+        job.meta.update(kwargs)
+        job.meta["stage"] = stage
+        job.save_meta()
+    return progress
+
+
+def delete_user(user_id, purge=False):
+    """Delete the user `user_id`, purging or merging their changes and
+    recording the progress in the job meta.
+
+    Runs as an RQ job. Errors are recorded in the job meta before being
+    raised again, so that the job itself fails.
+    """
+    progress = _job_progress()
+    try:
+        with replica_scope(), useable_connection():
+            get_user_model().objects.get(pk=user_id).delete(
+                purge=purge,
+                progress=progress)
+    except Exception as e:
+        logger.error("Error deleting user '%s': %s", user_id, e)
+        progress("failed", error=unicode(e))
+        raise
+    else:
+        progress("finished")
+
+
+def merge_user(src_user_id, target_user_id, delete=True):
+    """Merge the user `src_user_id` into `target_user_id`, recording the
+    progress in the job meta.
+
+    Runs as an RQ job, which fails if the merge does.
+    """
+    progress = _job_progress()
+    try:
+        with replica_scope(), useable_connection():
+            User = get_user_model()
+            src_user = User.objects.get(pk=src_user_id)
+            UserMerger(
+                src_user,
+                User.objects.get(pk=target_user_id),
+                progress=progress).merge()
+            if delete:
+                progress("deleting")
+                src_user.delete()
+    except Exception as e:
+        logger.error("Error merging user '%s': %s", src_user_id, e)
+        progress("failed", error=unicode(e))
+        raise
+    else:
+        progress("finished")
+
+
+def queue_user_deletion(user, purge=False):
+    """Queue the deletion of `user` as a background job."""
+    return get_queue("default").enqueue_call(
+        delete_user,
+        args=(user.id, ),
+        kwargs=dict(purge=purge),
+        meta=dict(username=user.username, stage="queued"))
+
+
+def queue_user_merge(src_user, target_user, delete=True):
+    """Queue merging `src_user` into `target_user` as a background job."""
+    return get_queue("default").enqueue_call(
+        merge_user,
+        args=(src_user.id, target_user.id),
+        kwargs=dict(delete=delete),
+        meta=dict(
+            username=src_user.username,
+            target_username=target_user.username,
+            stage="queued"))
 
 
 def verify_user(user):
@@ -20,5 +20,6 @@ class UploadForm(forms.Form):
         self.uploader_list = kwargs.pop("uploader_list", [])
         super(UploadForm, self).__init__(*args, **kwargs)
         self.fields["file"].widget.attrs["id"] = "js-file-upload-input"
+        self.fields["file"].widget.attrs["multiple"] = True
         self.fields["user_id"].choices = self.uploader_list
         self.fields["user_id"].widget.attrs["id"] = "js-user-upload-input"
@@ -7,10 +7,13 @@
 # AUTHORS file for copyright and authorship information.
 
 import os
+import threading
 os.environ["DJANGO_SETTINGS_MODULE"] = "pootle.settings"
+from multiprocessing.pool import ThreadPool
 from zipfile import ZipFile
 
 from django.core.management.base import CommandError
+from django.db import connection
 
 from pootle_app.management.commands import PootleCommand
 from pootle_language.models import Language
@@ -53,6 +56,18 @@ class Command(PootleCommand):
             default=False,
             help="Remove old exported TMX files",
         )
+        parser.add_argument(
+            "--jobs",
+            action="store",
+            type=int,
+            dest="jobs",
+            default=1,
+            help="Number of TMX files to export in parallel",
+        )
+
+    def __init__(self, *args, **kwargs):
+        self.exporters = []
+        super(Command, self).__init__(*args, **kwargs)
 
     def _create_zip(self, stores, prefix):
         with open("%s.zip" % (prefix), "wb") as f:
@@ -78,7 +93,34 @@ class Command(PootleCommand):
                 self.handle_language(language)
             return
 
-        return super(Command, self).handle_all(**options)
+        self.exporters = []
+        super(Command, self).handle_all(**options)
+        if self.exporters:
+            self.export_tmx(self.exporters, **options)
+
+    def export_tmx(self, exporters, **options):
+        pool = ThreadPool(min(options["jobs"], len(exporters)))
+        main_thread = threading.current_thread()
+
+        def _export(exporter):
+            try:
+                return exporter.export(rotate=options["rotate"])
+            finally:
+                # close the db connection opened by the worker thread
+                if threading.current_thread() is not main_thread:
+                    connection.close()
+
+        try:
+            for filename, removed in pool.imap(_export, exporters):
+                self.write_exported(filename, removed)
+        finally:
+            pool.close()
+            pool.join()
+
+    def write_exported(self, filename, removed):
+        self.stdout.write('File "%s" has been saved.' % filename)
+        for filename in removed:
+            self.stdout.write('File "%s" has been removed.' % filename)
 
     def handle_translation_project(self, translation_project, **options):
         if options['export_tmx']:
@@ -89,10 +131,11 @@ class Command(PootleCommand):
                     translation_project)
                 return False
 
-            filename, removed = exporter.export(rotate=options['rotate'])
-            self.stdout.write('File "%s" has been saved.' % filename)
-            for filename in removed:
-                self.stdout.write('File "%s" has been removed.' % filename)
+            if options["jobs"] > 1:
+                # exported in parallel once all of the TPs are collected
+                self.exporters.append(exporter)
+                return False
+            self.write_exported(*exporter.export(rotate=options['rotate']))
         else:
             stores = translation_project.stores.live()
             prefix = "%s-%s" % (translation_project.project.code,
@@ -8,13 +8,16 @@
 
 from django.conf.urls import url
 
-from .views import TPOfflineTMView, export
+from .views import TPOfflineTMView, export, import_status
 
 
 urlpatterns = [
     url(r"^export/$",
         export,
         name="pootle-export"),
+    url(r"^xhr/import/(?P<job_id>[^/]+)/$",
+        import_status,
+        name="pootle-xhr-import-status"),
     url(r'^\+\+offline_tm/(?P<language_code>[^/]*)/(?P<project_code>[^/]*)/$',
         TPOfflineTMView.as_view(),
         name='pootle-offline-tm-tp'),
@@ -6,24 +6,40 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
+import errno
 import logging
 import os
+import shutil
 from io import BytesIO
+from tempfile import NamedTemporaryFile
 from zipfile import ZipFile
 
+from lxml import etree
+from translate.misc.xml_helpers import setXMLlang
 from translate.storage import tmx
 from translate.storage.factory import getclass
 
 from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files import File
+from django.db.models import Q
 from django.utils.functional import cached_property
+from django_rq.queues import get_queue
+from rq import get_current_job
+from rq.exceptions import NoSuchJobError
+from rq.job import Job
 
+from pootle.core.contextmanagers import replica_scope
+from pootle.core.decorators import replica_reads
 from pootle.core.delegate import revision
 from pootle.core.url_helpers import urljoin
+from pootle.core.utils.db import useable_connection
 from pootle.i18n.gettext import ugettext_lazy as _
 from pootle_app.models.permissions import check_user_permission
 from pootle_statistics.models import SubmissionTypes
 from pootle_store.constants import TRANSLATED
-from pootle_store.models import Store
+from pootle_store.fields import to_python
+from pootle_store.models import Store, Unit
 
 from .exceptions import (FileImportError, MissingPootlePathError,
                          MissingPootleRevError, UnsupportedFiletypeError)
@@ -32,23 +48,28 @@ from .exceptions import (FileImportError, MissingPootlePathError,
 logger = logging.getLogger(__name__)
 
 
-def import_file(f, user=None):
-    ttk = getclass(f)(f.read())
-    if not hasattr(ttk, "parseheader"):
+def get_import_class(f):
+    klass = getclass(f)
+    if not hasattr(klass, "parseheader"):
         raise UnsupportedFiletypeError(_("Unsupported filetype '%s', only PO "
                                          "files are supported at this time\n",
                                          f.name))
+    return klass
+
+
+def get_import_store(ttk, filename):
+    """Return the store and revision that the parsed file `ttk` targets."""
     header = ttk.parseheader()
     pootle_path = header.get("X-Pootle-Path")
     if not pootle_path:
         raise MissingPootlePathError(_("File '%s' missing X-Pootle-Path "
-                                       "header\n", f.name))
+                                       "header\n", filename))
 
     rev = header.get("X-Pootle-Revision")
     if not rev or not rev.isdigit():
         raise MissingPootleRevError(_("File '%s' missing or invalid "
                                       "X-Pootle-Revision header\n",
-                                      f.name))
+                                      filename))
     rev = int(rev)
 
     try:
@@ -57,7 +78,37 @@ def import_file(f, user=None):
         raise FileImportError(
             _("Could not create '%(filename)s'. Missing "
               "Project/Language? (%(error)s)",
-              dict(filename=f.name, error=e)))
+              dict(filename=filename, error=e)))
+    return store, rev
+
+
+def read_import_header(f):
+    """Read the header entry of the file `f`, rewinding it afterwards."""
+    lines = []
+    for line in f:
+        if line.strip():
+            lines.append(line)
+        elif lines:
+            break
+    f.seek(0)
+    return b"".join(lines)
+
+
+def validate_import_file(f):
+    """Check the headers of the file `f` without parsing all of it.
+
+    Raises the same errors as `import_file` for unsupported files and
+    missing or invalid headers.
+    """
+    klass = get_import_class(f)
+    return get_import_store(klass(read_import_header(f)), f.name)
+
+
+def import_file(f, user=None, progress=None):
+    if progress:
+        progress("parsing")
+    ttk = get_import_class(f)(f.read())
+    store, rev = get_import_store(ttk, f.name)
 
     tp = store.translation_project
     allow_add_and_obsolete = ((tp.project.checkstyle == 'terminology'
@@ -65,6 +116,8 @@ def import_file(f, user=None):
                               and check_user_permission(user,
                                                         'administrate',
                                                         tp.directory))
+    if progress:
+        progress("updating", pootle_path=store.pootle_path)
     try:
         store.update(store=ttk, user=user,
                      submission_type=SubmissionTypes.UPLOAD,
@@ -76,8 +129,170 @@ def import_file(f, user=None):
         raise FileImportError(_("There was an error uploading your file"))
 
 
+def spool_import_file(f, name):
+    """Copy the uploaded file `f` to the import spool directory, returning
+    the path of the spooled file.
+    """
+    directory = settings.POOTLE_IMPORT_SPOOL_PATH
+    try:
+        os.makedirs(directory)
+    except OSError as e:
+        if e.errno != errno.EEXIST:
+            raise
+    spooled = NamedTemporaryFile(
+        dir=directory,
+        suffix=os.path.splitext(name)[1],
+        delete=False)
+    with spooled:
+        shutil.copyfileobj(f, spooled)
+    return spooled.name
+
+
+def import_spooled_file(path, name, user_id):
+    """Import a spooled upload, recording its progress in the job meta.
+
+    Runs as an RQ job. The spooled file is removed once it has been
+    processed. Errors are recorded before being raised again, so that the
+    job itself fails.
+    """
+    job = get_current_job()
+
+    def progress(stage, **kwargs):
+        if job is None:
+            return
+        job.meta.update(kwargs)
+        job.meta["stage"] = stage
+        job.save_meta()
+
+    try:
+        with replica_scope(), useable_connection():
+            user = get_user_model().objects.get(pk=user_id)
+            with open(path, "rb") as f:
+                import_file(File(f, name=name), user=user, progress=progress)
+    except Exception as e:
+        logger.error("Error importing file '%s': %s", name, e)
+        progress("failed", error=unicode(e))
+        raise
+    else:
+        progress("finished")
+    finally:
+        os.remove(path)
+
+
+def queue_import_file(f, name, user, requested_by=None):
+    """Spool the file `f`, check its headers and queue its import.
+
+    Header errors are raised straight away. Errors found while importing
+    are recorded as `error` in the meta of the returned job.
+    """
+    path = spool_import_file(f, name)
+    try:
+        with open(path, "rb") as spooled:
+            store, __ = validate_import_file(File(spooled, name=name))
+    except Exception:
+        os.remove(path)
+        raise
+    return get_queue("default").enqueue_call(
+        import_spooled_file,
+        args=(path, name, user.id),
+        meta=dict(
+            name=name,
+            pootle_path=store.pootle_path,
+            requested_by=(requested_by or user).id,
+            stage="queued"))
+
+
+def get_import_job(job_id):
+    """Return the import job `job_id`, or `None` if it doesn't exist."""
+    try:
+        job = Job.fetch(job_id, connection=get_queue("default").connection)
+    except NoSuchJobError:
+        return None
+    if job.func_name != "%s.import_spooled_file" % __name__:
+        return None
+    return job
+
+
+def _indent_tmx_element(elem, level=0):
+    """Add the whitespace `pretty_print` would give `elem` when nested
+    `level` deep in a TMX document, leaving text content untouched.
+    """
+    children = list(elem)
+    if not children:
+        return
+    padding = "\n" + (level + 1) * "  "
+    if not (elem.text and elem.text.strip()):
+        elem.text = padding
+    for child in children:
+        _indent_tmx_element(child, level + 1)
+        if not (child.tail and child.tail.strip()):
+            child.tail = padding
+    children[-1].tail = "\n" + level * "  "
+
+
+class TMXStreamWriter(object):
+    """Writes a TMX file one translation unit at a time.
+
+    The output is the same as serializing a `tmx.tmxfile` populated with
+    `addtranslation`, without holding the document in memory.
+    """
+
+    body_indent = 2
+
+    def __init__(self, f, source_language, target_language):
+        self.f = f
+        self.source_language = source_language
+        self.target_language = target_language
+        self.written = 0
+        self.head, self.tail = self.get_skeleton()
+
+    def get_skeleton(self):
+        bs = BytesIO()
+        tmx.tmxfile().serialize(bs)
+        head, tail = bs.getvalue().split(b"<body/>")
+        return head, tail
+
+    def __enter__(self):
+        self.f.write(self.head)
+        return self
+
+    def __exit__(self, *args):
+        if self.written:
+            self.f.write(b"  </body>")
+        else:
+            self.f.write(b"<body/>")
+        self.f.write(self.tail)
+
+    def get_element(self, source, target, comment=None):
+        unit = tmx.tmxunit(source)
+        unit.target = target
+        if comment:
+            unit.addnote(comment)
+        tuvs = unit.xmlelement.iterdescendants("tuv")
+        setXMLlang(next(tuvs), self.source_language)
+        setXMLlang(next(tuvs), self.target_language)
+        _indent_tmx_element(unit.xmlelement, self.body_indent)
+        return unit.xmlelement
+
+    def write(self, source, target, comment=None):
+        if not self.written:
+            self.f.write(b"<body>\n")
+        self.f.write(b"    ")
+        self.f.write(
+            etree.tostring(
+                self.get_element(source, target, comment),
+                encoding="utf-8"))
+        self.f.write(b"\n")
+        self.written += 1
+
+
 class TPTMXExporter(object):
 
+    unit_fields = (
+        "id", "store__pootle_path", "index", "source_f", "target_f",
+        "developer_comment")
+    batch_size = 1000
+
     def __init__(self, context):
         self.context = context
 
@@ -152,25 +367,61 @@ class TPTMXExporter(object):
     def abs_filepath(self):
         return os.path.join(self.directory, self.filename)
 
-    def export(self, rotate=False):
-        source_language = self.context.project.source_language.code
-        target_language = self.context.language.code
+    @property
+    def units(self):
+        return Unit.objects.filter(
+            store__translation_project=self.context,
+            store__obsolete=False,
+            state=TRANSLATED).order_by("store__pootle_path", "index", "id")
+
+    @replica_reads
+    def iter_units(self):
+        """Yield the translated units of the TP as dicts, store by store,
+        fetching them in batches keyed on the store path, unit index and id.
+        """
+        units = self.units
+        while True:
+            batch = list(units.values(*self.unit_fields)[:self.batch_size])
+            for unit in batch:
+                yield unit
+            if len(batch) < self.batch_size:
+                break
+            last = batch[-1]
+            units = self.units.filter(
+                Q(store__pootle_path__gt=last["store__pootle_path"])
+                | Q(store__pootle_path=last["store__pootle_path"],
+                    index__gt=last["index"])
+                | Q(store__pootle_path=last["store__pootle_path"],
+                    index=last["index"],
+                    id__gt=last["id"]))
+
+    def write_tmx(self, f):
+        writer = TMXStreamWriter(
+            f,
+            self.context.project.source_language.code,
+            self.context.language.code)
+        with writer:
+            for unit in self.iter_units():
+                writer.write(
+                    to_python(unit["source_f"]),
+                    to_python(unit["target_f"]),
+                    unit["developer_comment"])
+        return writer.written
 
-        if not os.path.exists(self.directory):
+    def export(self, rotate=False):
+        try:
             os.makedirs(self.directory)
-
-        tmxfile = tmx.tmxfile()
-        for store in self.context.stores.live().iterator():
-            for unit in store.units.filter(state=TRANSLATED):
-                tmxfile.addtranslation(unit.source, source_language,
-                                       unit.target, target_language,
-                                       unit.developer_comment)
-
-        bs = BytesIO()
-        tmxfile.serialize(bs)
-        with open(self.abs_filepath, "wb") as f:
-            with ZipFile(f, "w") as zf:
-                zf.writestr(self.filename.rstrip('.zip'), bs.getvalue())
+        except OSError as e:
+            # TPs of a language may be exported in parallel
+            if e.errno != errno.EEXIST:
+                raise
+
+        with NamedTemporaryFile(dir=self.directory, suffix=".tmx") as tmp:
+            self.write_tmx(tmp)
+            tmp.flush()
+            with open(self.abs_filepath, "wb") as f:
+                with ZipFile(f, "w") as zf:
+                    zf.write(tmp.name, self.filename.rstrip('.zip'))
 
         last_exported_filepath = self.last_exported_file_path
         self.update_exported_revision()
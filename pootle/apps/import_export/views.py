@@ -16,13 +16,15 @@ from django.http import Http404, HttpResponse
 from django.shortcuts import redirect
 
 from pootle.core.delegate import language_team
+from pootle.core.http import JsonResponse
 from pootle.core.views.base import PootleDetailView
 from pootle_app.models.permissions import check_permission
+from pootle_misc.util import ajax_required
 from pootle_store.models import Store
 from pootle_translationproject.views import TPDirectoryMixin
 
 from .forms import UploadForm
-from .utils import TPTMXExporter, import_file
+from .utils import TPTMXExporter, get_import_job, queue_import_file
 
 
 def download(contents, name, content_type):
@@ -72,6 +74,49 @@ def export(request):
         return download(f.getvalue(), "%s.zip" % (prefix), "application/zip")
 
 
+def iterate_uploads(files, valid_extensions):
+    """Yield the name and file object of each of the uploaded `files`,
+    extracting the members of any zip archives.
+    """
+    for django_file in files:
+        if not is_zipfile(django_file):
+            # is_zipfile consumes the file buffer
+            django_file.seek(0)
+            yield django_file.name, django_file
+            continue
+        with ZipFile(django_file, "r") as zf:
+            for path in zf.namelist():
+                if path.endswith("/"):
+                    # is a directory
+                    continue
+                ext = os.path.splitext(path)[1].strip(".")
+                if ext not in valid_extensions:
+                    continue
+                with zf.open(path, "r") as f:
+                    yield path, f
+
+
+def get_import_job_data(job):
+    return dict(
+        id=job.id,
+        name=job.meta.get("name"),
+        pootle_path=job.meta.get("pootle_path"),
+        stage=job.meta.get("stage"),
+        error=job.meta.get("error"),
+        status=job.get_status())
+
+
+@ajax_required
+def import_status(request, job_id):
+    job = get_import_job(job_id)
+    if job is None:
+        raise Http404
+    if not (request.user.is_superuser
+            or job.meta.get("requested_by") == request.user.id):
+        raise Http404
+    return JsonResponse(get_import_job_data(job))
+
+
 def handle_upload_form(request, tp):
     """Process the upload form."""
     valid_extensions = tp.project.filetype_tool.valid_extensions
@@ -97,7 +142,6 @@ def handle_upload_form(request, tp):
 
         if upload_form.is_valid():
             uploader_id = upload_form.cleaned_data["user_id"]
-            django_file = request.FILES["file"]
             uploader = request.user
             if uploader_id and uploader_id != uploader.id:
                 User = get_user_model()
@@ -105,27 +149,29 @@ def handle_upload_form(request, tp):
                     id=upload_form.cleaned_data["user_id"]
                 )
 
+            import_jobs = []
             try:
-                if is_zipfile(django_file):
-                    with ZipFile(django_file, "r") as zf:
-                        for path in zf.namelist():
-                            if path.endswith("/"):
-                                # is a directory
-                                continue
-                            ext = os.path.splitext(path)[1].strip(".")
-                            if ext not in valid_extensions:
-                                continue
-                            with zf.open(path, "r") as f:
-                                import_file(f, user=uploader)
-                else:
-                    # is_zipfile consumes the file buffer
-                    django_file.seek(0)
-                    import_file(django_file, user=uploader)
+                for name, f in iterate_uploads(request.FILES.getlist("file"),
+                                               valid_extensions):
+                    import_jobs.append(
+                        queue_import_file(
+                            f, name, uploader, requested_by=request.user))
             except Exception as e:
+                # files queued before the error are still imported
                 upload_form.add_error("file", e)
                 return {
+                    "import_jobs": [
+                        get_import_job_data(job)
+                        for job in import_jobs],
                     "upload_form": upload_form,
                 }
+            return {
+                "import_jobs": [
+                    get_import_job_data(job)
+                    for job in import_jobs],
+                "upload_form": UploadForm(
+                    uploader_list=uploader_list,
+                    initial=dict(user_id=request.user.id))}
         else:
             return {
                 "upload_form": upload_form,
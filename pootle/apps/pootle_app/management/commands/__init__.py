@@ -12,6 +12,7 @@ import logging
 from django.db import transaction
 from django.core.management.base import BaseCommand, CommandError
 
+from pootle.core.contextmanagers import replica_scope
 from pootle.runner import set_sync_mode
 from pootle_language.models import Language
 from pootle_project.models import Project
@@ -119,6 +120,12 @@ class PootleCommand(BaseCommand):
             raise CommandError("Unrecognized languages: %s" %
                                unrecognized_languages)
 
+    def execute(self, *args, **options):
+        # writes of earlier commands in this thread should not keep the
+        # reads of this one on the primary
+        with replica_scope():
+            return super(PootleCommand, self).execute(*args, **options)
+
     def handle(self, **options):
         if options["atomic"] == "all":
             with transaction.atomic():
@@ -12,6 +12,7 @@ os.environ['DJANGO_SETTINGS_MODULE'] = 'pootle.settings'
 
 from pootle.core.signals import update_data
 from pootle_app.management.commands import PootleCommand
+from pootle_data.contextmanagers import batch_related_data
 from pootle_store.models import Store
 from pootle_translationproject.models import TranslationProject
 
@@ -46,6 +47,12 @@ class Command(PootleCommand):
                 tp.pootle_path)
 
     def handle(self, **options):
+        # languages and projects are rolled up once all of the TPs have
+        # been updated
+        with batch_related_data():
+            self.handle_tps(**options)
+
+    def handle_tps(self, **options):
         projects = options.get("projects")
         languages = options.get("languages")
         stores = options.get("stores")
@@ -20,8 +20,10 @@ from django.core.management.base import BaseCommand, CommandError
 from django.utils import dateparse
 from django.utils.encoding import force_bytes
 
+from pootle.core.contextmanagers import replica_safe, replica_scope
 from pootle.core.utils import dateformat
 from pootle_store.models import Unit
+from pootle_store.store.pool import parse_pool
 from pootle_translationproject.models import TranslationProject
 
 
@@ -84,7 +86,11 @@ class DBParser(BaseParser):
             'store__translation_project__language__code'
         ).order_by()
 
-        return units_qs.iterator(), units_qs.count()
+        # the units are read after this returns, so the queryset is sent to
+        # the replica directly
+        with replica_safe() as db:
+            units_qs = units_qs.using(db)
+            return units_qs.iterator(), units_qs.count()
 
     def get_unit_data(self, unit):
         """Return dict with data to import for a single unit."""
@@ -154,7 +160,7 @@ class FileParser(BaseParser):
                 all_filenames.add(filename)
 
         for filename in all_filenames:
-            store = factory.getobject(filename)
+            store = parse_pool.parse(filename, factory.getobject)
             if not store.gettargetlanguage() and not self.target_language:
                 raise CommandError("Unable to determine target language for "
                                    "'%s'. Try again specifying a fallback "
@@ -192,6 +198,10 @@ class FileParser(BaseParser):
 class Command(BaseCommand):
     help = "Load Translation Memory with translations"
 
+    def execute(self, *args, **options):
+        with replica_scope():
+            return super(Command, self).execute(*args, **options)
+
     def add_arguments(self, parser):
         parser.add_argument(
             '--refresh',
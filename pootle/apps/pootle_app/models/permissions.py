@@ -89,13 +89,27 @@ def check_user_permission(user, permission_codename, directory,
     """Checks if the current user has the permission to perform
     ``permission_codename``.
     """
+    return check_user_permissions(
+        user, [permission_codename], directory,
+        check_default=check_default)[permission_codename]
+
+
+def check_user_permissions(user, permission_codenames, directory,
+                           check_default=True):
+    """Checks if the current user has the permissions to perform each of
+    ``permission_codenames``, matching the user's permissions only once.
+
+    :return: a dictionary of ``permission_codename: bool``.
+    """
     if user.is_superuser:
-        return True
+        return {codename: True for codename in permission_codenames}
 
     permissions = get_matching_permissions(user, directory, check_default)
 
-    return ("administrate" in permissions or
-            permission_codename in permissions)
+    return {
+        codename: ("administrate" in permissions
+                   or codename in permissions)
+        for codename in permission_codenames}
 
 
 def check_permission(permission_codename, request):
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import logging
+import threading
+from collections import Counter
+
+from translate.filters import checks
+
+from .constants import EXCLUDED_FILTERS
+
+
+logger = logging.getLogger(__name__)
+
+
+def checker_error_handler(functionname, str1, str2, e):
+    logger.error(
+        u"Error in filter %s: %r, %r, %s",
+        functionname,
+        str1,
+        str2, e)
+    return False
+
+
+class CheckerRegistry(threading.local):
+    """Builds a checker once for each checkstyle and language.
+
+    Checkers keep state while running filters, so the registry is local to
+    each thread.
+    """
+
+    excluded_filters = EXCLUDED_FILTERS
+
+    def __init__(self):
+        self.checkers = {}
+        # number of checkers constructed for each (checkstyle, language)
+        self.constructed = Counter()
+
+    def build(self, checkstyle, language_code):
+        checkerclasses = [
+            checks.projectcheckers.get(
+                checkstyle,
+                checks.StandardChecker)]
+        self.constructed[(checkstyle, language_code)] += 1
+        logger.debug(
+            "[checks] Constructed checker (%s, %s)",
+            checkstyle, language_code)
+        return checks.TeeChecker(
+            checkerclasses=checkerclasses,
+            excludefilters=self.excluded_filters,
+            errorhandler=checker_error_handler,
+            languagecode=language_code)
+
+    def clear(self, checkstyle=None):
+        if checkstyle is None:
+            self.checkers.clear()
+            return
+        for key in list(self.checkers.keys()):
+            if key[0] == checkstyle:
+                del self.checkers[key]
+
+    def get(self, checkstyle, language_code):
+        key = (checkstyle, language_code)
+        if key not in self.checkers:
+            self.checkers[key] = self.build(checkstyle, language_code)
+        return self.checkers[key]
+
+
+checker_registry = CheckerRegistry()
@@ -17,6 +17,7 @@ from django.utils.lru_cache import lru_cache
 
 from pootle.core.bulk import BulkCRUD
 from pootle.core.contextmanagers import bulk_operations
+from pootle.core.debug import instrument
 from pootle.core.signals import create, delete, update_data
 from pootle_store.constants import UNTRANSLATED
 from pootle_store.models import QualityCheck, Unit
@@ -227,6 +228,7 @@ class QualityCheckUpdater(object):
     def log_debug(self):
         pass
 
+    @instrument("pootle_checks.update")
     def update(self, clear_unknown=False, update_data_after=False):
         """Update/purge all QualityChecks for Units, and expire Store caches.
         """
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+from contextlib import contextmanager
+
+from django.dispatch import receiver
+
+from pootle.core.contextmanagers import keep_data
+from pootle.core.signals import update_data
+
+from .models import DirectoryData
+
+
+@contextmanager
+def batch_related_data():
+    """Coalesce the language, project and all projects rollups of TPData
+    for the duration of the context.
+
+    The languages and projects of any TPData that changes are collected,
+    and on exit they are rolled up once.
+
+    If used inside another ``batch_related_data`` context the collected
+    languages and projects are passed on to the outer batch.
+    """
+    languages = {}
+    projects = {}
+
+    with keep_data(signals=(update_data, ), suppress=(DirectoryData, )):
+
+        @receiver(update_data, sender=DirectoryData)
+        def handle_update_data(**kwargs):
+            for language in kwargs.get("languages") or []:
+                languages[language.id] = language
+            for project in kwargs.get("projects") or []:
+                projects[project.id] = project
+        yield
+    if languages or projects:
+        update_data.send(
+            DirectoryData,
+            languages=languages.values(),
+            projects=projects.values())
@@ -6,11 +6,379 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
-from django.db.models import Max
+from django.db.models import (
+    Case, DateTimeField, F, IntegerField, Max, Sum, When)
+from django.db.models.functions import Coalesce
+from django.utils.functional import cached_property
 
+from pootle.core.bulk import BulkCRUD
+from pootle.core.decorators import persistent_property
+from pootle.core.signals import create, update
+from pootle_app.models import Directory
+from pootle_project.models import Project
+from pootle_statistics.models import Submission
+from pootle_statistics.proxy import SubmissionProxy
+from pootle_store.models import Unit
 from pootle_translationproject.models import TranslationProject
 
-from .utils import RelatedStoresDataTool
+from .models import DirectoryData, StoreData, TPData
+from .utils import SUM_FIELDS, RelatedStoresDataTool
+
+
+def get_last_created_unit_info(unit_ids):
+    """Returns last created unit info for the given units, keyed by id"""
+    if not unit_ids:
+        return {}
+    return {
+        unit.pk: unit.get_last_created_unit_info()
+        for unit
+        in Unit.objects.select_related("store").filter(
+            pk__in=unit_ids).exclude(creation_time__isnull=True)}
+
+
+def get_last_submission_info(submission_ids):
+    """Returns submission info for the given submissions, keyed by id"""
+    if not submission_ids:
+        return {}
+    subs = Submission.objects.filter(pk__in=submission_ids).order_by()
+    return {
+        sub["pk"]: SubmissionProxy(sub).get_submission_info()
+        for sub
+        in subs.values(*(("pk", ) + SubmissionProxy.info_fields))}
+
+
+class DirectoryDataCRUD(BulkCRUD):
+    model = DirectoryData
+
+
+class DirectoryDataUpdater(object):
+    """Rolls up the StoreData of a TP into DirectoryData for each of the
+    TP's directories, or if ``stores`` are given only for their parent
+    directories
+    """
+
+    sum_fields = SUM_FIELDS
+    max_fields = (
+        "last_created_unit",
+        "last_submission",
+        "max_unit_mtime",
+        "max_unit_revision")
+    info_fields = (
+        ("last_created_unit_id", "last_created_unit_info"),
+        ("last_submission_id", "last_submission_info"))
+
+    def __init__(self, tp, stores=None):
+        self.tp = tp
+        self.stores = stores
+
+    @cached_property
+    def paths(self):
+        """The `tp_path`s of the parent directories of the stores, or
+        ``None`` if all of the TP's directories are updated
+        """
+        if self.stores is None:
+            return None
+        paths = set()
+        for store in self.stores:
+            if store.translation_project_id != self.tp.id:
+                continue
+            parts = store.tp_path.strip("/").split("/")[:-1]
+            paths.add("/")
+            paths.update(
+                "/%s/" % "/".join(parts[:i + 1])
+                for i in range(len(parts)))
+        return paths
+
+    def filter_paths(self, qs, field="tp_path"):
+        if self.paths is None:
+            return qs
+        return qs.filter(**{"%s__in" % field: self.paths})
+
+    @property
+    def directories(self):
+        return self.filter_paths(
+            Directory.objects.filter(tp_id=self.tp.id)).values_list(
+                "id", "tp_path")
+
+    @property
+    def directory_data(self):
+        return self.filter_paths(
+            DirectoryData.objects.filter(directory__tp_id=self.tp.id),
+            field="directory__tp_path")
+
+    @property
+    def fields(self):
+        return self.sum_fields + self.max_fields
+
+    @property
+    def store_data_qs(self):
+        return StoreData.objects.filter(
+            store__translation_project_id=self.tp.id,
+            store__obsolete=False)
+
+    def get_store_data(self):
+        """Returns the StoreData of the TP aggregated by parent directory"""
+        aggregates = {
+            "%s__sum" % k: Sum(k)
+            for k in self.sum_fields}
+        aggregates.update(
+            {"%s__max" % k: Max(k)
+             for k in self.max_fields})
+        return (
+            self.store_data_qs.order_by()
+                              .values("store__parent__tp_path")
+                              .annotate(**aggregates))
+
+    def get_rollups(self, directories):
+        """Returns the data for each of the TP's directories, keyed by
+        `tp_path`, with each parent directory rolling up its descendants
+        """
+        defaults = dict(
+            (k, 0 if k in self.sum_fields else None)
+            for k in self.fields)
+        rollups = {
+            tp_path: dict(defaults)
+            for tp_path
+            in directories.values()}
+        for data in self.get_store_data():
+            path = data["store__parent__tp_path"]
+            parts = path.strip("/").split("/") if path != "/" else []
+            parents = ["/"] + [
+                "/%s/" % "/".join(parts[:i + 1])
+                for i in range(len(parts))]
+            for parent in parents:
+                if parent not in rollups:
+                    continue
+                rollup = rollups[parent]
+                for k in self.sum_fields:
+                    rollup[k] += data["%s__sum" % k] or 0
+                for k in self.max_fields:
+                    value = data["%s__max" % k]
+                    if value is not None and (rollup[k] is None
+                                              or value > rollup[k]):
+                        rollup[k] = value
+        for rollup in rollups.values():
+            rollup["max_unit_revision"] = rollup["max_unit_revision"] or 0
+        return rollups
+
+    def get_path_rollups(self, directories):
+        """Returns the data for each of the given directories, keyed by
+        `tp_path`, aggregating the data for all of them in one query
+        """
+        paths = sorted(set(directories.values()))
+        aggregates = {}
+        for i, path in enumerate(paths):
+            for k in self.fields:
+                output_field = (
+                    DateTimeField()
+                    if k == "max_unit_mtime"
+                    else IntegerField())
+                value = Case(
+                    When(store__tp_path__startswith=path, then=F(k)),
+                    output_field=output_field)
+                aggregates["p%s__%s" % (i, k)] = (
+                    Coalesce(Sum(value), 0)
+                    if k in self.sum_fields
+                    else Max(value))
+        data = self.store_data_qs.aggregate(**aggregates) if paths else {}
+        rollups = {}
+        for i, path in enumerate(paths):
+            rollups[path] = {
+                k: data["p%s__%s" % (i, k)]
+                for k in self.fields}
+            rollups[path]["max_unit_revision"] = (
+                rollups[path]["max_unit_revision"] or 0)
+        return rollups
+
+    def get_directory_rollups(self):
+        """Returns the rollup for each of the TP's directories, keyed by
+        directory id
+        """
+        directories = dict(self.directories)
+        rollups = (
+            self.get_rollups(directories)
+            if self.paths is None
+            else self.get_path_rollups(directories))
+        return {
+            directory_id: rollups[tp_path]
+            for directory_id, tp_path
+            in directories.items()}
+
+    def get_info(self, rollups, existing):
+        """Returns the last created unit and last submission info for each
+        of the rollups where it has changed, keyed by directory id
+        """
+        changed = {}
+        for directory_id, rollup in rollups.items():
+            current = existing.get(directory_id, {})
+            for fk_field, info_field in self.info_fields:
+                info_changed = (
+                    rollup[fk_field] != current.get(fk_field)
+                    or (rollup[fk_field]
+                        and current.get(info_field) is None))
+                if info_changed:
+                    changed[directory_id] = changed.get(directory_id, {})
+                    changed[directory_id][info_field] = rollup[fk_field]
+        if not changed:
+            return {}
+        unit_info = get_last_created_unit_info(
+            set(info["last_created_unit_info"]
+                for info in changed.values()
+                if info.get("last_created_unit_info")))
+        submission_info = get_last_submission_info(
+            set(info["last_submission_info"]
+                for info in changed.values()
+                if info.get("last_submission_info")))
+        info_lookup = dict(
+            last_created_unit_info=unit_info,
+            last_submission_info=submission_info)
+        return {
+            directory_id: {
+                info_field: info_lookup[info_field].get(pk)
+                for info_field, pk
+                in info.items()}
+            for directory_id, info
+            in changed.items()}
+
+    def set_rollups(self, rollups, add=True):
+        """Saves the rollups, only updating existing DirectoryData unless
+        ``add`` is set
+        """
+        fields = [
+            "%s_id" % k if k in ("last_created_unit", "last_submission") else k
+            for k in self.fields]
+        existing = {
+            data["directory_id"]: data
+            for data
+            in self.directory_data.values(
+                "id",
+                "directory_id",
+                *(fields + [f for __, f in self.info_fields]))}
+        rollups = {
+            directory_id: {
+                field: rollup[k]
+                for field, k
+                in zip(fields, self.fields)}
+            for directory_id, rollup
+            in rollups.items()}
+        for directory_id, info in self.get_info(rollups, existing).items():
+            rollups[directory_id].update(info)
+        to_add = []
+        to_update = {}
+        for directory_id, rollup in rollups.items():
+            if directory_id not in existing:
+                to_add.append(
+                    DirectoryData(directory_id=directory_id, **rollup))
+                continue
+            changed = {
+                k: v
+                for k, v in rollup.items()
+                if existing[directory_id][k] != v}
+            if changed:
+                to_update[existing[directory_id]["id"]] = changed
+        if to_update:
+            update.send(DirectoryData, updates=to_update)
+        if add and to_add:
+            create.send(DirectoryData, objects=to_add)
+
+    def update(self, add=True):
+        self.set_rollups(self.get_directory_rollups(), add=add)
+
+
+class RelatedTPsDirectoryDataUpdater(DirectoryDataUpdater):
+    """Rolls up the TPData of TPs into DirectoryData for the directories of
+    their languages and projects, and of all projects
+    """
+
+    def __init__(self, languages=(), projects=()):
+        self.languages = list(languages)
+        self.projects = list(projects)
+
+    @property
+    def directories(self):
+        return (
+            [(language.directory_id,
+              self.filter_accessible(self.tp_data_qs).filter(
+                  tp__language_id=language.id))
+             for language in self.languages]
+            + [(project.directory_id,
+                self.filter_templates(self.tp_data_qs).filter(
+                    tp__project_id=project.id))
+               for project in self.projects])
+
+    @property
+    def directory_data(self):
+        return DirectoryData.objects.filter(
+            directory_id__in=(
+                [directory_id
+                 for directory_id, __
+                 in self.directories]
+                + [Directory.objects.projects.id]))
+
+    @property
+    def tp_data_qs(self):
+        return TPData.objects.order_by()
+
+    def filter_accessible(self, qs):
+        return qs.exclude(tp__project__disabled=True)
+
+    def filter_templates(self, qs):
+        return qs.exclude(tp__language__code="templates")
+
+    def get_rollup(self, qs):
+        aggregates = {
+            k: Coalesce(Sum(k), 0)
+            for k in self.sum_fields}
+        aggregates.update(
+            {k: Max(k)
+             for k in self.max_fields})
+        rollup = qs.aggregate(**aggregates)
+        # aggregates of a queryset that matches nothing are all None
+        for k in self.sum_fields + ("max_unit_revision", ):
+            rollup[k] = rollup[k] or 0
+        return rollup
+
+    def add_rollup(self, rollup, other):
+        for k in self.sum_fields:
+            rollup[k] += other[k]
+        for k in self.max_fields:
+            if other[k] is not None and (rollup[k] is None
+                                         or other[k] > rollup[k]):
+                rollup[k] = other[k]
+
+    def get_projects_rollup(self, rollups):
+        """Returns the rollup for all projects, adding up the rollups of
+        the enabled projects rather than aggregating the TPData of the site
+        """
+        projects = list(
+            Project.objects.filter(disabled=False).values_list(
+                "directory_id", "directory__data"))
+        stored = []
+        for directory_id, data_id in projects:
+            if directory_id in rollups:
+                continue
+            if data_id is None:
+                # a project has not been rolled up yet
+                return self.get_rollup(
+                    self.filter_templates(
+                        self.filter_accessible(self.tp_data_qs)))
+            stored.append(data_id)
+        rollup = self.get_rollup(DirectoryData.objects.filter(id__in=stored))
+        enabled = set(directory_id for directory_id, __ in projects)
+        for directory_id, project_rollup in rollups.items():
+            if directory_id in enabled:
+                self.add_rollup(rollup, project_rollup)
+        return rollup
+
+    def get_directory_rollups(self):
+        rollups = {
+            directory_id: self.get_rollup(qs)
+            for directory_id, qs
+            in self.directories}
+        rollups[Directory.objects.projects.id] = self.get_projects_rollup(
+            {project.directory_id: rollups[project.directory_id]
+             for project in self.projects})
+        return rollups
 
 
 class DirectoryDataTool(RelatedStoresDataTool):
@@ -30,6 +398,32 @@ class DirectoryDataTool(RelatedStoresDataTool):
         except TranslationProject.DoesNotExist:
             return self.all_stat_data.aggregate(rev=Max("max_unit_revision"))["rev"]
 
+    @property
+    def child_dir_data(self):
+        """DirectoryData rollups for the immediate child directories"""
+        return DirectoryData.objects.filter(directory__parent=self.context)
+
+    @property
+    def all_child_stats_qs(self):
+        return self.child_dir_data.values(
+            *("directory__name", ) + self.max_fields + self.sum_fields)
+
+    @property
+    def child_stats_qs(self):
+        return self.all_child_stats_qs.exclude(
+            directory__obsolete=True).exclude(
+                directory__tp__project__disabled=True)
+
+    @persistent_property
+    def all_object_stats(self):
+        return self.get_object_stats(self.child_dir_data)
+
+    @persistent_property
+    def object_stats(self):
+        return self.get_object_stats(
+            self.child_dir_data.exclude(
+                directory__tp__project__disabled=True))
+
     def filter_data(self, qs):
         return (
             qs.filter(
@@ -39,8 +433,12 @@ class DirectoryDataTool(RelatedStoresDataTool):
 
     def get_children_stats(self, qs):
         children = {}
-        for child in qs.iterator():
-            self.add_child_stats(children, child)
+        for child in qs:
+            self.add_child_stats(
+                children,
+                child,
+                root=child["directory__name"],
+                use_aggregates=False)
         child_stores = self.data_model.filter(store__parent=self.context).values(
             *("store__name", ) + self.max_fields + self.sum_fields)
         for child in child_stores:
@@ -52,7 +450,3 @@ class DirectoryDataTool(RelatedStoresDataTool):
         self.add_submission_info(self.stat_data, children)
         self.add_last_created_info(child_stores, children)
         return children
-
-    def get_root_child_path(self, child):
-        return child["store__parent__tp_path"][
-            len(self.context.tp_path):].split("/")[0]
@@ -14,9 +14,10 @@ from pootle_project.models import Project, ProjectResource, ProjectSet
 from pootle_store.models import Store
 from pootle_translationproject.models import TranslationProject
 
-from .directory_data import DirectoryDataTool
+from .directory_data import DirectoryDataCRUD, DirectoryDataTool
 from .language_data import LanguageDataTool
-from .models import StoreChecksData, StoreData, TPChecksData, TPData
+from .models import (
+    DirectoryData, StoreChecksData, StoreData, TPChecksData, TPData)
 from .project_data import (
     ProjectDataTool, ProjectResourceDataTool, ProjectSetDataTool)
 from .store_data import (
@@ -26,13 +27,15 @@ from .tp_data import (
 
 
 CRUD = {
+    DirectoryData: DirectoryDataCRUD(),
     StoreData: StoreDataCRUD(),
     StoreChecksData: StoreChecksDataCRUD(),
     TPData: TPDataCRUD(),
     TPChecksData: TPChecksDataCRUD()}
 
 
-@getter(crud, sender=(StoreChecksData, StoreData, TPChecksData, TPData))
+@getter(crud, sender=(DirectoryData, StoreChecksData, StoreData,
+                      TPChecksData, TPData))
 def data_crud_getter(**kwargs):
     return CRUD[kwargs["sender"]]
 
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.8 on 2026-10-19 09:24
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pootle_app', '0019_remove_extra_indeces'),
+        ('pootle_store', '0034_limit_text_fields'),
+        ('pootle_statistics', '0014_submission_unit_notnull'),
+        ('pootle_data', '0010_not_null_max_revision_in_store_and_tp_data'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DirectoryData',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('max_unit_mtime', models.DateTimeField(blank=True, db_index=True, null=True)),
+                ('max_unit_revision', models.IntegerField(blank=True, db_index=True, default=0)),
+                ('critical_checks', models.IntegerField(db_index=True, default=0)),
+                ('pending_suggestions', models.IntegerField(db_index=True, default=0)),
+                ('total_words', models.IntegerField(db_index=True, default=0)),
+                ('translated_words', models.IntegerField(db_index=True, default=0)),
+                ('fuzzy_words', models.IntegerField(db_index=True, default=0)),
+                ('directory', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='data', to='pootle_app.Directory')),
+                ('last_created_unit', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='last_created_for_directorydata', to='pootle_store.Unit')),
+                ('last_submission', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='directorydata_stats_data', to='pootle_statistics.Submission')),
+            ],
+            options={
+                'db_table': 'pootle_directory_data',
+            },
+        ),
+    ]
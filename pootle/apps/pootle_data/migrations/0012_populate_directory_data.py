@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+from django.db.models import Max, Sum
+
+
+SUM_FIELDS = (
+    "critical_checks",
+    "total_words",
+    "fuzzy_words",
+    "translated_words",
+    "pending_suggestions")
+MAX_FIELDS = (
+    "last_created_unit",
+    "last_submission",
+    "max_unit_mtime",
+    "max_unit_revision")
+
+
+def get_rollups(store_data, directories):
+    """Rolls up the StoreData of a TP, grouped by parent directory, into
+    each of the TP's directories
+    """
+    rollups = {}
+    for tp_path in directories.values():
+        rollups[tp_path] = {k: 0 for k in SUM_FIELDS}
+        rollups[tp_path].update({k: None for k in MAX_FIELDS})
+    for data in store_data:
+        path = data["store__parent__tp_path"]
+        parts = path.strip("/").split("/") if path != "/" else []
+        parents = ["/"] + [
+            "/%s/" % "/".join(parts[:i + 1])
+            for i in range(len(parts))]
+        for parent in parents:
+            if parent not in rollups:
+                continue
+            rollup = rollups[parent]
+            for k in SUM_FIELDS:
+                rollup[k] += data["%s__sum" % k] or 0
+            for k in MAX_FIELDS:
+                value = data["%s__max" % k]
+                if value is not None and (rollup[k] is None
+                                          or value > rollup[k]):
+                    rollup[k] = value
+    return rollups
+
+
+def populate_directory_data(apps, schema_editor):
+    Directory = apps.get_model("pootle_app.Directory")
+    DirectoryData = apps.get_model("pootle_data.DirectoryData")
+    StoreData = apps.get_model("pootle_data.StoreData")
+
+    existing = set(
+        DirectoryData.objects.values_list("directory_id", flat=True))
+    missing = {}
+    directories = Directory.objects.filter(
+        tp__isnull=False).exclude(id__in=existing).values_list(
+            "id", "tp_id", "tp_path")
+    for directory_id, tp_id, tp_path in directories.iterator():
+        missing.setdefault(tp_id, {})[directory_id] = tp_path
+    aggregates = {"%s__sum" % k: Sum(k) for k in SUM_FIELDS}
+    aggregates.update({"%s__max" % k: Max(k) for k in MAX_FIELDS})
+    to_add = []
+    for tp_id, tp_directories in missing.items():
+        store_data = StoreData.objects.filter(
+            store__translation_project_id=tp_id,
+            store__obsolete=False).order_by().values(
+                "store__parent__tp_path").annotate(**aggregates)
+        rollups = get_rollups(store_data, tp_directories)
+        for directory_id, tp_path in tp_directories.items():
+            data = rollups[tp_path]
+            data["max_unit_revision"] = data["max_unit_revision"] or 0
+            data["last_created_unit_id"] = data.pop("last_created_unit")
+            data["last_submission_id"] = data.pop("last_submission")
+            to_add.append(DirectoryData(directory_id=directory_id, **data))
+        if len(to_add) >= 1000:
+            DirectoryData.objects.bulk_create(to_add)
+            to_add = []
+    DirectoryData.objects.bulk_create(to_add)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pootle_data', '0011_add_directory_data'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            populate_directory_data,
+            migrations.RunPython.noop),
+    ]
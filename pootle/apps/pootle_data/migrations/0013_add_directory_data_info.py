@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.8 on 2026-10-19 10:12
+from __future__ import unicode_literals
+
+from django.db import migrations
+import jsonfield.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pootle_data', '0012_populate_directory_data'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='directorydata',
+            name='last_created_unit_info',
+            field=jsonfield.fields.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='directorydata',
+            name='last_submission_info',
+            field=jsonfield.fields.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+from django.db.models import Max, Sum
+
+
+SUM_FIELDS = (
+    "critical_checks",
+    "total_words",
+    "fuzzy_words",
+    "translated_words",
+    "pending_suggestions")
+MAX_FIELDS = (
+    "last_created_unit",
+    "last_submission",
+    "max_unit_mtime",
+    "max_unit_revision")
+
+
+def populate_related_directory_data(apps, schema_editor):
+    Directory = apps.get_model("pootle_app.Directory")
+    DirectoryData = apps.get_model("pootle_data.DirectoryData")
+    Language = apps.get_model("pootle_language.Language")
+    Project = apps.get_model("pootle_project.Project")
+    TPData = apps.get_model("pootle_data.TPData")
+
+    existing = set(
+        DirectoryData.objects.values_list("directory_id", flat=True))
+    tp_data = TPData.objects.order_by()
+    accessible = tp_data.exclude(tp__project__disabled=True)
+    rollups = [
+        (directory_id, accessible.filter(tp__language_id=language_id))
+        for directory_id, language_id
+        in Language.objects.exclude(
+            directory_id__in=existing).values_list("directory_id", "id")]
+    rollups += [
+        (directory_id,
+         tp_data.filter(tp__project_id=project_id).exclude(
+             tp__language__code="templates"))
+        for directory_id, project_id
+        in Project.objects.exclude(
+            directory_id__in=existing).values_list("directory_id", "id")]
+    rollups += [
+        (directory_id, accessible.exclude(tp__language__code="templates"))
+        for directory_id
+        in Directory.objects.filter(pootle_path="/projects/").exclude(
+            id__in=existing).values_list("id", flat=True)]
+    aggregates = {k: Sum(k) for k in SUM_FIELDS}
+    aggregates.update({k: Max(k) for k in MAX_FIELDS})
+    to_add = []
+    for directory_id, qs in rollups:
+        data = qs.aggregate(**aggregates)
+        for k in SUM_FIELDS + ("max_unit_revision", ):
+            data[k] = data[k] or 0
+        data["last_created_unit_id"] = data.pop("last_created_unit")
+        data["last_submission_id"] = data.pop("last_submission")
+        # the last created unit and submission info is added when the
+        # rollups are next updated, or looked up until then
+        to_add.append(DirectoryData(directory_id=directory_id, **data))
+    DirectoryData.objects.bulk_create(to_add, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pootle_data', '0013_add_directory_data_info'),
+        ('pootle_language', '0003_ensure_unique_special_chars'),
+        ('pootle_project', '0017_remove_project_treestyle'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            populate_related_directory_data,
+            migrations.RunPython.noop),
+    ]
@@ -6,6 +6,8 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
+from jsonfield.fields import JSONField
+
 from django.db import models
 
 from .abstracts import AbstractPootleChecksData, AbstractPootleData
@@ -73,3 +75,41 @@ class TPChecksData(AbstractPootleChecksData):
 
     def __unicode__(self):
         return self.tp.pootle_path
+
+
+class DirectoryData(AbstractPootleData):
+    """Rolled up data for all of the Stores below a Directory"""
+
+    class Meta(object):
+        db_table = "pootle_directory_data"
+
+    directory = models.OneToOneField(
+        "pootle_app.Directory",
+        on_delete=models.CASCADE,
+        db_index=True,
+        related_name="data")
+    # a unit/submission is shared by the Directory and its parents
+    last_created_unit = models.ForeignKey(
+        "pootle_store.Unit",
+        null=True,
+        blank=True,
+        related_name="last_created_for_directorydata",
+        on_delete=models.SET_NULL)
+    last_submission = models.ForeignKey(
+        "pootle_statistics.Submission",
+        null=True,
+        blank=True,
+        related_name="directorydata_stats_data",
+        on_delete=models.SET_NULL)
+    # denormalised info for the last created unit and last submission, so
+    # that stats for languages and projects can be read without looking
+    # them up
+    last_created_unit_info = JSONField(
+        null=True,
+        blank=True)
+    last_submission_info = JSONField(
+        null=True,
+        blank=True)
+
+    def __unicode__(self):
+        return self.directory.pootle_path
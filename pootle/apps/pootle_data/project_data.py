@@ -8,6 +8,7 @@
 
 from pootle.core.delegate import revision
 
+from .models import DirectoryData
 from .utils import RelatedStoresDataTool, RelatedTPsDataTool
 
 
@@ -27,9 +28,23 @@ class ProjectDataTool(RelatedTPsDataTool):
 
 
 class ProjectResourceDataTool(RelatedStoresDataTool):
-    group_by = ("store__translation_project__language__code", )
     cache_key_name = "project_resource"
 
+    @property
+    def group_by(self):
+        if self.filename:
+            return ("store__translation_project__language__code", )
+        return ("directory__tp__language__code", )
+
+    @property
+    def all_stat_data(self):
+        if self.filename:
+            return super(ProjectResourceDataTool, self).all_stat_data
+        # directory resources read the DirectoryData rollup of each TP
+        return DirectoryData.objects.filter(
+            directory__tp__project__code=self.project_code,
+            directory__tp_path=self.tp_path)
+
     @property
     def project_path(self):
         return (
@@ -43,6 +58,13 @@ class ProjectResourceDataTool(RelatedStoresDataTool):
             % (self.dir_path,
                self.filename))
 
+    def filter_accessible(self, qs):
+        if qs.model is DirectoryData:
+            return (
+                qs.exclude(directory__tp__project__disabled=True)
+                  .exclude(directory__obsolete=True))
+        return super(ProjectResourceDataTool, self).filter_accessible(qs)
+
     def filter_data(self, qs):
         return (
             qs.filter(store__translation_project__project__code=self.project_code)
@@ -55,8 +77,20 @@ class ProjectResourceDataTool(RelatedStoresDataTool):
 
 class ProjectSetDataTool(RelatedTPsDataTool):
     group_by = ("tp__project__code", )
+    rollup_group_by = ("directory__project__code", )
     cache_key_name = "projects"
 
+    def filter_rollups(self, stat_data):
+        """Returns the rollups of the projects in ``stat_data``"""
+        return DirectoryData.objects.filter(
+            directory__project__in=stat_data.values("tp__project"))
+
+    def filter_missing_rollups(self, stat_data):
+        """Returns the data of the projects in ``stat_data`` that have not
+        been rolled up yet
+        """
+        return stat_data.filter(tp__project__directory__data__isnull=True)
+
     def get_root_child_path(self, child):
         return child[self.group_by[0]]
 
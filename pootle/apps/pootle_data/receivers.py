@@ -8,15 +8,19 @@
 
 import logging
 
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
 from pootle.core.delegate import crud, data_tool, data_updater
 from pootle.core.signals import create, delete, update, update_data
+from pootle_language.models import Language
+from pootle_project.models import Project
 from pootle_store.models import Store
 from pootle_translationproject.models import TranslationProject
 
-from .models import StoreChecksData, StoreData, TPChecksData, TPData
+from .directory_data import RelatedTPsDirectoryDataUpdater
+from .models import (
+    DirectoryData, StoreChecksData, StoreData, TPChecksData, TPData)
 
 
 logger = logging.getLogger(__name__)
@@ -32,6 +36,16 @@ def handle_tp_data_obj_create(**kwargs):
     crud.get(TPData).create(**kwargs)
 
 
+@receiver(create, sender=DirectoryData)
+def handle_directory_data_obj_create(**kwargs):
+    crud.get(DirectoryData).create(**kwargs)
+
+
+@receiver(update, sender=DirectoryData)
+def handle_directory_data_obj_update(**kwargs):
+    crud.get(DirectoryData).update(**kwargs)
+
+
 @receiver(update, sender=StoreData)
 def handle_store_data_obj_update(**kwargs):
     crud.get(StoreData).update(**kwargs)
@@ -74,8 +88,16 @@ def handle_tp_checks_data_create(**kwargs):
 
 @receiver(post_save, sender=StoreData)
 def handle_storedata_save(**kwargs):
-    tp = kwargs["instance"].store.translation_project
-    update_data.send(tp.__class__, instance=tp)
+    store = kwargs["instance"].store
+    tp = store.translation_project
+    update_data.send(tp.__class__, instance=tp, stores=[store])
+
+
+@receiver(update_data, sender=DirectoryData)
+def handle_directory_data_update(**kwargs):
+    RelatedTPsDirectoryDataUpdater(
+        languages=kwargs.get("languages") or [],
+        projects=kwargs.get("projects") or []).update()
 
 
 @receiver(update_data, sender=Store)
@@ -91,6 +113,8 @@ def handle_tp_data_update(**kwargs):
         data_updater.get(TranslationProject)(
             tp,
             object_list=kwargs["object_list"]).update()
+    elif kwargs.get("stores") is not None:
+        data_tool.get(TranslationProject)(tp).update(stores=kwargs["stores"])
     else:
         data_tool.get(TranslationProject)(tp).update()
 
@@ -105,3 +129,24 @@ def handle_store_data_create(sender, instance, created, **kwargs):
 def handle_tp_data_create(sender, instance, created, **kwargs):
     if created:
         update_data.send(instance.__class__, instance=instance)
+
+
+@receiver(post_save, sender=Project)
+def handle_project_data_save(sender, instance, created, **kwargs):
+    if created:
+        return
+    # disabling a project changes the rollups of its languages
+    RelatedTPsDirectoryDataUpdater(
+        languages=Language.objects.filter(
+            translationproject__project=instance).distinct(),
+        projects=[instance]).update()
+
+
+@receiver(post_delete, sender=TranslationProject)
+def handle_tp_data_delete(sender, instance, **kwargs):
+    # the directories may be deleted along with the tp, so only existing
+    # rollups are updated
+    RelatedTPsDirectoryDataUpdater(
+        languages=Language.objects.filter(pk=instance.language_id),
+        projects=Project.objects.filter(pk=instance.project_id)).update(
+            add=False)
@@ -26,17 +26,20 @@ class StoreDataCRUD(BulkCRUD):
 
     def update_tps_and_revisions(self, stores):
         tps = {}
+        tp_stores = {}
         for store in stores:
             if store.translation_project_id not in tps:
                 tps[store.translation_project_id] = store.translation_project
+            tp_stores.setdefault(store.translation_project_id, []).append(store)
             update_revisions.send(
                 store.__class__,
                 instance=store,
                 keys=["stats", "checks"])
-        for tp in tps.values():
+        for tp_id, tp in tps.items():
             update_data.send(
                 tp.__class__,
-                instance=tp)
+                instance=tp,
+                stores=tp_stores[tp_id])
 
     def post_create(self, instance=None, objects=None, pre=None, result=None):
         if objects:
@@ -14,14 +14,53 @@ from pootle.core.decorators import persistent_property
 from pootle.core.delegate import revision
 from pootle.core.signals import update_data
 from pootle_data.models import StoreChecksData, StoreData
+from pootle_translationproject.models import TranslationProject
 
-from .models import TPChecksData, TPData
+from .directory_data import DirectoryDataUpdater
+from .models import DirectoryData, TPChecksData, TPData
 from .utils import DataUpdater, RelatedStoresDataTool
 
 
+def update_related_data(tps):
+    """Rolls up the TPData of ``tps`` into DirectoryData for their languages
+    and projects, and for all projects
+    """
+    languages = {}
+    projects = {}
+    for tp in tps:
+        languages[tp.language_id] = tp.language
+        projects[tp.project_id] = tp.project
+    if languages:
+        update_data.send(
+            DirectoryData,
+            languages=languages.values(),
+            projects=projects.values())
+
+
 class TPDataCRUD(BulkCRUD):
     model = TPData
 
+    def post_create(self, instance=None, objects=None, pre=None, result=None):
+        self.update_related(instance=instance, objects=objects)
+
+    def post_update(self, instance=None, objects=None, pre=None, result=None,
+                    values=None):
+        self.update_related(instance=instance, objects=objects)
+
+    def update_related(self, instance=None, objects=None):
+        """Rolls up the changed TPData into the languages and projects of
+        the TPs, once the data has been written
+        """
+        if instance is not None:
+            tp_ids = [instance.tp_id]
+        elif isinstance(objects, list):
+            tp_ids = [obj.tp_id for obj in objects]
+        else:
+            tp_ids = objects.values_list("tp_id", flat=True)
+        update_related_data(
+            TranslationProject.objects.filter(
+                id__in=set(tp_ids)).select_related("language", "project"))
+
 
 class TPChecksDataCRUD(BulkCRUD):
     model = TPChecksData
@@ -101,6 +140,16 @@ class TPDataUpdater(DataUpdater):
         return self.store_check_data_qs.values(
             "category", "name").annotate(count=Sum("count"))
 
+    def update(self, **kwargs):
+        # only the parent directories of changed stores are rolled up
+        stores = kwargs.pop("stores", None)
+        written = super(TPDataUpdater, self).update(**kwargs)
+        DirectoryDataUpdater(self.tool.context, stores=stores).update()
+        if not written:
+            # changed data is rolled up once it has been written, as the
+            # write may be deferred
+            update_related_data([self.tool.context])
+
 
 class TPDataTool(RelatedStoresDataTool):
     """Retrieves aggregate stats for a TP"""
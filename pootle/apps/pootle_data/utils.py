@@ -6,11 +6,14 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
+import json
+
 from django.db import models
 from django.db.models import Sum
 from django.utils.functional import cached_property
 
-from pootle.core.decorators import persistent_property
+from pootle.core.debug import instrument
+from pootle.core.decorators import persistent_property, replica_reads
 from pootle.core.delegate import data_updater, revision
 from pootle.core.signals import create, delete, update
 from pootle.core.url_helpers import split_pootle_path
@@ -19,7 +22,8 @@ from pootle_statistics.proxy import SubmissionProxy
 from pootle_store.models import Unit
 
 from .apps import PootleDataConfig
-from .models import StoreChecksData, StoreData, TPChecksData, TPData
+from .models import (
+    DirectoryData, StoreChecksData, StoreData, TPChecksData, TPData)
 
 
 SUM_FIELDS = (
@@ -187,46 +191,43 @@ class DataUpdater(object):
         return data
 
     def set_check_data(self, store_data=None):
+        """Diff the calculated checks against the existing check data,
+        keyed on (category, name), and send a single delete, update and
+        create for the changes
+        """
         checks = {}
         existing_checks = self.model.check_data.values_list(
             "pk", "category", "name", "count")
         for pk, category, name, count in existing_checks:
             checks[(category, name)] = (pk, count)
+        check_data_model = self.check_data_field.related_model
         to_update = []
         to_add = []
         for check in store_data["checks"]:
-            category = check["category"]
-            name = check["name"]
-            count = check["count"]
-            check_exists = (
-                checks.get((category, name)))
-            if not check_exists:
+            key = (check["category"], check["name"])
+            if key not in checks:
                 to_add.append(check)
                 continue
-            elif checks[(category, name)][1] != count:
-                to_update.append((checks[(category, name)][0], dict(count=count)))
-            del checks[(category, name)]
-        check_data = None
-        for category, name in checks.keys():
-            if check_data is None:
-                check_data = self.model.check_data.filter(
-                    category=category, name=name)
-            else:
-                check_data = check_data | self.model.check_data.filter(
-                    category=category, name=name)
+            pk, count = checks.pop(key)
+            if count != check["count"]:
+                to_update.append(
+                    check_data_model(pk=pk, count=check["count"]))
         if checks:
-            delete.send(check_data.model, objects=check_data)
+            delete.send(
+                check_data_model,
+                objects=check_data_model.objects.filter(
+                    pk__in=[pk for pk, __ in checks.values()]))
         if to_update:
-            to_update = dict(to_update)
             update.send(
-                self.model.check_data.model,
-                updates=to_update)
+                check_data_model,
+                objects=to_update,
+                update_fields=["count"])
         if not to_add:
             return
         create.send(
-            self.model.check_data.model,
+            check_data_model,
             objects=[
-                self.check_data_field.related_model(
+                check_data_model(
                     **{self.related_name: self.model,
                        "category": check["category"],
                        "name": check["name"],
@@ -244,6 +245,7 @@ class DataUpdater(object):
             setattr(self.data, k, v)
             return k
 
+    @instrument("pootle_data.update")
     def update(self, **kwargs):
         store_data = self.get_store_data(**kwargs)
         data_changed = set(
@@ -260,8 +262,11 @@ class DataUpdater(object):
                 self.data.__class__,
                 instance=self.data)
             self.model.data = self.data
+            return True
         elif data_changed:
             self.save_data(fields=data_changed)
+            return True
+        return False
 
     def save_data(self, fields=None):
         update.send(
@@ -340,6 +345,13 @@ class RelatedStoresDataTool(DataTool):
                self.context_name,
                self.rev_cache_key))
 
+    @property
+    def stale_cache_key(self):
+        return (
+            '%s.%s'
+            % (self.cache_key_name,
+               self.context_name))
+
     @property
     def child_stats_qs(self):
         """Aggregates grouped sum/max fields"""
@@ -454,6 +466,7 @@ class RelatedStoresDataTool(DataTool):
                      .annotate(*(self.aggregate_sum_fields
                                  + self.aggregate_max_fields)))
 
+    @replica_reads
     def get_checks(self, user=None):
         return (
             self.all_checks_data
@@ -492,6 +505,7 @@ class RelatedStoresDataTool(DataTool):
         self.aggregate_children(stats)
         return stats
 
+    @replica_reads
     def get_stats(self, include_children=True, aggregate=True, user=None):
         """Get stats for an object. If include_children is set it will
         also return stats for each of the immediate descendants.
@@ -594,10 +608,20 @@ class RelatedStoresDataTool(DataTool):
 
 
 class RelatedTPsDataTool(RelatedStoresDataTool):
+    """Reads child stats from the DirectoryData rollups of the child TPs,
+    and object stats from the rollup of the context's directory. These
+    rollups are kept up to date when TPData changes.
+    """
 
     group_by = (
         "tp__language__code",
         "tp__project__code")
+    rollup_group_by = (
+        "directory__tp__language__code",
+        "directory__tp__project__code")
+    info_fields = (
+        "last_created_unit_info",
+        "last_submission_info")
 
     @property
     def data_model(self):
@@ -610,5 +634,105 @@ class RelatedTPsDataTool(RelatedStoresDataTool):
     def checks_data_model(self):
         return TPChecksData.objects
 
+    @property
+    def all_child_stats_qs(self):
+        return self.get_rollup_stats(self.all_stat_data)
+
+    @property
+    def child_stats_qs(self):
+        return self.get_rollup_stats(self.stat_data)
+
+    @persistent_property
+    def object_stats(self):
+        rollup = DirectoryData.objects.filter(
+            directory_id=self.context.directory.id).values(
+                *self.sum_fields).first()
+        if rollup is None:
+            return self.get_object_stats(self.stat_data)
+        stats = {
+            self.stats_mapping.get(k, k): v
+            for k, v
+            in rollup.items()}
+        stats["last_submission"] = None
+        stats["last_created_unit"] = None
+        stats["suggestions"] = None
+        return stats
+
+    def filter_rollups(self, stat_data):
+        """Returns the rollups of the TPs in ``stat_data``"""
+        return DirectoryData.objects.filter(
+            directory__tp_path="/",
+            directory__tp__in=stat_data.values("tp"))
+
+    def filter_missing_rollups(self, stat_data):
+        """Returns the data of the TPs in ``stat_data`` that have not been
+        rolled up yet
+        """
+        return stat_data.filter(tp__directory__data__isnull=True)
+
+    def get_rollup_stats(self, stat_data):
+        rollups = list(
+            self.filter_rollups(stat_data).values(
+                *(self.rollup_group_by
+                  + self.max_fields
+                  + self.sum_fields
+                  + self.info_fields)))
+        # children without a rollup are aggregated from their data instead
+        missing = self.annotate_fields(
+            self.filter_missing_rollups(stat_data))
+        for child in missing:
+            rollup = dict(zip(
+                self.rollup_group_by,
+                (child[field] for field in self.group_by)))
+            rollup.update(
+                (k, child["%s__sum" % k])
+                for k in self.sum_fields)
+            rollup.update(
+                (k, child["%s__max" % k])
+                for k in self.max_fields)
+            rollup.update(
+                (k, None)
+                for k in self.info_fields)
+            rollups.append(rollup)
+        return rollups
+
+    def get_children_stats(self, qs):
+        children = {}
+        for child in qs:
+            root = self.add_child_stats(
+                children,
+                child,
+                root="-".join(child[field] for field in self.rollup_group_by),
+                use_aggregates=False)
+            if child["last_submission_info"]:
+                children[root]["last_submission"] = self.load_info(
+                    child["last_submission_info"])
+            children[root]["last_created_unit"] = self.load_info(
+                child["last_created_unit_info"])
+        # info that has not been stored yet is looked up
+        missing = {
+            k: child
+            for k, child in children.items()
+            if (child["last_submission__pk"]
+                and not child.get("last_submission"))}
+        if missing:
+            self.add_submission_info(qs, missing)
+        missing = {
+            k: child
+            for k, child in children.items()
+            if (child["last_created_unit__pk"]
+                and not child["last_created_unit"])}
+        if missing:
+            self.add_last_created_info(qs, missing)
+        for child in children.values():
+            child.pop("last_created_unit__pk", None)
+        return children
+
     def get_root_child_path(self, child):
         return "-".join(child[field] for field in self.group_by)
+
+    def load_info(self, info):
+        # stored info is returned from qs.values as serialized json
+        if isinstance(info, basestring):
+            return json.loads(info)
+        return info
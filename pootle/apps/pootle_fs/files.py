@@ -19,6 +19,7 @@ from pootle.core.proxy import AttributeProxy
 from pootle_statistics.models import SubmissionTypes
 from pootle_store.constants import POOTLE_WINS, SOURCE_WINS
 from pootle_store.models import Store
+from pootle_store.store.pool import parse_pool
 
 
 logger = logging.getLogger(__name__)
@@ -191,17 +192,37 @@ class FSFile(object):
         if self.file_exists:
             os.unlink(self.file_path)
 
-    def deserialize(self, create=False):
+    @property
+    def file_class(self):
+        if self.store:
+            return self.store.syncer.file_class
+
+    def parse_file(self, path):
+        with open(path) as f:
+            f = AttributeProxy(f)
+            f.location_root = self.store_fs.project.local_fs_path
+            return (
+                self.file_class(f)
+                if self.file_class
+                else getclass(f)(f.read()))
+
+    def deserialize(self, create=False, pooled=False):
+        """Parse the file, or if ``create`` is set and there is no file,
+        the serialized ``Store``.
+
+        If ``pooled`` is set the parsed file is shared with the parse pool,
+        and must not be modified.
+        """
         if not create and not self.file_exists:
             return
         if self.file_exists:
-            with open(self.file_path) as f:
-                f = AttributeProxy(f)
-                f.location_root = self.store_fs.project.local_fs_path
-                store_file = (
-                    self.store.syncer.file_class(f)
-                    if self.store and self.store.syncer.file_class
-                    else getclass(f)(f.read()))
+            store_file = (
+                parse_pool.parse(
+                    self.file_path,
+                    self.parse_file,
+                    parser_key=self.file_class or getclass)
+                if pooled
+                else self.parse_file(self.file_path))
             if store_file.units:
                 return store_file
         if self.store_exists:
@@ -227,7 +248,7 @@ class FSFile(object):
         """
         Update Pootle ``Store`` with the parsed FS file.
         """
-        tmp_store = self.deserialize()
+        tmp_store = self.deserialize(pooled=True)
         if not tmp_store:
             logger.warn("File staged for sync has disappeared: %s", self.path)
             return
@@ -22,9 +22,13 @@ from django.utils.lru_cache import lru_cache
 from pootle.core.delegate import (
     config, response as pootle_response, revision, state as pootle_state)
 from pootle_app.models import Directory
+from pootle_data.contextmanagers import batch_related_data
 from pootle_project.models import Project
+from pootle_revision.contextmanagers import batch_revisions
 from pootle_store.constants import POOTLE_WINS, SOURCE_WINS
+from pootle_store.contextmanagers import batch_new_stores
 from pootle_store.models import Store
+from pootle_store.store.pool import parse_pool
 
 from .apps import PootleFSConfig
 from .decorators import emits_state, responds_to_state
@@ -534,20 +538,22 @@ class Plugin(object):
         :param pootle_path: Pootle path glob to filter translations
         :returns response: Where ``response`` is an instance of self.respose_class
         """
-        self.sync_rm(
-            state, response, fs_path=fs_path, pootle_path=pootle_path)
-        if update in ["all", "pootle"]:
-            self.sync_merge(
-                state, response,
-                fs_path=fs_path,
-                pootle_path=pootle_path,
-                update=update)
-            self.sync_pull(
+        with batch_revisions(), batch_related_data(), batch_new_stores():
+            self.sync_rm(
                 state, response, fs_path=fs_path, pootle_path=pootle_path)
+            if update in ["all", "pootle"]:
+                self.sync_merge(
+                    state, response,
+                    fs_path=fs_path,
+                    pootle_path=pootle_path,
+                    update=update)
+                self.sync_pull(
+                    state, response, fs_path=fs_path, pootle_path=pootle_path)
         if update in ["all", "fs"]:
             self.sync_push(
                 state, response, fs_path=fs_path, pootle_path=pootle_path)
             self.push(response)
+        parse_pool.log_stats()
         sync_types = [
             "pushed_to_fs", "pulled_to_pootle",
             "merged_from_pootle", "merged_from_fs"]
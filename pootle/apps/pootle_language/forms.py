@@ -220,6 +220,11 @@ class LanguageSuggestionAdminForm(LanguageTeamFormtableForm):
             unit__store__translation_project__project__disabled=False,
             unit__store__obsolete=False)
 
+    def count_choices(self, choices):
+        if any(getattr(self, "_search_filters", {}).values()):
+            return choices.count()
+        return self.language_team.suggestion_count
+
     @property
     def filter_tp_qs(self):
         tps = self.language.translationproject_set.exclude(
@@ -6,10 +6,12 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
-from django.db.models.signals import post_save, pre_delete
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_save, pre_delete)
 from django.dispatch import receiver
 
-from pootle.core.delegate import revision_updater
+from pootle.core.delegate import language_team, revision_updater
+from pootle_app.models.permissions import PermissionSet
 
 from .models import Language
 
@@ -30,3 +32,21 @@ def lang_delete_handler(**kwargs):
     revision_context = instance.directory.parent
     updater = revision_updater.get(revision_context.__class__)
     updater(revision_context).update(["languages"])
+
+
+def _expire_language_team(directory_id):
+    language = Language.objects.filter(directory_id=directory_id).first()
+    if language:
+        language_team.get(Language)(language).update_revision()
+
+
+@receiver([post_save, post_delete], sender=PermissionSet)
+def permission_set_updated_handler(**kwargs):
+    _expire_language_team(kwargs["instance"].directory_id)
+
+
+@receiver(m2m_changed, sender=PermissionSet.positive_permissions.through)
+def permission_set_permissions_updated_handler(**kwargs):
+    if kwargs["reverse"] or not kwargs["action"].startswith("post_"):
+        return
+    _expire_language_team(kwargs["instance"].directory_id)
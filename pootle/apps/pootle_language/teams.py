@@ -6,18 +6,30 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
+import uuid
+
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Permission
+from django.db.models import Sum
+from django.db.models.functions import Coalesce
 from django.utils.functional import cached_property
 
+from pootle.core.decorators import persistent_property
+from pootle.core.delegate import revision
+from pootle_data.models import StoreData
 from pootle_store.constants import OBSOLETE
 from pootle_store.models import Suggestion
 
+from .apps import PootleLanguageConfig
+
 
 User = get_user_model()
 
 
 class LanguageTeam(object):
+    ns = "pootle.language.team"
+    sw_version = PootleLanguageConfig.version
+
     # this shouldnt be a dict
     roles = dict(
         member=["suggest"],
@@ -28,6 +40,25 @@ class LanguageTeam(object):
     def __init__(self, language):
         self.language = language
 
+    @property
+    def revision_context(self):
+        return revision.get(
+            self.language.directory.__class__)(self.language.directory)
+
+    @cached_property
+    def cache_key(self):
+        return (
+            "%s.%s"
+            % (self.language.code,
+               self.revision_context.get(key="team")))
+
+    @cached_property
+    def suggestions_cache_key(self):
+        return (
+            "%s.%s"
+            % (self.language.code,
+               self.revision_context.get(key="stats")))
+
     @property
     def admins(self):
         return self._get_members("administrate")
@@ -46,8 +77,8 @@ class LanguageTeam(object):
 
     def add_member(self, user, role):
         permission_set = self.get_permission_set(user, create=True)
-        for permission in self.get_permissions_for_role(role):
-            permission_set.positive_permissions.add(permission)
+        permission_set.positive_permissions.add(
+            *self.get_permissions_for_role(role))
         self.update_permissions()
 
     def get_permissions_for_role(self, role):
@@ -68,7 +99,11 @@ class LanguageTeam(object):
     @property
     def non_members(self):
         return User.objects.exclude(
-            pk__in=self._get_members("suggest").values_list("id", flat=True))
+            pk__in=[
+                user
+                for user, permissions
+                in self.roster.items()
+                if "suggest" in permissions])
 
     @property
     def suggestions(self):
@@ -87,11 +122,40 @@ class LanguageTeam(object):
         return suggestions.order_by("-creation_time", "-pk")
 
     @property
-    def users_with_suggestions(self):
+    def suggestion_count(self):
+        """Count of pending suggestions, summed from the pending suggestion
+        counts maintained for the team's stores.
+        """
+        store_data = StoreData.objects.filter(
+            store__translation_project__language=self.language,
+            store__obsolete=False)
+        store_data = store_data.exclude(
+            store__translation_project__project__disabled=True)
+        return store_data.aggregate(
+            count=Coalesce(Sum("pending_suggestions"), 0))["count"]
+
+    def get_suggestions(self, offset=0, limit=10):
+        """Return a page of the pending suggestions, newest first.
+
+        The page is selected on the suggestion ids alone, and only the
+        rows for the page are joined to their units and stores.
+        """
+        page = list(
+            self.suggestions.select_related(None).values_list(
+                "id", flat=True)[offset:offset + limit])
+        return sorted(
+            self.suggestions.filter(id__in=page),
+            key=lambda suggestion: page.index(suggestion.id))
+
+    def _users_with_suggestions(self):
         return set(
             self.suggestions.values_list(
                 "user__username",
                 "user__full_name"))
+    users_with_suggestions = persistent_property(
+        _users_with_suggestions,
+        name="users_with_suggestions",
+        key_attr="suggestions_cache_key")
 
     @property
     def superusers(self):
@@ -103,17 +167,33 @@ class LanguageTeam(object):
             "positive_permissions__codename",
             "user")
 
-    def _get_members(self, perm=None, exclude_perms=()):
-        members = set()
-        not_members = set()
+    @persistent_property
+    def roster(self):
+        """Permissions of each user with a permission set for the team,
+        keyed by user id.
+        """
+        roster = {}
         for (permission, user) in self.permissions:
-            if permission == perm:
-                members.add(user)
-            if permission in exclude_perms:
-                not_members.add(user)
-        return User.objects.filter(
-            pk__in=members - not_members).order_by("username")
+            roster[user] = roster.get(user, set())
+            if permission:
+                roster[user].add(permission)
+        return roster
+
+    def _get_members(self, perm=None, exclude_perms=()):
+        exclude_perms = set(exclude_perms)
+        members = [
+            user
+            for user, permissions
+            in self.roster.items()
+            if perm in permissions and not permissions & exclude_perms]
+        return User.objects.filter(pk__in=members).order_by("username")
 
     def update_permissions(self):
-        if "permissions" in self.__dict__:
-            del self.__dict__["permissions"]
+        for k in ["permissions", "roster", "cache_key"]:
+            if k in self.__dict__:
+                del self.__dict__[k]
+
+    def update_revision(self):
+        """Expire the cached roster for the team."""
+        self.revision_context.set(keys=["team"], value=uuid.uuid4().hex)
+        self.update_permissions()
@@ -302,7 +302,7 @@ class LanguageTeamAdminFormView(PootleLanguageAdminFormView):
             if k in stats:
                 stats[k + "_display"] = formatter.number(stats[k])
         context["stats"] = stats
-        context["suggestions"] = form.language_team.suggestions.count()
+        context["suggestions"] = form.language_team.suggestion_count
         context["suggestions_display"] = formatter.number(
             context["suggestions"])
         context["language"] = self.language
@@ -6,10 +6,16 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
+from itertools import islice
+from operator import itemgetter
+
 from django.contrib.auth import get_user_model
+from django.db.models import Value
+from django.db.models.functions import Coalesce
 from django.utils.functional import cached_property
 
-from pootle.core.delegate import comparable_event
+from pootle.core.debug import instrument
+from pootle.core.decorators import replica_reads
 from pootle.core.proxy import BaseProxy
 from pootle_statistics.models import (
     Submission, SubmissionFields, SubmissionTypes)
@@ -28,6 +34,38 @@ class LogEvent(object):
         self.old_value = old_value
         self.revision = revision
 
+    @property
+    def sort_key(self):
+        """Key ordering events by time, then by revision for events at the
+        same time, and then by unit and event object.
+        """
+        return (
+            self.timestamp,
+            self.revision or 0,
+            self.unit.pk,
+            self.value.pk)
+
+
+def merge_events(streams, reverse=False):
+    """Merge event `streams` that are each already ordered by
+    `LogEvent.sort_key` into a single ordered stream.
+    """
+    pick = max if reverse else min
+    heads = []
+    for i, stream in enumerate(streams):
+        stream = iter(stream)
+        event = next(stream, None)
+        if event is not None:
+            heads.append([event.sort_key, i, event, stream])
+    while heads:
+        head = pick(heads, key=itemgetter(0, 1))
+        yield head[2]
+        event = next(head[3], None)
+        if event is None:
+            heads.remove(head)
+        else:
+            head[0], head[2] = event.sort_key, event
+
 
 class ComparableLogEvent(BaseProxy):
 
@@ -72,6 +110,14 @@ class ComparableLogEvent(BaseProxy):
 class Log(object):
     include_meta = False
 
+    # db orderings matching `LogEvent.sort_key` for each event source
+    event_orderings = dict(
+        unit_source=("unit__creation_time", "unit_id", "id"),
+        submission=(
+            "creation_time", Coalesce("revision", Value(0)), "unit_id", "id"),
+        suggestion_created=("creation_time", "unit_id", "id"),
+        suggestion_reviewed=("review_time", "unit_id", "id"))
+
     @property
     def source_qs(self):
         return UnitSource.objects
@@ -225,7 +271,12 @@ class Log(object):
         return created_units
 
     def get_created_unit_events(self, **kwargs):
-        for created_unit in self.filtered_created_units(**kwargs):
+        created_units = self.filtered_created_units(**kwargs)
+        for event in self.created_unit_events(created_units):
+            yield event
+
+    def created_unit_events(self, created_units):
+        for created_unit in created_units:
             yield self.event(
                 created_unit.unit,
                 created_unit.created_by,
@@ -234,7 +285,12 @@ class Log(object):
                 created_unit)
 
     def get_submission_events(self, **kwargs):
-        for submission in self.filtered_submissions(**kwargs):
+        submissions = self.filtered_submissions(**kwargs)
+        for event in self.submission_events(submissions):
+            yield event
+
+    def submission_events(self, submissions):
+        for submission in submissions:
             event_name = "state_changed"
             if submission.field == SubmissionFields.CHECK:
                 event_name = (
@@ -256,19 +312,28 @@ class Log(object):
                 revision=submission.revision)
 
     def get_suggestion_events(self, **kwargs):
+        suggestions = self.filtered_suggestions(**kwargs)
+        for event in self.suggestion_events(suggestions, **kwargs):
+            yield event
+
+    def suggestion_events(self, suggestions, created=True, reviewed=True,
+                          **kwargs):
         users = kwargs.get("users")
-        for suggestion in self.filtered_suggestions(**kwargs):
+        for suggestion in suggestions:
             add_event = (
-                ((not kwargs.get("start")
-                  or (suggestion.creation_time
-                      and suggestion.creation_time >= kwargs.get("start")))
-                 and (not kwargs.get("end")
+                created
+                and ((not kwargs.get("start")
                       or (suggestion.creation_time
-                          and suggestion.creation_time < kwargs.get("end")))
-                 and (not users
-                      or (suggestion.user_id in users))))
+                          and (suggestion.creation_time
+                               >= kwargs.get("start"))))
+                     and (not kwargs.get("end")
+                          or (suggestion.creation_time
+                              and suggestion.creation_time < kwargs.get("end")))
+                     and (not users
+                          or (suggestion.user_id in users))))
             review_event = (
-                not suggestion.is_pending
+                reviewed
+                and not suggestion.is_pending
                 and ((not kwargs.get("start")
                       or (suggestion.review_time
                           and suggestion.review_time >= kwargs.get("start")))
@@ -296,6 +361,8 @@ class Log(object):
                     event_name,
                     suggestion)
 
+    @instrument("pootle_log.get_events")
+    @replica_reads
     def get_events(self, **kwargs):
         event_sources = kwargs.pop("event_sources",
                                    ("submission", "suggestion", "unit_source"))
@@ -309,6 +376,67 @@ class Log(object):
             for event in self.get_submission_events(**kwargs):
                 yield event
 
+    def order_events(self, qs, source, reverse=False):
+        ordering = []
+        for field in self.event_orderings[source]:
+            if isinstance(field, basestring):
+                ordering.append(("-%s" if reverse else "%s") % field)
+            else:
+                ordering.append(field.desc() if reverse else field.asc())
+        return qs.order_by(*ordering)
+
+    @instrument("pootle_log.get_sorted_events")
+    @replica_reads
+    def get_sorted_events(self, reverse=False, offset=0, limit=None,
+                          **kwargs):
+        """Yield events ordered by `LogEvent.sort_key`.
+
+        Each event source is read from a db cursor in the same order and
+        the cursors are merged, so events are not sorted in memory.
+        """
+        event_sources = kwargs.pop("event_sources",
+                                   ("submission", "suggestion", "unit_source"))
+        kwargs.pop("ordered", None)
+        stop = (offset + limit) if limit is not None else None
+
+        def _ordered(qs, source, sliceable=False):
+            qs = self.order_events(qs, source, reverse=reverse)
+            if sliceable and stop is not None:
+                # each row is an event, so no more than `stop` are needed
+                qs = qs[:stop]
+            return qs.iterator()
+
+        streams = []
+        if "unit_source" in event_sources:
+            streams.append(
+                self.created_unit_events(
+                    _ordered(
+                        self.filtered_created_units(**kwargs),
+                        "unit_source",
+                        sliceable=True)))
+        if "suggestion" in event_sources:
+            suggestions = self.filtered_suggestions(**kwargs)
+            streams.append(
+                self.suggestion_events(
+                    _ordered(suggestions, "suggestion_created"),
+                    reviewed=False,
+                    **kwargs))
+            streams.append(
+                self.suggestion_events(
+                    _ordered(suggestions, "suggestion_reviewed"),
+                    created=False,
+                    **kwargs))
+        if "submission" in event_sources:
+            streams.append(
+                self.submission_events(
+                    _ordered(
+                        self.filtered_submissions(**kwargs),
+                        "submission",
+                        sliceable=True)))
+        events = merge_events(streams, reverse=reverse)
+        for event in islice(events, offset, stop):
+            yield event
+
 
 class StoreLog(Log):
     include_meta = True
@@ -365,14 +493,11 @@ class GroupedEvents(object):
         self.log = log
 
     def sorted_events(self, start=None, end=None, users=None, reverse=False):
-        comparable_event_class = comparable_event.get(self.log.__class__)
-        events = sorted(
-            (comparable_event_class(x)
-             for x in self.log.get_events(start=start,
-                                          end=end,
-                                          users=users)), reverse=reverse)
-        for event in events:
-            yield event
+        return self.log.get_sorted_events(
+            start=start,
+            end=end,
+            users=users,
+            reverse=reverse)
 
 
 class UserLog(Log):
@@ -11,8 +11,7 @@ from datetime import timedelta
 from django.utils import timezone
 from django.utils.functional import cached_property
 
-from pootle.core.delegate import (
-    comparable_event, log, membership, scores, site_languages)
+from pootle.core.delegate import log, membership, scores, site_languages
 from pootle.core.utils.templates import render_as_template
 from pootle.i18n.gettext import ugettext_lazy as _
 
@@ -50,15 +49,8 @@ class UserProfile(object):
             else _("Anonymous User"))
 
     def get_events(self, start=None, n=None):
-        sortable = comparable_event.get(self.log.__class__)
         start = start or (timezone.now() - timedelta(days=30))
-        events = sorted(
-            sortable(ev)
-            for ev
-            in self.log.get_events(start=start))
-        if n is not None:
-            events = events[-n:]
-        return reversed(events)
+        return self.log.get_sorted_events(start=start, reverse=True, limit=n)
 
 
 class UserMembership(object):
@@ -12,12 +12,14 @@ from django.forms.models import BaseModelFormSet
 
 from django_rq.queues import get_queue
 
+from pootle.core.contextmanagers import replica_scope
 from pootle.core.utils.db import useable_connection
 from pootle.i18n.gettext import ugettext as _
 from pootle_config.utils import ObjectConfig
 from pootle_language.models import Language
 from pootle_misc.forms import LiberalModelChoiceField
 from pootle_project.models import Project
+from pootle_store.contextmanagers import batch_new_stores
 from pootle_translationproject.models import TranslationProject
 from pootle_translationproject.signals import (tp_init_failed_async,
                                                tp_inited_async)
@@ -28,7 +30,7 @@ def update_translation_project(tp, response_url):
     as RQ job.
     """
     try:
-        with useable_connection():
+        with replica_scope(), useable_connection(), batch_new_stores():
             tp.init_from_templates()
     except Exception as e:
         tp_init_failed_async.send(sender=tp.__class__, instance=tp)
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+from contextlib import contextmanager
+
+from django.dispatch import receiver
+
+from pootle.core.contextmanagers import keep_data
+from pootle.core.signals import update_revisions
+
+from .models import Revision
+from .utils import RevisionBatch
+
+
+@contextmanager
+def batch_revisions():
+    """Coalesce revision updates for the duration of the context.
+
+    The parent paths and keys of any revisions updated are collected, and on
+    exit a single new revision is set for each of them.
+
+    If used inside another ``batch_revisions`` context the collected updates
+    are passed on to the outer batch. If used inside a transaction, the
+    revisions are written as part of that transaction.
+    """
+    batch = RevisionBatch()
+
+    with keep_data(signals=(update_revisions, )):
+
+        @receiver(update_revisions)
+        def handle_update_revisions(sender, **kwargs):
+            if "batch" in kwargs:
+                batch.merge(kwargs["batch"])
+            else:
+                batch.add(sender, **kwargs)
+        yield batch
+    if batch:
+        update_revisions.send(
+            Revision,
+            batch=batch)
@@ -6,7 +6,9 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
-from django.db.models.signals import post_save, pre_delete
+from django.core.signals import (
+    got_request_exception, request_finished, request_started)
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import receiver
 
 from pootle.core.delegate import crud, revision_updater
@@ -18,6 +20,7 @@ from pootle_store.models import Store
 from pootle_translationproject.models import TranslationProject
 
 from .models import Revision
+from .utils import revision_cache
 
 
 @receiver(create, sender=Revision)
@@ -30,6 +33,21 @@ def handle_store_data_obj_update(**kwargs):
     crud.get(Revision).update(**kwargs)
 
 
+@receiver(request_started)
+def handle_request_started(**kwargs):
+    revision_cache.activate()
+
+
+@receiver([got_request_exception, request_finished])
+def handle_request_finished(**kwargs):
+    revision_cache.deactivate()
+
+
+@receiver([post_delete, post_save], sender=Revision)
+def handle_revision_change(**kwargs):
+    revision_cache.clear()
+
+
 @receiver(post_save, sender=StoreData)
 def handle_storedata_save(**kwargs):
     update_revisions.send(
@@ -38,6 +56,11 @@ def handle_storedata_save(**kwargs):
         keys=["stats", "checks"])
 
 
+@receiver(update_revisions, sender=Revision)
+def handle_revision_batch(**kwargs):
+    kwargs["batch"].flush()
+
+
 @receiver(update_revisions, sender=Store)
 def handle_store_revision_update(**kwargs):
     revision_updater.get(Store)(
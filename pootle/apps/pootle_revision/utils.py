@@ -6,12 +6,15 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
+import threading
 import uuid
 
 from django.contrib.contenttypes.models import ContentType
 from django.utils.functional import cached_property
 
 from pootle.core.bulk import BulkCRUD
+from pootle.core.debug import instrument
+from pootle.core.delegate import revision_updater
 from pootle.core.signals import create, update
 from pootle.core.url_helpers import split_pootle_path
 from pootle_app.models import Directory
@@ -20,9 +23,81 @@ from pootle_translationproject.models import TranslationProject
 from .models import Revision
 
 
+class RevisionCache(threading.local):
+    """Request-scoped store of revision values.
+
+    Revisions are looked up by (content_type_id, object_id) and all keys for
+    an object are fetched together. For directories, the revisions of all
+    parent directories are fetched at the same time, as they are generally
+    required in the same request.
+    """
+
+    def __init__(self):
+        self.active = False
+        self.revisions = {}
+
+    def activate(self):
+        self.revisions = {}
+        self.active = True
+
+    def deactivate(self):
+        self.revisions = {}
+        self.active = False
+
+    def clear(self):
+        self.revisions = {}
+
+    def get_parent_paths(self, pootle_path):
+        paths = ["/"]
+        for name in pootle_path.strip("/").split("/"):
+            if name:
+                paths.append("%s%s/" % (paths[-1], name))
+        return paths
+
+    def prefetch(self, revisions):
+        content_type_id = revisions.content_type.id
+        instance = revisions.instance
+        if isinstance(instance, Directory):
+            object_ids = [
+                str(pk)
+                for pk
+                in Directory.objects.filter(
+                    pootle_path__in=self.get_parent_paths(
+                        instance.pootle_path)).values_list("pk", flat=True)]
+        else:
+            object_ids = [str(instance.pk)]
+        for object_id in object_ids:
+            self.revisions[(content_type_id, object_id)] = {}
+        qs = Revision.objects.filter(
+            content_type_id=content_type_id,
+            object_id__in=object_ids)
+        for object_id, key, value in qs.values_list("object_id", "key", "value"):
+            self.revisions[(content_type_id, object_id)][key] = value
+        return self.revisions.setdefault(
+            (content_type_id, str(instance.pk)), {})
+
+    def get(self, revisions, key=None):
+        cache_key = (revisions.content_type.id, str(revisions.instance.pk))
+        if cache_key not in self.revisions:
+            return self.prefetch(revisions).get(key) or ""
+        return self.revisions[cache_key].get(key) or ""
+
+
+revision_cache = RevisionCache()
+
+
 class RevisionCRUD(BulkCRUD):
     model = Revision
 
+    def post_create(self, **kwargs):
+        revision_cache.clear()
+
+    def post_delete(self, **kwargs):
+        revision_cache.clear()
+
+    def post_update(self, **kwargs):
+        revision_cache.clear()
+
 
 class RevisionContext(object):
 
@@ -42,11 +117,14 @@ class RevisionContext(object):
         """get a revision from db or set one if not set"""
         if not self.revision_context:
             return ""
+        if revision_cache.active:
+            return revision_cache.get(self.revision_context, key)
         return self.revision_context.filter(
             key=key).values_list("value", flat=True).first() or ""
 
     def set(self, keys=None, value=None):
         """get a revision from db or set one if not set"""
+        revision_cache.clear()
         self.revision_context.filter(key__in=keys).delete()
         if value:
             revisions = []
@@ -88,10 +166,7 @@ class ProjectSetRevision(RevisionContext):
 
     @property
     def revision_context(self):
-        first_project = self.context.children.first()
-        if not first_project:
-            return
-        return first_project.directory.parent.revisions
+        return self.context.directory.revisions
 
 
 class TPRevision(RevisionContext):
@@ -168,16 +243,28 @@ class RevisionUpdater(object):
             key__in=keys or [""],
             object_id__in=parents)
 
+    @instrument("pootle_revision.update")
     def update(self, keys=None):
         parents = list(self.parents.values_list("id", flat=True))
-        revisions = self.get_revisions(parents, keys=keys)
+        self.update_revisions(
+            {key: parents for key in keys or [""]})
+
+    def update_revisions(self, revisions):
+        """Set a new revision for the parent ids listed against each key.
+
+        :param revisions: a dictionary of ``key: parent_ids``
+        """
+        parents = set()
+        for key_parents in revisions.values():
+            parents |= set(key_parents)
+        existing = self.get_revisions(parents, keys=revisions.keys())
         missing_revisions = []
         existing_ids = []
         revision_map = {
             '%s-%s' % (x['object_id'], x['key']): x['id']
-            for x in revisions.values("id", "object_id", "key")}
-        for parent in parents:
-            for key in keys or [""]:
+            for x in existing.values("id", "object_id", "key")}
+        for key, key_parents in revisions.items():
+            for parent in key_parents:
                 id = '%s-%s' % (parent, key)
                 if id in revision_map:
                     existing_ids.append(revision_map[id])
@@ -209,6 +296,50 @@ class RevisionUpdater(object):
                 value=new_revision)
 
 
+class RevisionBatch(object):
+    """Collects the parent paths and keys of revision updates, so that they
+    can be written together.
+    """
+
+    def __init__(self):
+        self.paths = {}
+
+    def __len__(self):
+        return len(self.paths)
+
+    def add(self, sender, instance=None, object_list=None, paths=None,
+            keys=None, **kwargs):
+        updater_class = revision_updater.get(sender)
+        if not updater_class:
+            return
+        updater = updater_class(
+            context=instance,
+            object_list=object_list,
+            paths=paths)
+        parent_paths = set(
+            updater.get_parent_paths(updater.all_pootle_paths))
+        for key in keys or [""]:
+            self.paths[key] = self.paths.get(key, set()) | parent_paths
+
+    def merge(self, batch):
+        for key, paths in batch.paths.items():
+            self.paths[key] = self.paths.get(key, set()) | paths
+
+    def flush(self):
+        if not self.paths:
+            return
+        all_paths = set()
+        for paths in self.paths.values():
+            all_paths |= paths
+        parents = dict(
+            Directory.objects.filter(
+                pootle_path__in=all_paths).values_list("pootle_path", "id"))
+        RevisionUpdater().update_revisions(
+            {key: [parents[path] for path in paths if path in parents]
+             for key, paths in self.paths.items()})
+        self.paths = {}
+
+
 class UnitRevisionUpdater(RevisionUpdater):
     related_pootle_path = "store__parent__pootle_path"
 
@@ -14,6 +14,7 @@ from django.contrib.auth import get_user_model
 from django.db.models import Sum
 from django.utils.functional import cached_property
 
+from pootle.core.contextmanagers import replica_safe
 from pootle.core.decorators import persistent_property
 from pootle.core.delegate import display, revision, scores
 from pootle.core.utils.timezone import localdate, make_aware
@@ -62,8 +63,9 @@ class Scores(object):
         return now - timedelta(days), now
 
     def scores_within_days(self, days):
-        return self.score_model.filter(
-            date__range=self.get_daterange(days))
+        with replica_safe() as db:
+            return self.score_model.using(db).filter(
+                date__range=self.get_daterange(days))
 
     def get_scores(self, days):
         return self.filter_scores(self.scores_within_days(days))
@@ -113,6 +115,10 @@ class LanguageScores(Scores):
                localdate(),
                self.revision))
 
+    @property
+    def stale_cache_key(self):
+        return self.context.code
+
     def filter_scores(self, qs):
         return qs.filter(tp__language_id=self.context.id)
 
@@ -128,6 +134,10 @@ class ProjectScores(Scores):
                localdate(),
                self.revision))
 
+    @property
+    def stale_cache_key(self):
+        return self.context.code
+
     def filter_scores(self, qs):
         return qs.filter(tp__project_id=self.context.id)
 
@@ -142,6 +152,10 @@ class ProjectSetScores(Scores):
             % (localdate(),
                self.revision))
 
+    @property
+    def stale_cache_key(self):
+        return "all"
+
 
 class TPScores(Scores):
     ns = "pootle.score.tp"
@@ -155,6 +169,13 @@ class TPScores(Scores):
                localdate(),
                self.revision))
 
+    @property
+    def stale_cache_key(self):
+        return (
+            "%s/%s"
+            % (self.context.language.code,
+               self.context.project.code))
+
     def filter_scores(self, qs):
         return qs.filter(tp_id=self.context.id)
 
@@ -170,6 +191,10 @@ class UserScores(Scores):
                localdate(),
                self.revision))
 
+    @property
+    def stale_cache_key(self):
+        return self.context.id
+
     @property
     def revision(self):
         return revision.get(Directory)(
@@ -11,12 +11,13 @@ from contextlib import contextmanager
 from django.dispatch import receiver
 
 from pootle.core.contextmanagers import bulk_operations, keep_data
+from pootle.core.delegate import store_batch
 from pootle.core.signals import (
     update_checks, update_data, update_revisions, update_scores)
 from pootle_data.models import StoreChecksData, StoreData, TPChecksData, TPData
 from pootle_score.models import UserStoreScore
 
-from .models import Unit
+from .models import Store, Unit
 
 
 class Updated(object):
@@ -104,3 +105,16 @@ def update_store_after(sender, **kwargs):
         kwargs.update(kwargs.pop("kwargs"))
     kwargs.get("callback", _callback_handler)(
         sender, updated, **kwargs)
+
+
+@contextmanager
+def batch_new_stores():
+    """Let installed apps defer per-Store work, such as adding Stores to
+    vfolders, for Stores created in the context
+    """
+    batch = store_batch.get(Store)
+    if batch is None:
+        yield
+        return
+    with batch():
+        yield
@@ -13,6 +13,7 @@ from collections import OrderedDict
 from django.db import models
 from django.utils.functional import cached_property
 
+from pootle.core.debug import instrument
 from pootle.core.delegate import format_diffs
 
 from .constants import FUZZY, OBSOLETE, TRANSLATED, UNTRANSLATED
@@ -283,6 +284,7 @@ class StoreDiff(object):
                 if (unit['revision'] > self.source_revision
                     and unit["state"] != OBSOLETE)]
 
+    @instrument("pootle_store.diff")
     def diff(self):
         """Return a dictionary of change actions or None if there are no
         changes to be made.
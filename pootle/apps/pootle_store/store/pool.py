@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class ParsePool(object):
+    """Per-process pool of already parsed translation files.
+
+    Files are keyed by their path, the parser used, and their size, mtime
+    and inode, so a file that changes on disk is parsed again.
+
+    When the pool is full the least recently used
+    ``1/PARSE_POOL_CULL_FREQUENCY`` of the files are removed.
+
+    Parsed files are shared, so callers must not modify them.
+    """
+
+    def __init__(self, size=None, cull_frequency=None):
+        self._size = size
+        self._cull_frequency = cull_frequency
+        self.files = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.files)
+
+    @property
+    def size(self):
+        if self._size is not None:
+            return self._size
+        return getattr(settings, "PARSE_POOL_SIZE", 40)
+
+    @property
+    def cull_frequency(self):
+        if self._cull_frequency is not None:
+            return self._cull_frequency
+        return getattr(settings, "PARSE_POOL_CULL_FREQUENCY", 4)
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return float(self.hits) / total if total else 0.0
+
+    @property
+    def stats(self):
+        return dict(
+            files=len(self),
+            hits=self.hits,
+            misses=self.misses,
+            hit_rate=self.hit_rate)
+
+    def clear(self):
+        with self.lock:
+            self.files.clear()
+            self.hits = self.misses = 0
+
+    def cull(self):
+        count = max(len(self.files) // max(self.cull_frequency, 1), 1)
+        for k in list(self.files.keys())[:count]:
+            del self.files[k]
+
+    def get_key(self, path, parser_key):
+        stat = os.stat(path)
+        return (
+            path,
+            parser_key,
+            stat.st_size,
+            stat.st_mtime,
+            stat.st_ino)
+
+    def parse(self, path, parser, parser_key=None):
+        """Returns the parsed file at ``path``, calling ``parser(path)`` to
+        parse it if its not already in the pool.
+
+        ``parser_key`` identifies the parser, and defaults to the parser.
+        """
+        if self.size <= 0:
+            return parser(path)
+        key = self.get_key(
+            path,
+            parser if parser_key is None else parser_key)
+        with self.lock:
+            if key in self.files:
+                self.hits += 1
+                parsed = self.files.pop(key)
+                self.files[key] = parsed
+                return parsed
+            self.misses += 1
+        parsed = parser(path)
+        with self.lock:
+            if len(self.files) >= self.size:
+                self.cull()
+            self.files[key] = parsed
+        return parsed
+
+    def log_stats(self):
+        logger.debug(
+            "Parse pool: %(files)s files, %(hits)s hits, "
+            "%(misses)s misses (%(hit_rate).0f%% hit rate)",
+            dict(self.stats, hit_rate=self.hit_rate * 100))
+
+
+parse_pool = ParsePool()
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+from collections import OrderedDict
+
+from django.utils.functional import cached_property
+
+from pootle_app.models.permissions import get_matching_permissions
+from pootle_statistics.models import Submission, SubmissionFields
+from pootle_store.constants import TRANSLATED
+from pootle_store.models import QualityCheck, Suggestion, Unit
+
+from .altsrc import AltSrcUnitProxy, AltSrcUnits
+
+
+class UnitEditBundle(object):
+    """Retrieves the data needed to edit a set of units, fetching each kind
+    of related data for all of the units together.
+    """
+
+    permission_codenames = (
+        "administrate",
+        "review",
+        "suggest",
+        "translate")
+
+    def __init__(self, units, user, alt_src_langs=None):
+        self.units = OrderedDict((unit.id, unit) for unit in units)
+        self.user = user
+        # alternative source languages keyed by TP id
+        self.alt_src_langs = alt_src_langs or {}
+        self._permissions = {}
+
+    @cached_property
+    def alt_srcs(self):
+        groups = {}
+        for unit in self.units.values():
+            langs = self.alt_src_langs.get(unit.store.translation_project_id)
+            if not langs:
+                continue
+            project_id = unit.store.translation_project.project_id
+            key = (project_id, tuple(sorted(lang.id for lang in langs)))
+            groups[key] = groups.get(key, [])
+            groups[key].append(unit)
+        alt_srcs = {}
+        for (project_id, language_ids), units in groups.items():
+            matches = {}
+            qs = Unit.objects.filter(
+                unitid_hash__in=set(unit.unitid_hash for unit in units),
+                store__translation_project__project_id=project_id,
+                store__translation_project__language_id__in=language_ids,
+                state=TRANSLATED)
+            for altsrc in qs.values(*(AltSrcUnits.fields | {"unitid_hash"})):
+                matches[altsrc["unitid_hash"]] = (
+                    matches.get(altsrc["unitid_hash"], [])
+                    + [AltSrcUnitProxy(altsrc)])
+            for unit in units:
+                alt_srcs[unit.id] = matches.get(unit.unitid_hash, [])
+        return alt_srcs
+
+    @cached_property
+    def checks(self):
+        checks = {}
+        qs = QualityCheck.objects.filter(unit_id__in=self.units.keys())
+        for check in qs:
+            checks[check.unit_id] = checks.get(check.unit_id, []) + [check]
+        return checks
+
+    @cached_property
+    def latest_target_submissions(self):
+        submissions = {}
+        qs = (
+            Submission.objects.select_related("suggestion__user")
+                              .filter(unit_id__in=self.units.keys(),
+                                      field=SubmissionFields.TARGET)
+                              .order_by("-creation_time", "-id"))
+        for submission in qs:
+            submissions.setdefault(submission.unit_id, submission)
+        return submissions
+
+    @cached_property
+    def suggestions(self):
+        suggestions = {}
+        qs = (
+            Suggestion.objects.pending()
+                              .select_related("user")
+                              .filter(unit_id__in=self.units.keys()))
+        for suggestion in qs:
+            suggestions[suggestion.unit_id] = (
+                suggestions.get(suggestion.unit_id, []) + [suggestion])
+        return suggestions
+
+    def get_matching_permissions(self, directory):
+        if directory.pk not in self._permissions:
+            self._permissions[directory.pk] = (
+                get_matching_permissions(self.user, directory) or [])
+        return self._permissions[directory.pk]
+
+    def get_permissions(self, directory):
+        permissions = self.get_matching_permissions(directory)
+        return {
+            codename: (self.user.is_superuser
+                       or "administrate" in permissions
+                       or codename in permissions)
+            for codename in self.permission_codenames}
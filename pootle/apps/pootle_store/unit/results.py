@@ -13,9 +13,8 @@ from django.urls import reverse
 from pootle.core.url_helpers import split_pootle_path
 from pootle.i18n.gettext import language_dir
 from pootle_store.constants import FUZZY
+from pootle_store.fields import to_python as multistring_to_python
 from pootle_store.models import Unit
-from pootle_store.templatetags.store_tags import (
-    pluralize_source, pluralize_target)
 from pootle_store.unit.proxy import UnitProxy
 
 
@@ -71,36 +70,63 @@ class UnitResult(UnitProxy):
 
 
 class StoreResults(object):
+    """Serializes the units of a single store, the translate URL and
+    metadata are resolved once for the store rather than for each unit
+    """
 
     def __init__(self, units):
         self.units = units
 
+    def get_meta(self, unit):
+        return {
+            'filetype': unit.filetype,
+            'source_lang': unit.source_lang,
+            'source_dir': unit.source_dir,
+            'target_lang': unit.target_lang,
+            'target_dir': unit.target_dir,
+            'project_code': unit.project_code,
+            'project_style': unit.project_style}
+
+    def get_url_prefix(self, unit):
+        return (
+            u'%s#unit='
+            % reverse("pootle-tp-store-translate",
+                      args=split_pootle_path(unit.pootle_path)))
+
+    def get_unit_data(self, unit, url_prefix, nplurals):
+        # this is equivalent to `pluralize_source`/`pluralize_target` but
+        # decodes each multistring only once and skips the form labels
+        source = multistring_to_python(unit["source_f"])
+        target = multistring_to_python(unit["target_f"])
+        if len(source.strings) > 1 or getattr(source, "plural", None):
+            sources = source.strings
+            targets = target.strings
+            targets = [
+                targets[i] if i < len(targets) else ''
+                for i in range(nplurals)]
+        else:
+            sources = [source]
+            targets = [target]
+        return {
+            'id': unit["id"],
+            'url': u'%s%s' % (url_prefix, unit["id"]),
+            'isfuzzy': unit["state"] == FUZZY,
+            'source': sources,
+            'target': targets}
+
     @property
     def data(self):
         meta = None
         units_list = []
 
         for unit in iter(self.units):
-            unit = UnitResult(unit)
             if meta is None:
-                meta = {
-                    'filetype': unit.filetype,
-                    'source_lang': unit.source_lang,
-                    'source_dir': unit.source_dir,
-                    'target_lang': unit.target_lang,
-                    'target_dir': unit.target_dir,
-                    'project_code': unit.project_code,
-                    'project_style': unit.project_style}
+                result = UnitResult(unit)
+                meta = self.get_meta(result)
+                url_prefix = self.get_url_prefix(result)
+                nplurals = result.nplurals
             units_list.append(
-                {'id': unit.id,
-                 'url': unit.translate_url,
-                 'isfuzzy': unit.state == FUZZY,
-                 'source': [source[1]
-                            for source
-                            in pluralize_source(unit)],
-                 'target': [target[1]
-                            for target
-                            in pluralize_target(unit, unit.nplurals)]})
+                self.get_unit_data(unit, url_prefix, nplurals))
         return {
             'meta': meta,
             'units': units_list}
@@ -9,6 +9,8 @@
 from django.db.models import Max
 from django.utils.functional import cached_property
 
+from pootle.core.decorators import replica_reads
+from pootle.core.routers import get_read_db
 from pootle_store.constants import SIMPLY_SORTED
 from pootle_store.models import Unit
 from pootle_store.unit.filters import UnitSearchFilter, UnitTextSearch
@@ -142,8 +144,11 @@ class DBSearchBackend(object):
 
     @cached_property
     def results(self):
-        return self.sort_qs(self.filter_qs(self.units_qs))
+        # results that are returned unevaluated are read from the same db
+        return self.sort_qs(
+            self.filter_qs(self.units_qs)).using(get_read_db())
 
+    @replica_reads
     def search(self):
         total = self.results.count()
         start = self.offset
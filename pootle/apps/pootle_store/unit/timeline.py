@@ -14,7 +14,8 @@ from django.utils.functional import cached_property
 from django.utils.html import format_html
 
 from accounts.proxy import DisplayUser
-from pootle.core.delegate import event_formatters, grouped_events
+from pootle.core.delegate import (
+    comparable_event, event_formatters, grouped_events)
 from pootle.core.proxy import BaseProxy
 from pootle.i18n.gettext import ugettext_lazy as _
 from pootle_checks.constants import CHECK_NAMES
@@ -286,6 +287,18 @@ class ComparableUnitTimelineLogEvent(BaseProxy):
 
 
 class UnitTimelineGroupedEvents(GroupedEvents):
+
+    def sorted_events(self, start=None, end=None, users=None, reverse=False):
+        # the timeline orders events at the same time by action
+        comparable_event_class = comparable_event.get(self.log.__class__)
+        events = sorted(
+            (comparable_event_class(x)
+             for x in self.log.get_events(start=start,
+                                          end=end,
+                                          users=users)), reverse=reverse)
+        for event in events:
+            yield event
+
     def grouped_events(self, start=None, end=None, users=None):
         def _group_id(event):
             user_id = event.user.id
@@ -11,13 +11,14 @@ import logging
 from django.contrib.auth import get_user_model
 from django.utils.functional import cached_property
 
-from pootle.core.delegate import frozen, review, versioned
+from pootle.core.debug import instrument
+from pootle.core.delegate import frozen, review, versioned, wordcount
 from pootle.core.models import Revision
 from pootle_store.contextmanagers import update_store_after
 
 from .constants import OBSOLETE, PARSED, POOTLE_WINS
 from .diff import StoreDiff
-from .models import Suggestion
+from .models import Suggestion, Unit
 from .util import get_change_str
 
 
@@ -313,6 +314,7 @@ class StoreUpdater(object):
             unit.store = self.target_store
             yield unit
 
+    @instrument("pootle_store.update")
     def update(self, *args, **kwargs):
         with update_store_after(self.target_store):
             return self._update(*args, **kwargs)
@@ -408,7 +410,7 @@ class StoreUpdater(object):
                 self.target_store.update_index(start=start, delta=delta)
 
             # Add new units
-            for unit, new_unit_index in to_change["add"]:
+            for unit, new_unit_index in self.count_words(to_change["add"]):
                 self.target_store.addunit(
                     unit,
                     new_unit_index,
@@ -427,6 +429,45 @@ class StoreUpdater(object):
             update.store_revision, update.update_revision)
         return changes
 
+    def get_unit_strings(self, unit):
+        strings = set()
+        for string in (unit.source, unit.target):
+            if string:
+                strings.update(getattr(string, "strings", [string]))
+        return strings
+
+    def count_words(self, to_add):
+        """Yields the ``(unit, index)`` pairs of new units, counting the
+        words of the strings of each chunk of units together before it, so
+        that the counts are cached for when the units are saved.
+
+        Chunks are kept within the size of the counter's cache, so that
+        counts are not dropped from the cache before they are used.
+        """
+        counter = wordcount.get(Unit)
+        count_many = getattr(counter, "count_many", None)
+        if not count_many:
+            for added in to_add:
+                yield added
+            return
+        chunk = []
+        strings = set()
+        for added in to_add:
+            unit_strings = self.get_unit_strings(added[0])
+            size = len(strings) + len(unit_strings - strings)
+            if chunk and size > counter.cache_size:
+                count_many(list(strings))
+                for chunk_added in chunk:
+                    yield chunk_added
+                chunk = []
+                strings = set()
+            chunk.append(added)
+            strings.update(unit_strings)
+        if strings:
+            count_many(list(strings))
+        for chunk_added in chunk:
+            yield chunk_added
+
     def update_units(self, update):
         update_count = 0
         suggestion_count = 0
@@ -19,6 +19,9 @@ get_units_urlpatterns = [
 unit_xhr_urlpatterns = [
 
     # XHR
+    url(r'^xhr/units/edit/?$',
+        views.get_edit_units,
+        name='pootle-xhr-units-edit-bundle'),
     url(r'^xhr/units/(?P<uid>[0-9]+)/?$',
         views.UnitSubmitJSON.as_view(),
         name='pootle-xhr-units-submit'),
@@ -34,6 +37,9 @@ unit_xhr_urlpatterns = [
     url(r'^xhr/units/(?P<uid>[0-9]+)/timeline/?$',
         views.UnitTimelineJSON.as_view(),
         name='pootle-xhr-units-timeline'),
+    url(r'^xhr/units/(?P<uid>[0-9]+)/tm/?$',
+        views.UnitTMJSON.as_view(),
+        name='pootle-xhr-units-tm'),
 
     url(r'^xhr/units/(?P<uid>[0-9]+)/suggestions/?$',
         views.UnitAddSuggestionJSON.as_view(),
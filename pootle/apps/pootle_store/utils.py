@@ -6,12 +6,15 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
+import threading
 from collections import OrderedDict
+from hashlib import md5
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.template import loader
 from django.utils import timezone
+from django.utils.encoding import force_bytes
 from django.utils.functional import cached_property
 
 from pootle.core.delegate import site, states, unitid
@@ -30,15 +33,48 @@ User = get_user_model()
 
 
 class UnitWordcount(object):
+    """Counts words with the configured ``counter`` function, keeping the
+    counts of the most recently counted strings.
+    """
 
-    def __init__(self, counter):
+    cache_size = 10000
+
+    def __init__(self, counter, cache_size=None):
         self.counter = counter
+        if cache_size is not None:
+            self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get_key(self, string):
+        return md5(force_bytes(string)).digest()
 
     def count(self, string):
-        return self.counter(string)
+        return self.count_many([string])[0]
+
+    def count_many(self, strings):
+        """Returns the wordcount of each of ``strings``, counting each
+        uncached string only once
+        """
+        keys = [self.get_key(string) for string in strings]
+        counts = {}
+        with self.lock:
+            for key in keys:
+                if key in self.cache:
+                    counts[key] = self.cache.pop(key)
+                    self.cache[key] = counts[key]
+        for key, string in zip(keys, strings):
+            if key not in counts:
+                counts[key] = self.counter(string)
+        with self.lock:
+            for key in keys:
+                self.cache[key] = counts[key]
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return [counts[key] for key in keys]
 
     def count_words(self, strings):
-        return sum(self.count(string) for string in strings)
+        return sum(self.count_many(strings))
 
 
 class DefaultUnitid(object):
@@ -10,6 +10,7 @@ import calendar
 import unicodedata
 from collections import OrderedDict
 
+from translate.filters.decorators import Category
 from translate.lang import data
 
 from django import forms
@@ -30,11 +31,13 @@ from pootle.core.exceptions import Http400
 from pootle.core.http import JsonResponse, JsonResponseBadRequest
 from pootle.core.utils import dateformat
 from pootle.core.views import PootleJSON
-from pootle.core.views.decorators import requires_permission, set_permissions
+from pootle.core.views.decorators import (
+    check_directory_permission, requires_permission, set_permissions)
 from pootle.core.views.mixins import GatherContextMixin, PootleJSONMixin
 from pootle.i18n.dates import timesince
 from pootle.i18n.gettext import ugettext as _
-from pootle_app.models.permissions import check_user_permission
+from pootle_app.models.permissions import (
+    check_user_permission, check_user_permissions)
 from pootle_language.models import Language
 from pootle_misc.util import ajax_required
 
@@ -44,6 +47,7 @@ from .forms import (
     UnitSearchForm, unit_comment_form_factory, unit_form_factory)
 from .models import Suggestion, Unit
 from .templatetags.store_tags import pluralize_source, pluralize_target
+from .unit.bundle import UnitEditBundle
 from .unit.results import GroupedResults
 from .unit.timeline import Timeline
 from .util import find_altsrcs
@@ -384,11 +388,21 @@ CHARACTERS_NAMES = OrderedDict(
     )
 )
 
+# Maximum number of units whose edit data can be requested together
+EDIT_UNITS_MAX = 20
+
 CHARACTERS = u"".join([unichr(index) for index in CHARACTERS_NAMES.keys()])
 
 
 class UnitEditJSON(PootleUnitJSON):
 
+    context_providers = (
+        "alt_src",
+        "check",
+        "permission",
+        "suggestion",
+        "terminology")
+
     @property
     def special_characters(self):
         if self.language.direction == "rtl":
@@ -476,24 +490,72 @@ class UnitEditJSON(PootleUnitJSON):
         sources[self.source_language.code] = self.object.source_f.strings
         return sources
 
+    def get_alt_src_data(self):
+        return {'altsrcs': {x.id: x.data for x in self.get_alt_srcs()}}
+
+    def get_checks(self):
+        # fetch critical and warning checks together
+        return list(self.object.get_qualitychecks())
+
+    def get_check_data(self):
+        checks = self.get_checks()
+        critical_checks = [
+            check for check in checks
+            if check.category == Category.CRITICAL]
+        return {
+            "failing_checks": any(
+                not check.false_positive
+                for check
+                in critical_checks),
+            "critical_checks": critical_checks,
+            "warning_checks": [
+                check for check in checks
+                if check.category != Category.CRITICAL]}
+
+    def get_permissions(self, directory):
+        return check_user_permissions(
+            self.request.user,
+            ["administrate", "review", "suggest", "translate"],
+            directory)
+
+    def get_permission_data(self):
+        permissions = self.get_permissions(self.directory)
+        return {
+            'cantranslate': permissions["translate"],
+            'cantranslatexlang': self.get_permissions(
+                self.project.directory)["administrate"],
+            'cansuggest': permissions["suggest"],
+            'canreview': permissions["review"],
+            'has_admin_access': permissions["administrate"]}
+
+    def get_suggestions(self):
+        return self.object.get_suggestions()
+
+    def get_latest_target_submission(self):
+        return self.object.get_latest_target_submission()
+
+    def get_suggestion_data(self):
+        suggestions = self.get_suggestions()
+        latest_target_submission = self.get_latest_target_submission()
+        accepted_suggestion = None
+        if latest_target_submission is not None:
+            accepted_suggestion = latest_target_submission.suggestion
+        return {
+            'accepted_suggestion': accepted_suggestion,
+            'suggestions': suggestions,
+            'suggestions_dict': {x.id: dict(id=x.id, target=x.target.strings)
+                                 for x in suggestions}}
+
+    def get_terminology_data(self):
+        return {"terms": self.object.get_terminology()}
+
     def get_context_data(self, *args, **kwargs):
         priority = (
             self.store.priority
             if 'virtualfolder' in settings.INSTALLED_APPS
             else None)
-        suggestions = self.object.get_suggestions()
-        latest_target_submission = self.object.get_latest_target_submission()
-        accepted_suggestion = None
-        if latest_target_submission is not None:
-            accepted_suggestion = latest_target_submission.suggestion
-        critical_checks = list(self.object.get_critical_qualitychecks())
-        failing_checks = any(
-            not check.false_positive
-            for check
-            in critical_checks)
-        return {
+        context = {
             'unit': self.object,
-            'accepted_suggestion': accepted_suggestion,
             'form': self.get_unit_edit_form(),
             'comment_form': self.get_unit_comment_form(),
             'priority': priority,
@@ -504,43 +566,110 @@ class UnitEditJSON(PootleUnitJSON):
             'language': self.language,
             'special_characters': self.special_characters,
             'source_language': self.source_language,
-            'cantranslate': check_user_permission(self.request.user,
-                                                  "translate",
-                                                  self.directory),
-            'cantranslatexlang': check_user_permission(self.request.user,
-                                                       "administrate",
-                                                       self.project.directory),
-            'cansuggest': check_user_permission(self.request.user,
-                                                "suggest",
-                                                self.directory),
-            'canreview': check_user_permission(self.request.user,
-                                               "review",
-                                               self.directory),
-            'has_admin_access': check_user_permission(self.request.user,
-                                                      'administrate',
-                                                      self.directory),
-            'altsrcs': {x.id: x.data for x in self.get_alt_srcs()},
             'unit_values': self.get_unit_values(),
             'target_nplurals': self.get_target_nplurals(),
             'has_plurals': self.object.hasplural(),
-            'filetype': self.object.store.filetype.name,
-            'suggestions': suggestions,
-            'suggestions_dict': {x.id: dict(id=x.id, target=x.target.strings)
-                                 for x in suggestions},
-            "failing_checks": failing_checks,
-            "critical_checks": critical_checks,
-            "warning_checks": list(
-                self.object.get_warning_qualitychecks()),
-            "terms": self.object.get_terminology()}
+            'filetype': self.object.store.filetype.name}
+        for provider in self.context_providers:
+            context.update(getattr(self, "get_%s_data" % provider)())
+        return context
 
     def get_response_data(self, context):
+        # TM suggestions are retrieved separately with `UnitTMJSON`
         return {
             'editor': self.render_edit_template(context),
-            'tm_suggestions': self.object.get_tm_suggestions(),
             'is_obsolete': self.object.isobsolete(),
             'sources': self.get_sources()}
 
 
+class UnitBundleEditJSON(UnitEditJSON):
+    """Edit payload for a unit, using the related data retrieved for a set of
+    units by a `UnitEditBundle`.
+    """
+
+    def __init__(self, bundle, **kwargs):
+        super(UnitBundleEditJSON, self).__init__(**kwargs)
+        self.bundle = bundle
+
+    def get_alt_srcs(self):
+        return self.bundle.alt_srcs.get(self.object.id, [])
+
+    def get_checks(self):
+        return self.bundle.checks.get(self.object.id, [])
+
+    def get_latest_target_submission(self):
+        return self.bundle.latest_target_submissions.get(self.object.id)
+
+    def get_permissions(self, directory):
+        return self.bundle.get_permissions(directory)
+
+    def get_suggestions(self):
+        return self.bundle.suggestions.get(self.object.id, [])
+
+    def get_edit_data(self):
+        return self.get_response_data(self.get_context_data())
+
+
+@ajax_required
+def get_edit_units(request, **kwargs_):
+    """Gets the edit payloads for several units.
+
+    :return: A JSON-encoded list with the edit data for each of the units
+        in the `uids` GET parameter - a comma separated list of unit ids, up
+        to `EDIT_UNITS_MAX` units are returned, in the requested order.
+    """
+    try:
+        uids = [
+            int(uid)
+            for uid
+            in request.GET.get("uids", "").split(",")
+            if uid][:EDIT_UNITS_MAX]
+    except ValueError:
+        raise Http400(_('Arguments missing.'))
+    if not uids:
+        raise Http400(_('Arguments missing.'))
+    units = UnitEditJSON(request=request).get_queryset().in_bulk(uids)
+    tps = set(unit.store.translation_project for unit in units.values())
+    bundle = UnitEditBundle(
+        [units[uid] for uid in uids if uid in units],
+        request.user,
+        alt_src_langs={
+            tp.id: get_alt_src_langs(request, request.user, tp)
+            for tp in tps})
+    edit_units = []
+    for unit in bundle.units.values():
+        # the unit forms check the permissions set on the request
+        request.permissions = bundle.get_matching_permissions(
+            unit.store.parent)
+        if not check_directory_permission("view", request, unit.store.parent):
+            continue
+        view = UnitBundleEditJSON(bundle, request=request, object=unit)
+        data = view.get_edit_data()
+        data["uid"] = unit.id
+        edit_units.append(data)
+    return JsonResponse({"units": edit_units})
+
+
+class UnitTMJSON(PootleUnitJSON):
+    """Translation memory suggestions for a unit, these are requested by the
+    editor after the unit has been rendered.
+    """
+
+    def get_queryset(self):
+        return Unit.objects.get_translatable(self.request.user).select_related(
+            "store__translation_project__language",
+            "store__translation_project__project__directory",
+            "store__translation_project__project__source_language")
+
+    def get_context_data(self, *args, **kwargs):
+        return {}
+
+    def get_response_data(self, context):
+        return {
+            'uid': self.object.id,
+            'tm_suggestions': self.object.get_tm_suggestions()}
+
+
 @get_unit_context('view')
 def permalink_redirect(request, unit):
     return redirect(request.build_absolute_uri(unit.get_translate_url()))
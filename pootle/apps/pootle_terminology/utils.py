@@ -87,6 +87,70 @@ class UnitTerminology(TextStemmer):
             self.associate_stems(stems - existing_stems)
 
 
+class TerminologyIndex(object):
+    """Inverted index of stems to the translated terminology units of a
+    language.
+
+    The index is cached against the revision of the language's terminology
+    TP, and holds the source, target, tokens and stems of each term so that
+    terms can be matched without querying the db.
+    """
+
+    ns = "pootle.terminology.index"
+    sw_version = PootleTerminologyConfig.version
+
+    def __init__(self, language_id, revision):
+        self.language_id = language_id
+        self.revision = revision
+
+    @property
+    def cache_key(self):
+        return "%s.%s" % (self.language_id, self.revision)
+
+    @property
+    def terminology_units(self):
+        return Unit.objects.filter(
+            state=TRANSLATED,
+            store__translation_project__project__code="terminology",
+            store__translation_project__language_id=self.language_id)
+
+    @persistent_property
+    def index(self):
+        terms = {}
+        stems = {}
+        comparison_class = text_comparison.get()
+        units = self.terminology_units.filter(
+            stems__isnull=False).values_list(
+                "id", "source_f", "target_f", "stems__root")
+        for unit_id, source, target, root in units.iterator():
+            if unit_id not in terms:
+                comparison = comparison_class(unicode(source))
+                terms[unit_id] = (
+                    unicode(source),
+                    unicode(target),
+                    comparison.tokens,
+                    comparison.stems)
+            stems[root] = stems.get(root, set())
+            stems[root].add(unit_id)
+        return dict(terms=terms, stems=stems)
+
+    def get_terms(self, stems):
+        """Returns ``(unit_id, source, target, comparison)`` for each term
+        matching any of the given stems.
+        """
+        index = self.index
+        unit_ids = set()
+        for stem in stems:
+            unit_ids |= index["stems"].get(stem, set())
+        comparison_class = text_comparison.get()
+        for unit_id in sorted(unit_ids):
+            source, target, tokens, term_stems = index["terms"][unit_id]
+            comparison = comparison_class(source)
+            comparison.tokens = tokens
+            comparison.stems = term_stems
+            yield unit_id, source, target, comparison
+
+
 class UnitTerminologyMatcher(TextStemmer):
 
     ns = "pootle.terminology.matcher"
@@ -94,7 +158,7 @@ class UnitTerminologyMatcher(TextStemmer):
     similarity_threshold = .2
     max_matches = 10
 
-    @property
+    @cached_property
     def revision_context(self):
         term_tp = TranslationProject.objects.select_related("directory").filter(
             language_id=self.language_id,
@@ -102,7 +166,7 @@ class UnitTerminologyMatcher(TextStemmer):
         if term_tp:
             return term_tp.directory
 
-    @property
+    @cached_property
     def rev_cache_key(self):
         rev_context = self.revision_context
         return (
@@ -118,38 +182,59 @@ class UnitTerminologyMatcher(TextStemmer):
                self.rev_cache_key,
                hash(self.text)))
 
+    @property
+    def stale_cache_key(self):
+        return "%s.%s" % (self.language_id, hash(self.text))
+
     @property
     def language_id(self):
         return self.context.store.translation_project.language.id
 
     @property
     def terminology_units(self):
-        return Unit.objects.filter(
-            state=TRANSLATED,
-            store__translation_project__project__code="terminology",
-            store__translation_project__language_id=self.language_id)
+        return self.index.terminology_units
+
+    @property
+    def index(self):
+        return TerminologyIndex(self.language_id, self.rev_cache_key)
 
     @cached_property
     def comparison(self):
         return text_comparison.get()(self.text)
 
-    def similar(self, results):
+    def get_similar(self, candidates):
+        """Returns the most similar of ``(result, source, target, other)``
+        candidates, where ``other`` is the text or comparison to compare
+        """
         matches = []
         matched = []
-        for result in results:
+        for result, source, target, other in candidates:
             target_pair = (
-                result.source_f.lower().strip(),
-                result.target_f.lower().strip())
+                source.lower().strip(),
+                target.lower().strip())
             if target_pair in matched:
                 continue
-            similarity = self.comparison.similarity(result.source_f)
+            similarity = self.comparison.similarity(other)
             if similarity > self.similarity_threshold:
                 matches.append((similarity, result))
                 matched.append(target_pair)
         return sorted(matches, key=lambda x: -x[0])[:self.max_matches]
 
+    def similar(self, results):
+        return self.get_similar(
+            (result, result.source_f, result.target_f, result.source_f)
+            for result
+            in results)
+
     @persistent_property
     def matches(self):
-        return self.similar(
-            self.terminology_units.filter(
-                stems__root__in=self.stems).distinct())
+        matches = self.get_similar(self.index.get_terms(self.stems))
+        if not matches:
+            return []
+        units = self.terminology_units.in_bulk(
+            [unit_id for __, unit_id in matches])
+        return [
+            (similarity, units[unit_id])
+            for similarity, unit_id
+            in matches
+            if unit_id in units]
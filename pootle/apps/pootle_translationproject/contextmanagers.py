@@ -32,20 +32,6 @@ class Updated(object):
 
 def _handle_update_stores(sender, updated):
 
-    @receiver(update_data, sender=sender.__class__)
-    def update_tp_data_handler(**kwargs):
-        updated.tp_data = True
-        update_data.disconnect(
-            update_tp_data_handler,
-            sender=sender.__class__)
-
-    @receiver(update_scores, sender=sender.__class__)
-    def update_tp_scores_handler(**kwargs):
-        updated.tp_scores = True
-        update_scores.disconnect(
-            update_tp_scores_handler,
-            sender=sender.__class__)
-
     if updated.checks:
         with keep_data(suppress=(Store, ), signals=(update_data, )):
 
@@ -88,6 +74,17 @@ def _update_stores(sender, updated):
             StoreData,
             StoreChecksData))
     with keep_data(suppress=(sender.__class__, )):
+
+        # signals only hold weak references to the receivers, so they are
+        # kept here until the stores have been updated
+        @receiver(update_data, sender=sender.__class__)
+        def update_tp_data_handler(**kwargs):
+            updated.tp_data = True
+
+        @receiver(update_scores, sender=sender.__class__)
+        def update_tp_scores_handler(**kwargs):
+            updated.tp_scores = True
+
         with bulk_stores:
             _handle_update_stores(sender, updated)
 
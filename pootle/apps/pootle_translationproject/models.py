@@ -19,7 +19,7 @@ from pootle.core.delegate import data_tool
 from pootle.core.mixins import CachedTreeItem
 from pootle.core.url_helpers import get_editor_filter, split_pootle_path
 from pootle_app.models.directory import Directory
-from pootle_checks.constants import EXCLUDED_FILTERS
+from pootle_checks.registry import checker_registry
 from pootle_language.models import Language
 from pootle_project.models import Project
 from pootle_revision.models import Revision
@@ -136,15 +136,9 @@ class TranslationProject(models.Model, CachedTreeItem):
 
     @property
     def checker(self):
-        from translate.filters import checks
-        checkerclasses = [
-            checks.projectcheckers.get(
-                self.project.checkstyle,
-                checks.StandardChecker)]
-        return checks.TeeChecker(checkerclasses=checkerclasses,
-                                 excludefilters=EXCLUDED_FILTERS,
-                                 errorhandler=self.filtererrorhandler,
-                                 languagecode=self.language.code)
+        return checker_registry.get(
+            self.project.checkstyle,
+            self.language.code)
 
     @property
     def disabled(self):
@@ -196,14 +190,6 @@ class TranslationProject(models.Model, CachedTreeItem):
         """Return the related announcement, if any."""
         return StaticPage.get_announcement_for(self.pootle_path, user)
 
-    def filtererrorhandler(self, functionname, str1, str2, e):
-        logger.error(
-            u"Error in filter %s: %r, %r, %s",
-            functionname,
-            str1,
-            str2, e)
-        return False
-
     def is_accessible_by(self, user):
         """Returns `True` if the current translation project is accessible
         by `user`.
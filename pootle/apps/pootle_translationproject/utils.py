@@ -14,6 +14,7 @@ from pootle.core.paths import Paths
 from pootle.core.signals import create, update_checks
 from pootle_statistics.models import SubmissionTypes
 from pootle_store.constants import OBSOLETE, SOURCE_WINS
+from pootle_store.contextmanagers import batch_new_stores
 from pootle_store.diff import StoreDiff
 from pootle_store.models import QualityCheck
 
@@ -77,7 +78,7 @@ class TPTool(object):
         new_tp = self.create_tp(language, project)
         new_tp.directory.tp = new_tp
         new_tp.directory.translationproject = new_tp
-        with update_tp_after(new_tp):
+        with update_tp_after(new_tp), batch_new_stores():
             self.clone_children(
                 tp.directory,
                 new_tp.directory)
@@ -8,6 +8,8 @@
 
 from stemming.porter2 import stem
 
+from django.utils.lru_cache import lru_cache
+
 from pootle.core.delegate import stemmer, stopwords, text_comparison
 from pootle.core.plugin import getter
 
@@ -16,10 +18,13 @@ from .utils import Stopwords, TextComparison
 
 site_stopwords = Stopwords()
 
+# the same words are stemmed repeatedly when matching terminology
+site_stemmer = lru_cache(maxsize=10000)(stem)
+
 
 @getter(stemmer)
 def get_stemmer(**kwargs_):
-    return stem
+    return site_stemmer
 
 
 @getter(stopwords)
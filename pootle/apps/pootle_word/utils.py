@@ -17,6 +17,9 @@ from django.utils.functional import cached_property
 from pootle.core.delegate import stemmer, stopwords
 
 
+TOKEN_SPLIT_RE = re.compile(u"[^\w'-]+")
+
+
 class Stopwords(object):
 
     @cached_property
@@ -42,7 +45,7 @@ class TextStemmer(object):
         self.context = context
 
     def split(self, words):
-        return re.split(u"[^\w'-]+", words)
+        return TOKEN_SPLIT_RE.split(words)
 
     @property
     def stopwords(self):
@@ -50,12 +53,14 @@ class TextStemmer(object):
 
     @property
     def tokens(self):
-        return [
-            t.lower()
-            for t
-            in self.split(self.text)
-            if (len(t) > 2
-                and t.lower() not in self.stopwords)]
+        stop_words = self.stopwords
+        tokens = []
+        for token in self.split(self.text):
+            if len(token) > 2:
+                token = token.lower()
+                if token not in stop_words:
+                    tokens.append(token)
+        return tokens
 
     @property
     def text(self):
@@ -70,19 +75,37 @@ class TextStemmer(object):
         return self.get_stems(self.tokens)
 
     def get_stems(self, tokens):
-        return set(self.stemmer(t) for t in tokens)
+        stem = self.stemmer
+        return set(stem(t) for t in tokens)
 
 
 class TextComparison(TextStemmer):
+    """Compares text with other text.
+
+    The text is immutable, so tokens and stems are only calculated once for
+    each instance.
+    """
 
     @property
     def text(self):
         return self.context
 
+    @cached_property
+    def tokens(self):
+        return super(TextComparison, self).tokens
+
+    @cached_property
+    def token_set(self):
+        return set(self.tokens)
+
+    @cached_property
+    def stems(self):
+        return super(TextComparison, self).stems
+
     def jaccard_similarity(self, other):
         return (
             len(other.stems.intersection(self.stems))
-            / float(len(set(other.stems).union(self.stems))))
+            / float(len(other.stems.union(self.stems))))
 
     def levenshtein_distance(self, other):
         return (
@@ -91,16 +114,17 @@ class TextComparison(TextStemmer):
 
     def tokens_present(self, other):
         return (
-            len(set(self.tokens).intersection(other.tokens))
+            len(self.token_set.intersection(other.tokens))
             / float(len(other.tokens)))
 
     def stems_present(self, other):
         return (
-            len(set(self.stems).intersection(other.stems))
+            len(self.stems.intersection(other.stems))
             / float(len(other.stems)))
 
     def similarity(self, other):
-        other = self.__class__(other)
+        if not isinstance(other, TextComparison):
+            other = self.__class__(other)
         return (
             (self.jaccard_similarity(other)
              + self.levenshtein_distance(other)
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import threading
+from contextlib import contextmanager
+
+from django.db import connection
+
+from .utils import VirtualFolderStoreBatch
+
+
+_batches = threading.local()
+
+
+def get_store_batch():
+    """Returns the vfolder store batch for the current thread, if any"""
+    return getattr(_batches, "batch", None)
+
+
+@contextmanager
+def batch_vfolder_stores():
+    """Defer adding newly created Stores to vfolders until the context exits.
+
+    On exit the vfolder associations and priorities for all of the Stores
+    created in the context are written together, including when the context
+    exits with an error. If used inside another ``batch_vfolder_stores``
+    context the Stores are added to the outer batch.
+    """
+    batch = get_store_batch()
+    if batch is not None:
+        yield batch
+        return
+    batch = _batches.batch = VirtualFolderStoreBatch()
+    try:
+        yield batch
+    except Exception:
+        _batches.batch = None
+        # Stores created before the error may already be committed, so
+        # they are still added, unless the transaction is being rolled back
+        if not connection.needs_rollback:
+            batch.discard_missing()
+            batch.flush()
+        raise
+    _batches.batch = None
+    batch.flush()
@@ -6,11 +6,12 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
-from pootle.core.delegate import search_backend
+from pootle.core.delegate import search_backend, store_batch
 from pootle.core.plugin import getter
 from pootle_app.models import Directory
 from pootle_store.models import Store
 
+from .contextmanagers import batch_vfolder_stores
 from .delegate import (
     path_matcher, vfolder_finder, vfolders_data_tool, vfolders_data_view)
 from .models import VirtualFolder
@@ -35,6 +36,11 @@ def store_vf_finder_getter(**kwargs_):
     return VirtualFolderFinder
 
 
+@getter(store_batch, sender=Store)
+def store_vf_batch_getter(**kwargs_):
+    return batch_vfolder_stores
+
+
 @getter(vfolders_data_tool, sender=Directory)
 def vf_directory_data_tool_getter(**kwargs_):
     return DirectoryVFDataTool
@@ -13,6 +13,7 @@ from pootle.core.delegate import revision_updater
 from pootle_app.models import Directory
 from pootle_store.models import Store
 
+from .contextmanagers import get_store_batch
 from .delegate import vfolder_finder
 from .models import VirtualFolder
 
@@ -21,6 +22,10 @@ from .models import VirtualFolder
 def handle_store_save(sender, instance, created, **kwargs):
     if not created:
         return
+    batch = get_store_batch()
+    if batch is not None:
+        batch.add(instance)
+        return
     vfolder_finder.get(
         instance.__class__)(instance).add_to_vfolders()
 
@@ -33,10 +38,11 @@ def handle_vfolder_save(sender, instance, created, **kwargs):
 @receiver(pre_delete, sender=VirtualFolder)
 def handle_vfolder_delete(sender, instance, **kwargs):
     dirs = set(instance.stores.values_list("parent", flat=True))
-    for store in instance.stores.all():
-        instance.stores.remove(store)
-        if store.priority == instance.priority:
-            store.set_priority()
+    path_matcher = instance.path_matcher
+    store_ids = path_matcher.existing_store_ids
+    if store_ids:
+        path_matcher.remove_stores(store_ids)
+        path_matcher.recalculate_priorities(store_ids)
     updater = revision_updater.get(Directory)(
         object_list=Directory.objects.filter(pk__in=dirs))
     updater.update(keys=["stats"])
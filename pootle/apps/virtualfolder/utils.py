@@ -6,23 +6,30 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
+import re
 from fnmatch import fnmatch
 
 from django.db.models import Max, Sum
+from django.db.models.expressions import RawSQL
+from django.utils.functional import cached_property
 
 from pootle.core.decorators import persistent_property
 from pootle_data.utils import RelatedStoresDataTool
 from pootle_fs.utils import PathFilter
+from pootle_store.constants import DEFAULT_PRIORITY
 from pootle_store.models import Store
 
+from .delegate import vfolder_finder
 from .models import VirtualFolder
 
 
 class VirtualFolderFinder(object):
     """Find vfs for a new store"""
 
-    def __init__(self, store):
+    def __init__(self, store, candidates=None):
         self.store = store
+        if candidates is not None:
+            self.__dict__["candidates"] = candidates
 
     @property
     def language(self):
@@ -41,19 +48,107 @@ class VirtualFolderFinder(object):
             | VirtualFolder.objects.filter(
                 all_languages=True, all_projects=True))
 
+    @cached_property
+    def candidates(self):
+        """List of (vfolder, compiled rules) for the vfolders that could
+        contain Stores in this Store's project and language
+        """
+        return [
+            (vf, vf.path_matcher.compiled_rules)
+            for vf
+            in self.possible_vfolders.distinct()]
+
+    @property
+    def matching_vfolders(self):
+        return [
+            vf
+            for vf, rules
+            in self.candidates
+            if rules.match(self.store.pootle_path)]
+
     def add_to_vfolders(self):
-        to_add = []
-        for vf in self.possible_vfolders:
-            if vf.path_matcher.should_add_store(self.store):
-                to_add.append(vf)
+        to_add = self.matching_vfolders
         if to_add:
             self.store.vfolders.add(*to_add)
-            self.store.set_priority()
+            self.store.set_priority(
+                priority=max(vf.priority for vf in to_add))
+
+
+class VirtualFolderStoreBatch(object):
+    """Collects newly created Stores and adds them to their vfolders
+    together
+
+    Candidate vfolders are found once for each project and language.
+    """
+
+    batch_size = 1000
+
+    def __init__(self):
+        self.stores = []
+        self.candidates = {}
+
+    def __len__(self):
+        return len(self.stores)
+
+    def add(self, store):
+        self.stores.append(store)
+
+    def get_finder(self, store):
+        tp = store.translation_project
+        key = (tp.project_id, tp.language_id)
+        finder = vfolder_finder.get(store.__class__)(
+            store,
+            candidates=self.candidates.get(key))
+        self.candidates[key] = finder.candidates
+        return finder
+
+    def discard_missing(self):
+        """Drops Stores that no longer exist, eg as their creation was
+        rolled back
+        """
+        store_ids = [store.pk for store in self.stores]
+        existing = set()
+        for i in range(0, len(store_ids), self.batch_size):
+            existing.update(
+                Store.objects.filter(
+                    pk__in=store_ids[i:i + self.batch_size]).values_list(
+                        "pk", flat=True))
+        self.stores = [
+            store
+            for store
+            in self.stores
+            if store.pk in existing]
+
+    def flush(self):
+        through = VirtualFolder.stores.through
+        to_add = []
+        priorities = {}
+        for store in self.stores:
+            vfolders = self.get_finder(store).matching_vfolders
+            if not vfolders:
+                continue
+            to_add += [
+                through(virtualfolder_id=vf.pk, store_id=store.pk)
+                for vf
+                in vfolders]
+            priority = max(vf.priority for vf in vfolders)
+            if priority != store.priority:
+                priorities[priority] = priorities.get(priority, [])
+                priorities[priority].append(store.pk)
+        self.stores = []
+        if to_add:
+            through.objects.bulk_create(to_add, batch_size=self.batch_size)
+        for priority, store_ids in priorities.items():
+            for i in range(0, len(store_ids), self.batch_size):
+                Store.objects.filter(
+                    pk__in=store_ids[i:i + self.batch_size]).update(
+                        priority=priority)
 
 
 class VirtualFolderPathMatcher(object):
 
     tp_path = "/[^/]*/[^/]*/"
+    batch_size = 1000
 
     def __init__(self, vf):
         self.vf = vf
@@ -63,6 +158,14 @@ class VirtualFolderPathMatcher(object):
         """Currently associated Stores"""
         return self.vf.stores.all()
 
+    @property
+    def existing_store_ids(self):
+        """Ids of currently associated Stores"""
+        return set(
+            self.through.objects.filter(virtualfolder_id=self.vf.pk)
+                                .values_list("store_id", flat=True)
+                                .iterator())
+
     @property
     def languages(self):
         """The languages associated with this vfolder
@@ -88,6 +191,19 @@ class VirtualFolderPathMatcher(object):
         """
         return self.filter_from_rules(self.store_qs)
 
+    @property
+    def matching_store_ids(self):
+        """Ids of all stores that match project, language and rules for
+        this vfolder, streamed from (id, pootle_path) rows and matched
+        against the compiled rules
+        """
+        matcher = self.compiled_rules
+        return set(
+            store_id
+            for store_id, pootle_path
+            in self.store_qs.values_list("id", "pootle_path").iterator()
+            if matcher.match(pootle_path))
+
     @property
     def rules(self):
         """Glob matching rules"""
@@ -96,6 +212,21 @@ class VirtualFolderPathMatcher(object):
             for r
             in self.vf.filter_rules.split(","))
 
+    @property
+    def rules_regex(self):
+        """A single pootle_path *regex* matching any of the glob rules"""
+        return (
+            "^%s(%s)"
+            % (self.tp_path,
+               "|".join(
+                   PathFilter().path_regex(rule)
+                   for rule
+                   in self.rules)))
+
+    @property
+    def compiled_rules(self):
+        return re.compile(self.rules_regex)
+
     @property
     def store_manager(self):
         """The root object manager for finding/adding stores"""
@@ -108,31 +239,36 @@ class VirtualFolderPathMatcher(object):
             self.filter_languages(
                 self.store_manager))
 
+    @property
+    def through(self):
+        return self.vf.stores.through
+
     def add_and_remove_stores(self):
         """Add Stores that should be associated but arent, delete Store
         associations for Stores that are associated but shouldnt be
+
+        Returns the sets of added and removed Store ids
         """
-        existing_stores = set(self.existing_stores)
-        matching_stores = set(self.matching_stores)
-        to_add = matching_stores - existing_stores
-        to_remove = existing_stores - matching_stores
+        existing = self.existing_store_ids
+        matching = self.matching_store_ids
+        to_add = matching - existing
+        to_remove = existing - matching
         if to_add:
             self.add_stores(to_add)
         if to_remove:
             self.remove_stores(to_remove)
         return to_add, to_remove
 
-    def add_stores(self, stores):
-        """Associate a Store"""
-        self.vf.stores.add(*stores)
+    def add_stores(self, store_ids):
+        """Associate Stores by id"""
+        self.through.objects.bulk_create(
+            [self.through(virtualfolder_id=self.vf.pk, store_id=store_id)
+             for store_id
+             in store_ids],
+            batch_size=self.batch_size)
 
     def filter_from_rules(self, qs):
-        filtered_qs = qs.none()
-        for rule in self.rules:
-            filtered_qs = (
-                filtered_qs
-                | qs.filter(pootle_path__regex=self.get_rule_regex(rule)))
-        return filtered_qs
+        return qs.filter(pootle_path__regex=self.rules_regex)
 
     def filter_languages(self, qs):
         if self.languages is None:
@@ -161,8 +297,13 @@ class VirtualFolderPathMatcher(object):
                 return True
         return False
 
-    def remove_stores(self, stores):
-        self.vf.stores.remove(*stores)
+    def remove_stores(self, store_ids):
+        """Remove Store associations by id"""
+        store_ids = list(store_ids)
+        for i in range(0, len(store_ids), self.batch_size):
+            self.through.objects.filter(
+                virtualfolder_id=self.vf.pk,
+                store_id__in=store_ids[i:i + self.batch_size]).delete()
 
     def should_add_store(self, store):
         return (
@@ -175,19 +316,56 @@ class VirtualFolderPathMatcher(object):
             virtualfolder_id=self.vf.id).exists()
 
     def store_matches(self, store):
-        return self.path_matches(store.path)
+        return bool(self.compiled_rules.match(store.pootle_path))
 
     def update_stores(self):
         """Add and delete Store associations as necessary, and set the
         priority for any affected Stores
         """
         added, removed = self.add_and_remove_stores()
-        for store in added:
-            if store.priority < self.vf.priority:
-                store.set_priority(priority=self.vf.priority)
-        for store in removed:
-            if store.priority == self.vf.priority:
-                store.set_priority()
+        if added:
+            self.raise_priorities(added)
+        if removed:
+            self.recalculate_priorities(removed)
+
+    def raise_priorities(self, store_ids):
+        """Set this vfolder's priority on any of the Stores that currently
+        have a lower priority
+        """
+        store_ids = list(store_ids)
+        for i in range(0, len(store_ids), self.batch_size):
+            self.store_manager.filter(
+                pk__in=store_ids[i:i + self.batch_size],
+                priority__lt=self.vf.priority).update(
+                    priority=self.vf.priority)
+
+    def recalculate_priorities(self, store_ids):
+        """Recalculate the priority of any of the Stores that had this
+        vfolder's priority, from their remaining vfolders
+        """
+        store_ids = list(store_ids)
+        for i in range(0, len(store_ids), self.batch_size):
+            self.store_manager.filter(
+                pk__in=store_ids[i:i + self.batch_size],
+                priority=self.vf.priority).update(
+                    priority=self.priority_sql)
+
+    @property
+    def priority_sql(self):
+        """Expression for the highest priority of a Store's vfolders"""
+        store_table = Store._meta.db_table
+        vf_table = VirtualFolder._meta.db_table
+        through_table = self.through._meta.db_table
+        return RawSQL(
+            "COALESCE(("
+            "SELECT MAX(%(vf)s.priority) FROM %(vf)s "
+            "INNER JOIN %(through)s "
+            "ON %(through)s.virtualfolder_id = %(vf)s.id "
+            "WHERE %(through)s.store_id = %(store)s.id), %%s)"
+            % dict(vf=vf_table,
+                   through=through_table,
+                   store=store_table),
+            (DEFAULT_PRIORITY, ))
 
 
 class DirectoryVFDataTool(RelatedStoresDataTool):
@@ -6,6 +6,10 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
+import cPickle as pickle
+import threading
+import time
+from collections import OrderedDict
 
 from django.conf import settings
 from django.core.cache import cache as default_cache, caches
@@ -64,3 +68,102 @@ def get_cache(cache=None):
         return caches[cache]
     except InvalidCacheBackendError:
         return default_cache
+
+
+class LocalCache(object):
+    """Per-process LRU cache, used in front of the shared cache.
+
+    Values are kept pickled, so that each ``get`` returns a new copy of the
+    value, as callers may modify the values they get.
+    """
+
+    def __init__(self, size=None, timeout=None):
+        self._size = size
+        self._timeout = timeout
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.items)
+
+    @property
+    def size(self):
+        if self._size is not None:
+            return self._size
+        return getattr(settings, "POOTLE_LOCAL_CACHE_SIZE", 1000)
+
+    @property
+    def timeout(self):
+        if self._timeout is not None:
+            return self._timeout
+        return getattr(settings, "POOTLE_LOCAL_CACHE_TIMEOUT", 60)
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
+
+    def delete(self, key):
+        with self.lock:
+            self.items.pop(key, None)
+
+    def get(self, key):
+        with self.lock:
+            item = self.items.pop(key, None)
+            if item is None:
+                return None
+            if item[0] < time.time():
+                return None
+            self.items[key] = item
+        return pickle.loads(item[1])
+
+    def set(self, key, value, timeout=None):
+        if self.size <= 0:
+            return
+        if timeout is None:
+            timeout = self.timeout
+        item = (
+            time.time() + timeout,
+            pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+        with self.lock:
+            self.items.pop(key, None)
+            while len(self.items) >= self.size:
+                self.items.popitem(last=False)
+            self.items[key] = item
+
+
+class CacheStats(object):
+    """Per-process counters for cached properties, keyed by property name.
+
+    ``local_hits`` and ``hits`` count hits in the local and shared caches,
+    ``stale`` counts stale values returned while another process computed
+    a new value, ``waits`` counts misses that waited for another process,
+    and ``compute_time`` is the total time spent computing values.
+    """
+
+    fields = (
+        "local_hits", "hits", "misses", "stale", "waits", "compute_time")
+
+    def __init__(self):
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    def clear(self):
+        with self.lock:
+            self.stats.clear()
+
+    def get(self, name=None):
+        with self.lock:
+            if name is not None:
+                return dict(
+                    self.stats.get(name, dict.fromkeys(self.fields, 0)))
+            return {k: dict(v) for k, v in self.stats.items()}
+
+    def incr(self, name, field, value=1):
+        with self.lock:
+            if name not in self.stats:
+                self.stats[name] = dict.fromkeys(self.fields, 0)
+            self.stats[name][field] += value
+
+
+local_cache = LocalCache()
+cache_stats = CacheStats()
@@ -12,6 +12,7 @@ from contextlib import contextmanager, nested
 
 from django.dispatch import Signal, receiver
 
+from pootle.core.routers import replica_state
 from pootle.core.signals import (
     create, delete, update, update_checks, update_data, update_revisions,
     update_scores)
@@ -203,3 +204,57 @@ def bulk_operations(model=None, models=None, **kwargs):
         models = [model]
     with nested(*(bulk_context(m, **kwargs) for m in models)):
         yield
+
+
+@contextmanager
+def replica_safe():
+    """Marks reads in the context as safe to be served from a replica, as
+    they tolerate data that is slightly out of date.
+
+    Yields the alias of the replica used, or ``None`` when reads go to the
+    primary, so that querysets evaluated after the context exits can be
+    sent to the same database with ``qs.using()``.
+
+    Reads stay on the primary once the thread has written, so that code
+    can read its own writes.
+    """
+    replica_state.enter()
+    try:
+        yield replica_state.db
+    finally:
+        replica_state.exit()
+
+
+@contextmanager
+def use_primary():
+    """Sends all reads in the context to the primary"""
+    replica_state.primary += 1
+    try:
+        yield
+    finally:
+        replica_state.primary -= 1
+
+
+@contextmanager
+def replica_scope():
+    """Gives a unit of work, such as a request, an rq job or a management
+    command, its own replica state, so that writes from earlier work in the
+    same thread do not keep its reads on the primary.
+
+    Scopes entered inside another scope, eg a job run synchronously in a
+    request, share the state of the outer one, so that they still read its
+    writes.
+    """
+    if replica_state.scopes:
+        replica_state.scopes += 1
+        try:
+            yield
+        finally:
+            replica_state.scopes -= 1
+        return
+    replica_state.reset()
+    replica_state.scopes = 1
+    try:
+        yield
+    finally:
+        replica_state.reset()
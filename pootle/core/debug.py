@@ -7,10 +7,15 @@
 # AUTHORS file for copyright and authorship information.
 
 import gc
+import inspect
 import logging
 import resource
+import socket
+import threading
 import time
+from collections import deque
 from contextlib import contextmanager
+from functools import wraps
 
 
 logger = logging.getLogger("POOTLE_DEBUG")
@@ -82,3 +87,300 @@ def memusage(proc=None):
     gc.collect()
     usage["after"] = _get_mem_usage(proc)
     usage["used"] = usage["after"] - usage["initial"]
+
+
+# Instrumentation
+#
+# Named spans can be wrapped around hot paths with ``span`` or the
+# ``instrument`` decorator. When ``POOTLE_INSTRUMENTATION`` is set, each
+# span counts the db queries and db time, and the ``persistent_property``
+# cache hits and misses, that happen inside it, and is then emitted to the
+# sinks configured in ``POOTLE_INSTRUMENTATION_SINKS``.
+
+_instrumentation = threading.local()
+_sinks = {}
+
+
+def instrumentation_enabled():
+    from django.conf import settings
+
+    return getattr(settings, "POOTLE_INSTRUMENTATION", False)
+
+
+class Span(object):
+
+    def __init__(self, name):
+        self.name = name
+        self.start = time.time()
+        self.duration = None
+        self.queries = 0
+        self.db_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def __repr__(self):
+        return "<Span: %s>" % self.name
+
+    @property
+    def summary(self):
+        return dict(
+            name=self.name,
+            duration=self.duration,
+            queries=self.queries,
+            db_time=self.db_time,
+            cache_hits=self.cache_hits,
+            cache_misses=self.cache_misses)
+
+    @property
+    def header(self):
+        return (
+            "duration=%(duration).3f; queries=%(queries)s; "
+            "db_time=%(db_time).3f; cache_hits=%(cache_hits)s; "
+            "cache_misses=%(cache_misses)s"
+            % self.summary)
+
+
+class QueriesLog(deque):
+    """Stands in for a connection's ``queries_log``, also keeping a running
+    count and time of the queries logged, as the log only holds the last
+    9000.
+    """
+
+    def __init__(self, queries_log):
+        super(QueriesLog, self).__init__(
+            queries_log, maxlen=queries_log.maxlen)
+        self.queries = 0
+        self.db_time = 0.0
+
+    def append(self, query):
+        super(QueriesLog, self).append(query)
+        self.queries += 1
+        self.db_time += float(query["time"])
+
+
+def _get_query_totals(connection):
+    queries_log = connection.queries_log
+    if not isinstance(queries_log, deque):
+        # another stand-in, eg when benchmarking, that counts all queries
+        return len(queries_log), getattr(queries_log, "time", 0.0)
+    if not isinstance(queries_log, QueriesLog):
+        queries_log = connection.queries_log = QueriesLog(queries_log)
+    return queries_log.queries, queries_log.db_time
+
+
+def _get_all_query_totals():
+    """Returns the totals of queries and db time on all of the databases,
+    as reads may be sent to replicas
+    """
+    from django.db import connections
+
+    queries = 0
+    db_time = 0.0
+    for connection in connections.all():
+        connection_queries, connection_db_time = _get_query_totals(
+            connection)
+        queries += connection_queries
+        db_time += connection_db_time
+    return queries, db_time
+
+
+def _get_spans():
+    return getattr(_instrumentation, "spans", None) or []
+
+
+def record_cache(hit):
+    """Count a cache hit or miss on all of the active spans"""
+    for active_span in _get_spans():
+        if hit:
+            active_span.cache_hits += 1
+        else:
+            active_span.cache_misses += 1
+
+
+def _start_span(name):
+    from django.db import connections
+
+    spans = _get_spans()
+    if not spans:
+        _instrumentation.spans = spans
+        _instrumentation.force_debug_cursor = {}
+        for connection in connections.all():
+            _instrumentation.force_debug_cursor[connection.alias] = (
+                connection.force_debug_cursor)
+            connection.force_debug_cursor = True
+    new_span = Span(name)
+    new_span.queries_start, new_span.db_time_start = (
+        _get_all_query_totals())
+    spans.append(new_span)
+    return new_span
+
+
+def _end_span(ended_span):
+    from django.db import connections
+
+    ended_span.duration = time.time() - ended_span.start
+    spans = _get_spans()
+    if ended_span in spans:
+        spans.remove(ended_span)
+    queries, db_time = _get_all_query_totals()
+    ended_span.queries = queries - ended_span.queries_start
+    ended_span.db_time = db_time - ended_span.db_time_start
+    if not spans:
+        force_debug_cursor = _instrumentation.force_debug_cursor
+        for alias, forced in force_debug_cursor.items():
+            if alias in connections.databases:
+                connections[alias].force_debug_cursor = forced
+    for sink in get_sinks():
+        sink.emit(ended_span)
+
+
+@contextmanager
+def span(name):
+    """Instrument the wrapped code as a span called ``name``.
+
+    Yields the ``Span``, or ``None`` if instrumentation is disabled.
+    """
+    if not instrumentation_enabled():
+        yield None
+        return
+    active_span = _start_span(name)
+    try:
+        yield active_span
+    finally:
+        _end_span(active_span)
+
+
+def instrument(name):
+    """Decorator to instrument calls to a function or generator as a span"""
+
+    def wrapper(func):
+        if inspect.isgeneratorfunction(func):
+
+            @wraps(func)
+            def wrapped_generator(*args, **kwargs):
+                with span(name):
+                    for item in func(*args, **kwargs):
+                        yield item
+            return wrapped_generator
+
+        @wraps(func)
+        def wrapped(*args, **kwargs):
+            if not instrumentation_enabled():
+                return func(*args, **kwargs)
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapped
+    return wrapper
+
+
+class InstrumentationSink(object):
+
+    def emit(self, span):
+        raise NotImplementedError
+
+
+class LoggingSink(InstrumentationSink):
+
+    def emit(self, span):
+        logger.debug(
+            "[span] %(name)s: %(duration).3f seconds, %(queries)s queries "
+            "(%(db_time).3f seconds), cache hits/misses: "
+            "%(cache_hits)s/%(cache_misses)s",
+            span.summary)
+
+
+class StatsdSink(InstrumentationSink):
+    """Sends spans as statsd metrics over UDP"""
+
+    def __init__(self, host=None, port=None, prefix=None):
+        from django.conf import settings
+
+        self.address = (
+            host or getattr(settings, "POOTLE_STATSD_HOST", "localhost"),
+            port or getattr(settings, "POOTLE_STATSD_PORT", 8125))
+        self.prefix = (
+            prefix or getattr(settings, "POOTLE_STATSD_PREFIX", "pootle"))
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def get_metrics(self, span):
+        name = "%s.%s" % (self.prefix, span.name)
+        return [
+            "%s.time:%d|ms" % (name, span.duration * 1000),
+            "%s.queries:%s|c" % (name, span.queries),
+            "%s.db_time:%d|ms" % (name, span.db_time * 1000),
+            "%s.cache_hits:%s|c" % (name, span.cache_hits),
+            "%s.cache_misses:%s|c" % (name, span.cache_misses)]
+
+    def emit(self, span):
+        try:
+            self.socket.sendto(
+                "\n".join(self.get_metrics(span)),
+                self.address)
+        except socket.error as e:
+            logger.debug("[span] failed sending to statsd: %s", e)
+
+
+class PrometheusSink(InstrumentationSink):
+    """Aggregates spans in the process, to be rendered in the Prometheus
+    text format
+    """
+
+    metrics = (
+        ("count", "counter", "Number of spans"),
+        ("duration_seconds", "counter", "Total time in spans"),
+        ("queries", "counter", "Total db queries in spans"),
+        ("db_seconds", "counter", "Total db time in spans"),
+        ("cache_hits", "counter", "Total cache hits in spans"),
+        ("cache_misses", "counter", "Total cache misses in spans"))
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.spans = {}
+
+    def emit(self, span):
+        with self.lock:
+            totals = self.spans.setdefault(
+                span.name,
+                dict((metric, 0) for metric, __, __ in self.metrics))
+            totals["count"] += 1
+            totals["duration_seconds"] += span.duration
+            totals["queries"] += span.queries
+            totals["db_seconds"] += span.db_time
+            totals["cache_hits"] += span.cache_hits
+            totals["cache_misses"] += span.cache_misses
+
+    def render(self):
+        lines = []
+        with self.lock:
+            for metric, metric_type, help_text in self.metrics:
+                name = "pootle_span_%s" % metric
+                lines.append("# HELP %s %s" % (name, help_text))
+                lines.append("# TYPE %s %s" % (name, metric_type))
+                for span_name in sorted(self.spans):
+                    lines.append(
+                        '%s{span="%s"} %s'
+                        % (name, span_name, self.spans[span_name][metric]))
+        return "\n".join(lines) + "\n"
+
+
+def get_sinks():
+    """Returns the sinks configured in ``POOTLE_INSTRUMENTATION_SINKS``,
+    created once for each configuration
+    """
+    from django.conf import settings
+    from django.utils.module_loading import import_string
+
+    config = tuple(
+        getattr(
+            settings,
+            "POOTLE_INSTRUMENTATION_SINKS",
+            ["pootle.core.debug.LoggingSink"]))
+    if config not in _sinks:
+        _sinks[config] = [import_string(sink)() for sink in config]
+    return _sinks[config]
+
+
+def get_sink(sink_class):
+    for sink in get_sinks():
+        if isinstance(sink, sink_class):
+            return sink
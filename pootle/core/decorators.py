@@ -6,10 +6,12 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
+import inspect
 import logging
 import time
 from functools import wraps
 
+from django.conf import settings
 from django.core.exceptions import PermissionDenied
 from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect
@@ -20,7 +22,10 @@ from pootle_app.models.permissions import (check_permission,
                                            get_matching_permissions)
 from pootle_project.models import Project, ProjectSet
 
-from .cache import get_cache
+from .cache import cache_stats, get_cache, local_cache
+from .contextmanagers import replica_safe
+from .debug import record_cache
+from .routers import get_read_db, replica_state
 from .exceptions import Http400
 from .url_helpers import split_pootle_path
 
@@ -163,6 +168,36 @@ def admin_required(func):
     return wrapped
 
 
+def replica_reads(func):
+    """Runs ``func`` in a ``replica_safe`` context.
+
+    For generator functions the context is only entered while the
+    generator runs, and not while it is suspended.
+    """
+
+    if inspect.isgeneratorfunction(func):
+
+        @wraps(func)
+        def wrapped_generator(*args, **kwargs):
+            generator = func(*args, **kwargs)
+            while True:
+                with replica_safe():
+                    try:
+                        item = next(generator)
+                    except StopIteration:
+                        return
+                yield item
+
+        return wrapped_generator
+
+    @wraps(func)
+    def wrapped(*args, **kwargs):
+        with replica_safe():
+            return func(*args, **kwargs)
+
+    return wrapped
+
+
 class persistent_property(object):
     """
     Similar to cached_property, except it caches in the memory cache rather
@@ -178,46 +213,131 @@ class persistent_property(object):
     If no cache_key attribute is present or returns None, it will use instance
     caching by default. This behaviour can be switched off by setting
     `always_cache` to False in the decorator.
+
+    Cached values are also kept in a per-process LRU cache in front of the
+    shared cache. On a miss only one process computes the value, while
+    others wait for it. If `POOTLE_CACHE_STALE_WHILE_REVALIDATE` is set and
+    the class has a `stale_cache_key` (set with `stale_key_attr`), the
+    others instead get the last value computed for the stale key.
+
+    Values computed from reads served by a replica may be older than the
+    revisions in their cache key, so they are only cached for
+    `POOTLE_DB_REPLICA_CACHE_TIMEOUT` seconds.
     """
 
+    wait_interval = 0.05
+
     def __init__(self, func, name=None, key_attr=None, always_cache=True,
-                 ns_attr=None, version_attr=None):
+                 ns_attr=None, version_attr=None, stale_key_attr=None):
         self.func = func
         self.__doc__ = getattr(func, '__doc__')
         self.name = name or func.__name__
         self.ns_attr = ns_attr or "ns"
         self.key_attr = key_attr or "cache_key"
         self.version_attr = version_attr or "sw_version"
+        self.stale_key_attr = stale_key_attr or "stale_cache_key"
         self.always_cache = always_cache
 
-    def _get_cache_key(self, instance):
+    @property
+    def lock_timeout(self):
+        return getattr(settings, "POOTLE_CACHE_LOCK_TIMEOUT", 30)
+
+    @property
+    def replica_timeout(self):
+        return getattr(settings, "POOTLE_DB_REPLICA_CACHE_TIMEOUT", 60)
+
+    def _get_cache_key(self, instance, key_attr=None):
         ns = getattr(instance, self.ns_attr, "pootle.core")
         sw_version = getattr(instance, self.version_attr, "")
-        cache_key = getattr(instance, self.key_attr, None)
+        cache_key = getattr(instance, key_attr or self.key_attr, None)
         if cache_key:
             return (
                 "%s.%s.%s.%s"
                 % (ns, sw_version, cache_key, self.name))
 
-    def __get__(self, instance, cls=None):
-        if instance is None:
-            return self
-        cache_key = self._get_cache_key(instance)
-        if cache_key:
-            cache = get_cache('lru')
+    def _get_stale_key(self, instance):
+        stale = getattr(
+            settings, "POOTLE_CACHE_STALE_WHILE_REVALIDATE", False)
+        stale_key = (
+            stale
+            and self._get_cache_key(instance, self.stale_key_attr))
+        if stale_key:
+            return "%s.stale" % stale_key
+
+    def _get_stats_name(self, instance):
+        return (
+            "%s.%s"
+            % (getattr(instance, self.ns_attr, "pootle.core"), self.name))
+
+    def _wait(self, cache, cache_key, lock_key):
+        """Wait for another process holding the lock to compute the value"""
+        timeout = time.time() + self.lock_timeout
+        while time.time() < timeout:
+            time.sleep(self.wait_interval)
             cached = cache.get(cache_key)
+            if cached is not None or cache.get(lock_key) is None:
+                return cached
+
+    def _get_cached(self, instance, cache_key):
+        stats_name = self._get_stats_name(instance)
+        cached = local_cache.get(cache_key)
+        if cached is not None:
+            # local cache hit
+            record_cache(True)
+            cache_stats.incr(stats_name, "local_hits")
+            return cached
+        cache = get_cache('lru')
+        cached = cache.get(cache_key)
+        if cached is not None:
+            # cache hit
+            record_cache(True)
+            cache_stats.incr(stats_name, "hits")
+            local_cache.set(cache_key, cached)
+            return cached
+        # cache miss
+        record_cache(False)
+        cache_stats.incr(stats_name, "misses")
+        lock_key = "%s.lock" % cache_key
+        locked = cache.add(lock_key, 1, self.lock_timeout)
+        if not locked:
+            stale_key = self._get_stale_key(instance)
+            stale = stale_key and cache.get(stale_key)
+            if stale is not None:
+                cache_stats.incr(stats_name, "stale")
+                return stale
+            cache_stats.incr(stats_name, "waits")
+            cached = self._wait(cache, cache_key, lock_key)
             if cached is not None:
-                # cache hit
+                local_cache.set(cache_key, cached)
                 return cached
-            # cache miss
+        timeout = {}
+        try:
+            replica_reads = replica_state.reads
             start = time.time()
             res = self.func(instance)
             timetaken = time.time() - start
-            cache.set(cache_key, res)
-            logger.debug(
-                "[cache] generated %s in %s seconds",
-                cache_key, timetaken)
-            return res
+            if get_read_db() or replica_state.reads != replica_reads:
+                timeout["timeout"] = self.replica_timeout
+            cache.set(cache_key, res, **timeout)
+            stale_key = self._get_stale_key(instance)
+            if stale_key:
+                cache.set(stale_key, res)
+        finally:
+            if locked:
+                cache.delete(lock_key)
+        local_cache.set(cache_key, res, **timeout)
+        cache_stats.incr(stats_name, "compute_time", timetaken)
+        logger.debug(
+            "[cache] generated %s in %s seconds",
+            cache_key, timetaken)
+        return res
+
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self
+        cache_key = self._get_cache_key(instance)
+        if cache_key:
+            return self._get_cached(instance, cache_key)
         elif self.always_cache:
             res = instance.__dict__[self.name] = self.func(instance)
             return res
@@ -53,6 +53,7 @@ score_updater = Getter()
 site = Getter()
 states = Getter()
 stopwords = Getter()
+store_batch = Getter()
 text_comparison = Getter()
 panels = Provider()
 
@@ -349,4 +349,5 @@ class FormtableForm(PaginatingForm, FormWithActionsMixin):
         paginator = Paginator(
             self.fields[self.search_field].queryset,
             self._results_per_page)
+        paginator.count = self.count_choices(paginator.object_list)
         return paginator.page(self._page_no)
@@ -6,11 +6,12 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
-import pathlib
 import posixpath
+from bisect import bisect_left
 from hashlib import md5
 
 from django.utils.encoding import force_bytes
+from django.utils.functional import cached_property
 
 from pootle.core.decorators import persistent_property
 from pootle.core.delegate import revision
@@ -23,7 +24,7 @@ class Paths(object):
         self.q = q
         self.show_all = show_all
 
-    @property
+    @cached_property
     def rev_cache_key(self):
         return revision.get(
             self.context.directory.__class__)(
@@ -32,8 +33,9 @@ class Paths(object):
     @property
     def cache_key(self):
         return (
-            "%s.%s.%s"
-            % (md5(force_bytes(self.q)).hexdigest(),
+            "%s.%s.%s.%s"
+            % (self.context.pootle_path,
+               md5(force_bytes(self.q)).hexdigest(),
                self.rev_cache_key,
                self.show_all))
 
@@ -42,31 +44,106 @@ class Paths(object):
         raise NotImplementedError
 
     @property
-    def stores(self):
+    def index_cache_key(self):
+        # contexts can share a revision, eg after a batch of revision updates
+        return (
+            "%s.%s.%s"
+            % (self.context.pootle_path,
+               self.rev_cache_key,
+               self.show_all))
+
+    @property
+    def all_stores(self):
         stores = self.store_qs.exclude(obsolete=True)
         if not self.show_all:
             stores = stores.exclude(
                 translation_project__project__disabled=True)
-        return stores.exclude(is_template=True).filter(
-            tp_path__contains=self.q).order_by()
+        return stores.exclude(is_template=True).order_by()
+
+    @property
+    def stores(self):
+        return self.all_stores.filter(tp_path__contains=self.q)
+
+    def _index(self):
+        """Sorted list of the `tp_path`s of all stores in the context.
+
+        This is cached against the context's stats revision, so searches can
+        be answered without querying the db.
+        """
+        return sorted(
+            set(self.all_stores.values_list("tp_path", flat=True)))
+    index = persistent_property(
+        _index,
+        name="index",
+        key_attr="index_cache_key")
+
+    @cached_property
+    def lower_index(self):
+        """The index as `(lowercase path, path)` pairs, sorted by lowercase
+        path for case insensitive prefix lookups
+        """
+        return sorted((path.lower(), path) for path in self.index)
+
+    def get_parents(self, path):
+        parts = path.split("/")[:-1]
+        return [
+            "%s/" % "/".join(parts[:i + 1])
+            for i
+            in range(len(parts))]
+
+    def get_prefix_matches(self, q):
+        """Returns the `tp_path`s starting with `/` followed by the lowercase
+        ``q``, found with a binary search of the sorted index
+        """
+        prefix = "/%s" % q
+        i = bisect_left(self.lower_index, (prefix, ))
+        matches = []
+        while i < len(self.lower_index):
+            lower_path, path = self.lower_index[i]
+            if not lower_path.startswith(prefix):
+                break
+            matches.append(path)
+            i += 1
+        return matches
+
+    def get_rank(self, path, q):
+        """Sort key for a result, ranking paths or names starting with the
+        lowercase ``q`` first, then other matches, and then the parents of
+        matching stores
+        """
+        lower_path = path.lower()
+        name = posixpath.basename(lower_path.rstrip("/"))
+        if lower_path.startswith(q) or name.startswith(q):
+            rank = 0
+        elif q in lower_path:
+            rank = 1
+        else:
+            rank = 2
+        return rank, posixpath.dirname(path), posixpath.basename(path)
 
     @persistent_property
     def paths(self):
-        stores = set(
-            st[1:]
-            for st
-            in self.stores.values_list("tp_path", flat=True))
+        """Paths of the stores matching the search, and of their parent
+        directories, ranked with `get_rank`.
+
+        Searches starting with `/` only match paths starting with the rest
+        of the search, and are answered with a prefix lookup, other
+        searches match anywhere in the path.
+        """
+        q = self.q.lower()
+        if q.startswith("/"):
+            q = q[1:]
+            matches = self.get_prefix_matches(q)
+        else:
+            matches = [
+                path
+                for lower_path, path
+                in self.lower_index
+                if q in lower_path]
+        stores = set(path[1:] for path in matches)
         dirs = set()
         for store in stores:
-            if posixpath.dirname(store) in dirs:
-                continue
-            dirs = (
-                dirs
-                | (set(
-                    "%s/" % str(p)
-                    for p
-                    in pathlib.PosixPath(store).parents
-                    if str(p) != ".")))
+            dirs.update(self.get_parents(store))
         return sorted(
             dirs | stores,
-            key=lambda path: (posixpath.dirname(path), posixpath.basename(path)))
+            key=lambda path: self.get_rank(path, q))
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import random
+import threading
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+
+def get_replicas():
+    """Returns the aliases of the configured read replicas"""
+    return [
+        alias
+        for alias
+        in getattr(settings, "POOTLE_DB_REPLICAS", [])
+        if alias in settings.DATABASES and alias != DEFAULT_DB_ALIAS]
+
+
+class ReplicaState(threading.local):
+    """Per-thread state of replica reads.
+
+    Reads are only sent to a replica inside a ``replica_safe`` context, and
+    only while the thread is not pinned to the primary, which happens when
+    it writes to the database or inside a ``use_primary`` context.
+
+    ``reads`` counts the times a replica was handed out for reading, so that
+    callers can tell whether data they computed may be out of date.
+    """
+
+    def __init__(self):
+        self.reads = 0
+        self.reset()
+
+    @property
+    def db(self):
+        """The replica to read from, or ``None`` to read from the
+        primary
+        """
+        if self.safe and not (self.pinned or self.primary or self.written):
+            if self.replica:
+                self.reads += 1
+            return self.replica
+
+    def enter(self):
+        if not self.safe:
+            replicas = get_replicas()
+            self.replica = random.choice(replicas) if replicas else None
+        self.safe += 1
+
+    def exit(self):
+        self.safe -= 1
+        if not self.safe:
+            self.replica = None
+
+    def reset(self):
+        self.scopes = 0
+        self.safe = 0
+        self.primary = 0
+        self.pinned = False
+        self.written = False
+        self.replica = None
+
+
+replica_state = ReplicaState()
+
+
+def get_read_db():
+    """Returns the alias of the replica that replica-safe reads in the
+    current context should use, or ``None`` for the primary
+    """
+    return replica_state.db
+
+
+class ReplicaRouter(object):
+    """Sends replica-safe reads to the replicas in ``POOTLE_DB_REPLICAS``,
+    and everything else to the primary database.
+    """
+
+    def db_for_read(self, model, **hints):
+        return get_read_db()
+
+    def db_for_write(self, model, **hints):
+        # reads for the rest of the request must see this write
+        replica_state.written = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        dbs = set([DEFAULT_DB_ALIAS] + get_replicas())
+        if obj1._state.db in dbs and obj2._state.db in dbs:
+            return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in get_replicas():
+            return False
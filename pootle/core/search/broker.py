@@ -9,6 +9,8 @@
 import importlib
 import logging
 
+from pootle.core.debug import instrument
+
 from . import SearchBackend
 
 
@@ -43,6 +45,7 @@ class SearchBroker(SearchBackend):
                     logging.warning("Search backend '%s'. Cannot import '%s'",
                                     server, _module)
 
+    @instrument("search.search")
     def search(self, unit):
         if not self._servers:
             return []
@@ -68,6 +71,7 @@ class SearchBroker(SearchBackend):
 
         return results
 
+    @instrument("search.update")
     def update(self, language, obj):
         for server in self._servers:
             if self._servers[server].is_auto_updatable:
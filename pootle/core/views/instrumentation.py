@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, HttpResponse
+
+from pootle.core.debug import PrometheusSink, get_sink, instrumentation_enabled
+
+
+def instrumentation_metrics(request):
+    """Instrumentation span totals in the Prometheus text format.
+
+    Only available when instrumentation is enabled with the
+    ``PrometheusSink``, to superusers and to the addresses listed in
+    ``POOTLE_INSTRUMENTATION_METRICS_IPS``.
+    """
+    allowed_ips = getattr(settings, "POOTLE_INSTRUMENTATION_METRICS_IPS", [])
+    if not (request.user.is_superuser
+            or request.META.get("REMOTE_ADDR") in allowed_ips):
+        raise PermissionDenied
+    sink = instrumentation_enabled() and get_sink(PrometheusSink)
+    if not sink:
+        raise Http404
+    return HttpResponse(
+        sink.render(),
+        content_type="text/plain; version=0.0.4")
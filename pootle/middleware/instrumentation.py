@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+from pootle.core.debug import instrumentation_enabled, span
+
+
+class InstrumentationMiddleware(object):
+    """Instruments each request as a span, and adds the summary of the
+    span to the response in the `X-Pootle-Instrumentation` header.
+    """
+
+    header = "X-Pootle-Instrumentation"
+
+    def __init__(self, get_response=None):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not instrumentation_enabled():
+            return self.get_response(request)
+        with span("request") as request_span:
+            response = self.get_response(request)
+        response[self.header] = request_span.header
+        return response
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+from django.conf import settings
+
+from pootle.core.contextmanagers import replica_scope
+from pootle.core.routers import get_replicas, replica_state
+
+
+class ReplicaMiddleware(object):
+    """Keeps the reads of a client on the primary database after it has
+    written, for `POOTLE_DB_REPLICA_PIN_TIME` seconds, so that it does not
+    read data older than its own writes from a replica.
+    """
+
+    cookie = "pootle_primary"
+
+    def __init__(self, get_response=None):
+        self.get_response = get_response
+
+    @property
+    def pin_time(self):
+        return getattr(settings, "POOTLE_DB_REPLICA_PIN_TIME", 10)
+
+    def __call__(self, request):
+        if not get_replicas():
+            return self.get_response(request)
+        with replica_scope():
+            replica_state.pinned = self.cookie in request.COOKIES
+            response = self.get_response(request)
+            if replica_state.written and self.pin_time:
+                response.set_cookie(
+                    self.cookie,
+                    "1",
+                    max_age=self.pin_time,
+                    httponly=True)
+        return response
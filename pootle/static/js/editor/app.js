@@ -54,6 +54,9 @@ PTL.reactEditor = ReactEditor;
 
 const CTX_STEP = 1;
 
+// Number of units following the current one whose edit data is prefetched
+const PREFETCH_UNITS = 5;
+
 const ALLOWED_SORTS = ['oldest', 'newest', 'default'];
 
 const debounce = function (func, wait) {
@@ -119,14 +122,27 @@ PTL.editor = {
     }
 
     this.formats = {};
+    this.editUnitCache = {};
 
     this.setActiveUnit = debounce((body, newUnit) => {
       this.fetchUnits().always(() => {
-        UnitAPI.fetchUnit(newUnit.id, body)
+        // TM suggestions are requested alongside the unit, and added once
+        // the unit has been rendered
+        const tmRequest = UnitAPI.fetchTMSuggestions(newUnit.id);
+        const cachedUnit = this.editUnitCache[newUnit.id];
+        delete this.editUnitCache[newUnit.id];
+        const unitRequest = (
+          cachedUnit ?
+            $.Deferred().resolve(cachedUnit) :
+            UnitAPI.fetchUnit(newUnit.id, body)
+        );
+        unitRequest
           .then(
             (data) => {
               this.setEditUnit(data);
               this.renderUnit();
+              tmRequest.then((tmData) => this.setTMSuggestions(tmData));
+              this.prefetchUnits(body);
             },
             this.error
           );
@@ -639,11 +655,6 @@ PTL.editor = {
       this.getTMUnits();
     }
 
-    if (this.tmData !== null) {
-      const tmContent = this.getTMUnitsContent(this.tmData);
-      $('#extras-container').append(tmContent);
-    }
-
     this.runHooks();
 
     this.isUnitDirty = false;
@@ -1541,6 +1552,7 @@ PTL.editor = {
     if (this.offset === 0) {
       this.units.reset();
       this.units.uIds = [];
+      this.editUnitCache = {};
       this.units.frozenTotal = total;
     }
     if (this.initialOffset === -1) {
@@ -1585,10 +1597,35 @@ PTL.editor = {
     currentUnit.set('isObsolete', data.is_obsolete);
     currentUnit.set('sources', data.sources);
 
-    this.tmData = data.tm_suggestions || null;
     this.editorRow = data.editor;
   },
 
+  /* Fetches the edit data for the units following the current one */
+  prefetchUnits(body) {
+    const uIds = this.units.uIds;
+    const start = uIds.indexOf(this.units.getCurrent().id) + 1;
+    const nextIds = uIds.slice(start, start + PREFETCH_UNITS).filter(
+      (uId) => !this.editUnitCache.hasOwnProperty(uId)
+    );
+    if (!nextIds.length) {
+      return;
+    }
+    UnitAPI.fetchEditUnits(nextIds, body).then((data) => {
+      data.units.forEach((unit) => {
+        this.editUnitCache[unit.uid] = unit;
+      });
+    });
+  },
+
+  /* Adds the TM suggestions for the current unit */
+  setTMSuggestions(data) {
+    if (!data.tm_suggestions || data.uid !== this.units.getCurrent().id) {
+      return;
+    }
+    const tmContent = this.getTMUnitsContent(data.tm_suggestions);
+    $('#extras-container').append(tmContent);
+  },
+
   /* Sets a new unit as the current one, rendering it as well */
   setUnit(unit) {
     const newUnit = this.units.setCurrent(unit);
@@ -1752,11 +1789,14 @@ PTL.editor = {
           window.location.href = $this.backToBrowserEl.getAttribute('href');
         } else {
           // reload check data on the current unit
-          UnitAPI.fetchUnit($this.units.getCurrent().id)
+          const uId = $this.units.getCurrent().id;
+          const tmRequest = UnitAPI.fetchTMSuggestions(uId);
+          UnitAPI.fetchUnit(uId)
             .then(
               (unitData) => {
                 $this.setEditUnit(unitData);
                 $this.renderUnit();
+                tmRequest.then((tmData) => $this.setTMSuggestions(tmData));
               },
               $this.error
             );
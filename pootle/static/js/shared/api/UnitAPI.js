@@ -6,6 +6,8 @@
  * AUTHORS file for copyright and authorship information.
  */
 
+import assign from 'object-assign';
+
 import fetch from 'utils/fetch';
 
 window.PTL = window.PTL || {};
@@ -29,6 +31,21 @@ const UnitAPI = {
     });
   },
 
+  fetchEditUnits(uIds, body = {}) {
+    return fetch({
+      body: assign({ uids: uIds.join(',') }, body),
+      queue: 'unitPrefetch',
+      url: `${this.apiRoot}edit/`,
+    });
+  },
+
+  fetchTMSuggestions(uId) {
+    return fetch({
+      queue: 'unitTM',
+      url: `${this.apiRoot}${uId}/tm/`,
+    });
+  },
+
   addTranslation(uId, body) {
     return fetch({
       body,
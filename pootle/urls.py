@@ -11,6 +11,7 @@ from django.conf.urls import include, url
 from django.views.generic import TemplateView
 
 from pootle.core.delegate import url_patterns
+from pootle.core.views.instrumentation import instrumentation_metrics
 
 
 urlpatterns = []
@@ -39,6 +40,9 @@ urlpatterns += [
 
     # Pootle URLs
     url(r'', include('staticpages.urls')),
+    url(r'^\+\+metrics/$',
+        instrumentation_metrics,
+        name='pootle-instrumentation-metrics'),
     url(r'^help/quality-checks/',
         TemplateView.as_view(template_name="help/quality_checks.html"),
         name='pootle-checks-descriptions'),
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+"""Synthetic data and measurements for the benchmark suite."""
+
+import gc
+import json
+import os
+import resource
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from .utils import FUZZY_STRING_UNIT, STRING_STORE, STRING_UNIT, create_store
+
+
+# default sizes used when the benchmarks are run without size options
+BENCHMARK_UNITS = (1000, 10000, 100000)
+BENCHMARK_FILES = (10000, )
+
+# the metrics compared against a baseline, and the minimum change for each
+# that is reported as a regression, so that noise in small timings and
+# memory readings is ignored
+BENCHMARK_METRICS = OrderedDict(
+    (("time", 0.05),
+     ("queries", 0),
+     ("memory", 1024)))
+
+
+def generate_units(count, offset=0, changed_every=0, fuzzy_every=10):
+    """Yields ``(source, target, is_fuzzy)`` tuples for ``count`` units.
+
+    Every ``changed_every`` unit gets a different target, so that the
+    same ``count`` and ``offset`` can be used to create a store and an
+    updated copy of it.
+    """
+    for i in range(offset, offset + count):
+        target = "Translation %s" % i
+        if changed_every and not i % changed_every:
+            target = "Changed translation %s" % i
+        yield (
+            "Benchmark string %s" % i,
+            target,
+            bool(fuzzy_every and not i % fuzzy_every))
+
+
+def generate_store(count, **kwargs):
+    """Returns a parsed ttk store with ``count`` synthetic units"""
+    return create_store(units=list(generate_units(count, **kwargs)))
+
+
+def generate_po(count, **kwargs):
+    units = []
+    for src, target, is_fuzzy in generate_units(count, **kwargs):
+        unit = FUZZY_STRING_UNIT if is_fuzzy else STRING_UNIT
+        units.append(unit % {"src": src, "target": target})
+    return STRING_STORE % {
+        "x_pootle_headers": "",
+        "units": "\n\n".join(units)}
+
+
+def create_benchmark_store(tp, count, name=None):
+    """Creates a store in ``tp`` with ``count`` synthetic units"""
+    from pootle_store.constants import POOTLE_WINS
+
+    from .factories import StoreDBFactory
+
+    store = StoreDBFactory(
+        translation_project=tp,
+        parent=tp.directory,
+        name=name or "benchmark%s.po" % count)
+    store.update(
+        store=generate_store(count),
+        resolve_conflict=POOTLE_WINS)
+    return store
+
+
+def create_benchmark_files(fs_path, language_code, count, units=10,
+                           files_per_dir=100):
+    """Writes ``count`` PO files with ``units`` synthetic units each to
+    ``fs_path`` for the given language, with ``files_per_dir`` files in each
+    subdirectory.
+    """
+    po = generate_po(units)
+    paths = []
+    for i in range(count):
+        dir_path = os.path.join(
+            fs_path,
+            language_code,
+            "dir%s" % (i // files_per_dir))
+        if not os.path.exists(dir_path):
+            os.makedirs(dir_path)
+        path = os.path.join(dir_path, "file%s.po" % i)
+        with open(path, "w") as f:
+            f.write(po)
+        paths.append(path)
+    return paths
+
+
+class QueryCounter(object):
+    """Stands in for a connection's ``queries_log`` to count queries without
+    keeping them, as the log only holds the last 9000.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.time = 0.0
+
+    def __len__(self):
+        return self.count
+
+    def append(self, query):
+        self.count += 1
+        self.time += float(query["time"])
+
+    def clear(self):
+        self.count = 0
+        self.time = 0.0
+
+
+def _reset_peak_memory():
+    # on linux the peak memory of a process can be reset to its current
+    # memory, elsewhere peak memory is only measured when it grows
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except (IOError, OSError):
+        pass
+
+
+def _get_peak_memory():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except (IOError, OSError):
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+@contextmanager
+def measure():
+    """Measures the wrapped code, and yields a dictionary that is updated
+    with its ``time`` in seconds, the number of db ``queries`` and
+    ``db_time``, and the peak ``memory`` it uses in KB.
+
+    Where peak memory cannot be reset for the process, ``memory`` is only
+    reported when the wrapped code raises it above what the process has
+    used before.
+    """
+    from django.db import connection
+
+    result = {}
+    counter = QueryCounter()
+    queries_log = connection.queries_log
+    force_debug_cursor = connection.force_debug_cursor
+    connection.queries_log = counter
+    connection.force_debug_cursor = True
+    gc.collect()
+    _reset_peak_memory()
+    memory = _get_peak_memory()
+    start = time.time()
+    try:
+        yield result
+    finally:
+        result["time"] = time.time() - start
+        connection.queries_log = queries_log
+        connection.force_debug_cursor = force_debug_cursor
+        result["queries"] = counter.count
+        result["db_time"] = counter.time
+        result["memory"] = _get_peak_memory() - memory
+
+
+class BenchmarkResults(object):
+    """Results of benchmark scenarios keyed by name, that can be saved to
+    and compared with a JSON baseline.
+    """
+
+    def __init__(self, results=None):
+        self.results = OrderedDict(results or ())
+
+    def __iter__(self):
+        return iter(self.results)
+
+    def __len__(self):
+        return len(self.results)
+
+    def __getitem__(self, name):
+        return self.results[name]
+
+    def add(self, name, result):
+        self.results[name] = result
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            data = json.load(f, object_pairs_hook=OrderedDict)
+        return cls(data["results"])
+
+    def save(self, path, **info):
+        data = OrderedDict(info)
+        data["results"] = self.results
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+
+    def compare(self, baseline, tolerance=0.25):
+        """Returns a list of ``(name, metric, baseline, result)`` for each
+        metric that is more than ``tolerance`` worse than in ``baseline``.
+
+        Scenarios that are not in both sets of results are ignored.
+        """
+        regressions = []
+        for name, result in self.results.items():
+            if name not in baseline:
+                continue
+            for metric, minimum in BENCHMARK_METRICS.items():
+                base = baseline[name].get(metric)
+                current = result.get(metric)
+                if base is None or current is None:
+                    continue
+                worse = current - base
+                if worse > minimum and worse > base * tolerance:
+                    regressions.append((name, metric, base, current))
+        return regressions
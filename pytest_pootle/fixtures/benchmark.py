@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+from contextlib import contextmanager
+
+import pytest
+
+from pytest_pootle.benchmark import (
+    BENCHMARK_FILES, BENCHMARK_UNITS, create_benchmark_store, measure)
+
+
+def _get_sizes(config, option, default):
+    sizes = config.getoption(option)
+    if not sizes:
+        return list(default)
+    return [int(size) for size in sizes.split(",")]
+
+
+def pytest_generate_tests(metafunc):
+    if "benchmark_units" in metafunc.fixturenames:
+        metafunc.parametrize(
+            "benchmark_units",
+            _get_sizes(
+                metafunc.config, "--benchmark-units", BENCHMARK_UNITS))
+    if "benchmark_files" in metafunc.fixturenames:
+        metafunc.parametrize(
+            "benchmark_files",
+            _get_sizes(
+                metafunc.config, "--benchmark-files", BENCHMARK_FILES))
+
+
+@pytest.fixture
+def benchmark_scenario(request):
+    """Returns a context manager that measures the code it wraps, and adds
+    the result to the session's benchmark results as the current test.
+    """
+    results = request.config.pootle_benchmarks
+
+    @contextmanager
+    def _benchmark(name=None):
+        with measure() as result:
+            yield result
+        results.add(name or request.node.name, result)
+    return _benchmark
+
+
+@pytest.fixture
+def benchmark_store(tp0, benchmark_units):
+    """A store in tp0 with ``benchmark_units`` synthetic units"""
+    return create_benchmark_store(tp0, benchmark_units)
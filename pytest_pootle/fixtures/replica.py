@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import pytest
+
+
+@pytest.fixture
+def replica_db(request, settings, tmpdir):
+    """Adds a `replica` SQLite database, and sets it as a read replica.
+
+    The replica is empty, so tests need to create the tables they read.
+    """
+    from django.db import connections
+
+    from pootle.core.routers import replica_state
+
+    alias = "replica"
+    connections.databases[alias] = dict(
+        ENGINE="django.db.backends.sqlite3",
+        NAME=str(tmpdir.join("replica.db")))
+    settings.POOTLE_DB_REPLICAS = [alias]
+    replica_state.reset()
+
+    def _remove_replica():
+        connections[alias].close()
+        del connections.databases[alias]
+        if hasattr(connections._connections, alias):
+            delattr(connections._connections, alias)
+        replica_state.reset()
+
+    request.addfinalizer(_remove_replica)
+    return alias
@@ -232,6 +232,9 @@ def clear_cache():
 
     from django_redis import get_redis_connection
 
+    from pootle.core.cache import local_cache
+
+    local_cache.clear()
     get_redis_connection('default').flushdb()
     get_redis_connection('lru').flushdb()
     get_redis_connection('redis').flushdb()
@@ -271,6 +274,19 @@ def media_test_dir(request, settings, tmpdir):
     return media_dir
 
 
+@pytest.fixture
+def import_spool_dir(request, settings, tmpdir):
+    spool_dir = str(tmpdir.mkdir("import_spool"))
+    settings.POOTLE_IMPORT_SPOOL_PATH = spool_dir
+
+    def rm_spool_dir():
+        if os.path.exists(spool_dir):
+            shutil.rmtree(spool_dir)
+
+    request.addfinalizer(rm_spool_dir)
+    return spool_dir
+
+
 @pytest.fixture(scope="session")
 def export_dir(request):
     export_dir = tempfile.mkdtemp()
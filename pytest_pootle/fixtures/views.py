@@ -355,7 +355,7 @@ def bad_views(request, client):
     ("member", "member2", {"user_id": ""}),
     ("admin", "member2", {}),
 ])
-def tp_uploads(request, client):
+def tp_uploads(request, client, import_spool_dir):
     from pootle.core.delegate import language_team
     from pootle_language.models import Language
     from pootle_translationproject.models import TranslationProject
@@ -11,6 +11,7 @@ from pkgutil import iter_modules
 import pytest
 
 from . import fixtures
+from .benchmark import BenchmarkResults
 from .fixtures import (
     core as fixtures_core, formats as fixtures_formats,
     models as fixtures_models, pootle_fs as fixtures_fs)
@@ -44,6 +45,37 @@ def pytest_addoption(parser):
         action="store_true",
         default=False,
         help="Run memusage tests")
+    parser.addoption(
+        "--benchmarks",
+        action="store_true",
+        default=False,
+        help="Run benchmark tests")
+    parser.addoption(
+        "--benchmark-units",
+        action="store",
+        default="",
+        help="Comma separated numbers of units in benchmarked stores")
+    parser.addoption(
+        "--benchmark-files",
+        action="store",
+        default="",
+        help="Comma separated numbers of files in benchmarked projects")
+    parser.addoption(
+        "--benchmark-results",
+        action="store",
+        default="",
+        help="Save benchmark results as JSON to a given file")
+    parser.addoption(
+        "--benchmark-baseline",
+        action="store",
+        default="",
+        help="Compare benchmark results with a given JSON baseline")
+    parser.addoption(
+        "--benchmark-tolerance",
+        action="store",
+        type=float,
+        default=0.25,
+        help="Allowed benchmark regression as a fraction of the baseline")
 
 
 def pytest_configure(config):
@@ -52,6 +84,9 @@ def pytest_configure(config):
         "markers", "pootle_vfolders: requires special virtual folder projects")
     config.addinivalue_line(
         "markers", "pootle_memusage: memory usage tests")
+    config.addinivalue_line(
+        "markers", "pootle_benchmark: benchmark tests")
+    config.pootle_benchmarks = BenchmarkResults()
     pytest_plugins = tuple(
         _load_fixtures(
             fixtures,
@@ -69,3 +104,47 @@ def pytest_runtest_setup(item):
     marker = item.get_marker("pootle_memusage")
     if marker is not None and not item.config.getoption("--memusage"):
         pytest.skip("test requires memusage flag")
+    marker = item.get_marker("pootle_benchmark")
+    if marker is not None and not item.config.getoption("--benchmarks"):
+        pytest.skip("test requires benchmarks flag")
+
+
+def pytest_sessionfinish(session, exitstatus):
+    config = session.config
+    results = config.pootle_benchmarks
+    if not results:
+        return
+    path = config.getoption("--benchmark-results")
+    if path:
+        from django.db import connection
+
+        results.save(path, vendor=connection.vendor)
+    baseline = config.getoption("--benchmark-baseline")
+    if baseline:
+        config.pootle_benchmark_regressions = results.compare(
+            BenchmarkResults.load(baseline),
+            config.getoption("--benchmark-tolerance"))
+        if config.pootle_benchmark_regressions and not exitstatus:
+            session.exitstatus = 1
+
+
+def pytest_terminal_summary(terminalreporter):
+    config = terminalreporter.config
+    results = config.pootle_benchmarks
+    if not results:
+        return
+    terminalreporter.write_sep("=", "benchmarks")
+    for name in results:
+        terminalreporter.write_line(
+            "%s: %.3fs, %s queries (%.3fs), %s KB peak memory"
+            % (name,
+               results[name]["time"],
+               results[name]["queries"],
+               results[name]["db_time"],
+               results[name]["memory"]))
+    regressions = getattr(config, "pootle_benchmark_regressions", [])
+    for name, metric, base, current in regressions:
+        terminalreporter.write_line(
+            "REGRESSION %s %s: %s (baseline %s)"
+            % (name, metric, current, base),
+            red=True)
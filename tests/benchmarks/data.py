@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import pytest
+
+from pootle.core.delegate import check_updater
+from pootle_store.models import Store
+
+
+@pytest.mark.pootle_benchmark
+@pytest.mark.django_db
+def test_benchmark_store_data(benchmark_store, benchmark_scenario):
+    with benchmark_scenario():
+        benchmark_store.data_tool.update()
+    assert benchmark_store.data.total_words
+
+
+@pytest.mark.pootle_benchmark
+@pytest.mark.django_db
+def test_benchmark_tp_data(tp0, benchmark_store, benchmark_scenario):
+    with benchmark_scenario():
+        tp0.data_tool.update()
+        stats = tp0.data_tool.get_stats()
+    assert stats["total"] >= benchmark_store.data.total_words
+
+
+@pytest.mark.pootle_benchmark
+@pytest.mark.django_db
+def test_benchmark_store_checks(benchmark_store, benchmark_scenario):
+    benchmark_store.check_data.all().delete()
+    with benchmark_scenario():
+        check_updater.get(Store)(benchmark_store).update(
+            clear_unknown=True,
+            update_data_after=True)
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import pytest
+
+from pytest_pootle.benchmark import create_benchmark_files
+
+from pootle_store.models import Store
+
+
+def _create_fs_files(plugin, count):
+    create_benchmark_files(
+        plugin.project.config["pootle_fs.fs_url"],
+        "language0",
+        count)
+    plugin.fetch()
+
+
+@pytest.mark.pootle_benchmark
+@pytest.mark.django_db
+def test_benchmark_fs_state(project_fs_empty, benchmark_files,
+                            benchmark_scenario):
+    _create_fs_files(project_fs_empty, benchmark_files)
+    with benchmark_scenario():
+        state = project_fs_empty.state()
+        assert len(state["fs_untracked"]) == benchmark_files
+
+
+@pytest.mark.pootle_benchmark
+@pytest.mark.django_db
+def test_benchmark_fs_sync(project_fs_empty, benchmark_files,
+                           benchmark_scenario):
+    _create_fs_files(project_fs_empty, benchmark_files)
+    project_fs_empty.add()
+    with benchmark_scenario():
+        project_fs_empty.sync()
+    assert Store.objects.filter(
+        translation_project__project=project_fs_empty.project).count() == (
+            benchmark_files)
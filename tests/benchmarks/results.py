@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import os
+
+import pytest
+
+from pytest_pootle.benchmark import BenchmarkResults, measure
+
+from pootle_store.models import Unit
+
+
+@pytest.mark.django_db
+def test_benchmark_measure():
+    with measure() as result:
+        for i in range(3):
+            Unit.objects.count()
+    assert result["queries"] == 3
+    assert result["time"] >= result["db_time"] >= 0
+    assert result["memory"] >= 0
+
+
+def test_benchmark_results_compare(tmpdir):
+    baseline = BenchmarkResults()
+    baseline.add("foo", dict(time=1.0, queries=10, memory=1000))
+    baseline.add("bar", dict(time=1.0, queries=10, memory=1000))
+    path = os.path.join(str(tmpdir), "baseline.json")
+    baseline.save(path, vendor="sqlite")
+    baseline = BenchmarkResults.load(path)
+    assert list(baseline) == ["foo", "bar"]
+
+    results = BenchmarkResults()
+    results.add("foo", dict(time=1.2, queries=10, memory=1000))
+    results.add("bar", dict(time=2.0, queries=13, memory=100000))
+    results.add("baz", dict(time=2.0, queries=11, memory=100000))
+    assert results.compare(baseline) == [
+        ("bar", "time", 1.0, 2.0),
+        ("bar", "queries", 10, 13),
+        ("bar", "memory", 1000, 100000)]
+    assert results.compare(baseline, tolerance=1) == [
+        ("bar", "memory", 1000, 100000)]
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import pytest
+
+from pootle.core.delegate import search_backend
+from pootle_store.constants import FUZZY
+from pootle_store.forms import UnitSearchForm
+from pootle_store.models import Unit
+from pootle_store.templatetags.store_tags import (
+    pluralize_source, pluralize_target)
+from pootle_store.unit.results import GroupedResults, StoreResults, UnitResult
+
+
+def _unit_results(units):
+    # serializes each unit on its own, resolving the url for every unit
+    data = []
+    for unit in units:
+        unit = UnitResult(unit)
+        data.append({
+            'id': unit.id,
+            'url': unit.translate_url,
+            'isfuzzy': unit.state == FUZZY,
+            'source': [source[1] for source in pluralize_source(unit)],
+            'target': [target[1]
+                       for target
+                       in pluralize_target(unit, unit.nplurals)]})
+    return data
+
+
+@pytest.mark.pootle_benchmark
+@pytest.mark.django_db
+@pytest.mark.parametrize("search", [
+    dict(filter="all"),
+    dict(filter="translated", sort="newest"),
+    dict(search="string 1", sfields=["source"])],
+    ids=["all", "translated", "text"])
+def test_benchmark_get_units(tp0, member, benchmark_store, search,
+                             benchmark_scenario):
+    search_form = UnitSearchForm(
+        dict(path=tp0.pootle_path, **search),
+        user=member)
+    assert search_form.is_valid()
+    with benchmark_scenario():
+        total, start, end, units_qs = search_backend.get(Unit)(
+            member, **search_form.cleaned_data).search()
+        GroupedResults(units_qs).data
+    assert total
+
+
+@pytest.mark.pootle_benchmark
+@pytest.mark.django_db
+@pytest.mark.parametrize("serializer", ["unit", "store"])
+def test_benchmark_store_results(benchmark_store, serializer,
+                                 benchmark_scenario):
+    units = list(
+        benchmark_store.units.values(*GroupedResults.select_fields))
+    with benchmark_scenario():
+        if serializer == "unit":
+            data = _unit_results(units)
+        else:
+            data = StoreResults(units).data["units"]
+    assert len(data) == len(units)
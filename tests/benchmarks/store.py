@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import pytest
+
+from pytest_pootle.benchmark import generate_store
+from pytest_pootle.factories import StoreDBFactory
+
+from pootle_store.constants import POOTLE_WINS
+from pootle_store.diff import StoreDiff
+
+
+@pytest.mark.pootle_benchmark
+@pytest.mark.django_db
+def test_benchmark_store_add(tp0, benchmark_units, benchmark_scenario):
+    store = StoreDBFactory(
+        translation_project=tp0,
+        parent=tp0.directory,
+        name="benchmark.po")
+    file_store = generate_store(benchmark_units)
+    with benchmark_scenario():
+        store.update(store=file_store, resolve_conflict=POOTLE_WINS)
+    assert store.units.count() == benchmark_units
+
+
+@pytest.mark.pootle_benchmark
+@pytest.mark.django_db
+def test_benchmark_store_diff(benchmark_store, benchmark_units,
+                              benchmark_scenario):
+    file_store = generate_store(benchmark_units, changed_every=10)
+    with benchmark_scenario():
+        diff = StoreDiff(
+            benchmark_store,
+            file_store,
+            benchmark_store.get_max_unit_revision() + 1).diff()
+    assert len(diff["update"][0]) == len(range(0, benchmark_units, 10))
+
+
+@pytest.mark.pootle_benchmark
+@pytest.mark.django_db
+def test_benchmark_store_update(benchmark_store, benchmark_units,
+                                benchmark_scenario):
+    file_store = generate_store(benchmark_units, changed_every=10)
+    with benchmark_scenario():
+        benchmark_store.update(
+            store=file_store,
+            store_revision=benchmark_store.get_max_unit_revision() + 1,
+            resolve_conflict=POOTLE_WINS)
+    assert benchmark_store.units.filter(
+        target_f__startswith="Changed").count() == len(
+            range(0, benchmark_units, 10))
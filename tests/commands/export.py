@@ -7,6 +7,8 @@
 # AUTHORS file for copyright and authorship information.
 
 import os
+import threading
+
 import pytest
 
 from django.core.management import call_command
@@ -175,3 +177,53 @@ def test_export_tmx_tp_rotate(capfd, tp0, project1, media_test_dir):
     assert os.path.exists(os.path.join(export_dir, filename_for_tp1))
     assert os.path.exists(os.path.join(export_dir, filename_2))
     assert os.path.exists(os.path.join(export_dir, filename_3))
+
+
+@pytest.mark.cmd
+@pytest.mark.django_db
+def test_export_tmx_parallel(capfd, tp0, project1, media_test_dir,
+                             monkeypatch):
+    from multiprocessing.pool import ThreadPool
+
+    from django.db import connections
+
+    from import_export.management.commands import export
+
+    pools = []
+    threads = set()
+    closed = []
+    # the test db is only visible to the connection of the main thread,
+    # so the workers share it, and must not close it
+    test_connection = connections["default"]
+    monkeypatch.setattr(test_connection, "allow_thread_sharing", True)
+    monkeypatch.setattr(
+        test_connection, "close",
+        lambda: closed.append(threading.current_thread()))
+
+    def _share_connection():
+        threads.add(threading.current_thread())
+        connections._connections.default = test_connection
+
+    def _pool(processes):
+        pools.append(processes)
+        return ThreadPool(processes, initializer=_share_connection)
+
+    monkeypatch.setattr(export, "ThreadPool", _pool)
+    lang_code = tp0.language.code
+    tp1 = project1.translationproject_set.get(language__code=lang_code)
+    call_command('export', '--tmx', '--jobs=2',
+                 '--language=%s' % lang_code)
+    out, err = capfd.readouterr()
+    for tp in [tp0, tp1]:
+        rev = revision.get(tp.__class__)(tp.directory).get(key="stats")
+        filename = '%s.%s.%s.tmx.zip' % (
+            tp.project.code, tp.language.code, rev[:10])
+        assert '%s" has been saved' % os.path.join(lang_code, filename) in out
+        assert os.path.exists(
+            os.path.join(media_test_dir, 'offline_tm', lang_code, filename))
+    assert pools == [2]
+    assert len(threads) == 2
+    assert threading.current_thread() not in threads
+    # each export closes the connection of its worker thread
+    assert len(closed) == out.count("has been saved")
+    assert set(closed) <= threads
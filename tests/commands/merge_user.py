@@ -60,3 +60,12 @@ def test_merge_user_nodelete(capfd, member, member2):
     out, err = capfd.readouterr()
     assert 'User merged: member --> member2' in out
     assert 'Deleting user: member...' not in out
+
+
+@pytest.mark.cmd
+@pytest.mark.django_db
+def test_merge_user_background(capfd, member, member2):
+    call_command('merge_user', '--background', 'member', 'member2')
+    out, err = capfd.readouterr()
+    assert 'User merged: member --> member2' in out
+    assert 'Queued merging user: member --> member2' in out
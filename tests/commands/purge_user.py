@@ -42,3 +42,12 @@ def test_purge_user_unkownuser():
     with pytest.raises(CommandError) as e:
         call_command('purge_user', 'not_a_user')
     assert "User not_a_user does not exist" in str(e)
+
+
+@pytest.mark.cmd
+@pytest.mark.django_db
+def test_purge_user_background(capfd, evil_member):
+    call_command('purge_user', '--background', 'evil_member')
+    out, err = capfd.readouterr()
+    assert "Queued purging user: evil_member" in out
+    assert "User purged: evil_member" in out
@@ -12,7 +12,8 @@ import resource
 import time
 
 from pootle.core.debug import (
-    debug_sql, log_new_queries, log_timing, memusage, timings)
+    PrometheusSink, StatsdSink, debug_sql, get_sink, get_sinks, instrument,
+    log_new_queries, log_timing, memusage, record_cache, span, timings)
 
 import pytest
 
@@ -166,3 +167,149 @@ def test_debug_memusage():
     assert usage["initial"] >= initial
     assert usage["after"] >= initial
     assert "used" in usage
+
+
+@pytest.mark.django_db
+def test_debug_span_disabled(settings):
+    settings.POOTLE_INSTRUMENTATION = False
+    with span("foo") as disabled_span:
+        record_cache(True)
+    assert disabled_span is None
+
+
+@pytest.mark.django_db
+def test_debug_span(settings):
+    from pootle_project.models import Project
+
+    settings.POOTLE_INSTRUMENTATION = True
+    settings.POOTLE_INSTRUMENTATION_SINKS = [
+        "pootle.core.debug.PrometheusSink"]
+    sink = get_sink(PrometheusSink)
+    assert get_sinks() == [sink]
+
+    @instrument("bar")
+    def _instrumented_generator():
+        for project in Project.objects.all():
+            yield project
+
+    with span("foo") as outer_span:
+        Project.objects.count()
+        record_cache(True)
+        with span("baz") as inner_span:
+            record_cache(False)
+            list(_instrumented_generator())
+    assert outer_span.queries == 2
+    assert inner_span.queries == 1
+    assert outer_span.cache_hits == 1
+    assert outer_span.cache_misses == inner_span.cache_misses == 1
+    assert outer_span.duration >= inner_span.duration
+    assert sorted(sink.spans) == ["bar", "baz", "foo"]
+    assert sink.spans["foo"]["count"] == 1
+    assert sink.spans["foo"]["queries"] == 2
+    metrics = sink.render()
+    assert 'pootle_span_count{span="foo"} 1' in metrics
+    assert 'pootle_span_queries{span="baz"} 1' in metrics
+    assert "# TYPE pootle_span_cache_hits counter" in metrics
+
+
+def test_debug_span_statsd(settings):
+    settings.POOTLE_INSTRUMENTATION = True
+    settings.POOTLE_INSTRUMENTATION_SINKS = []
+    sink = StatsdSink(host="localhost", port=8125, prefix="test")
+    with span("foo") as statsd_span:
+        pass
+    metrics = sink.get_metrics(statsd_span)
+    assert metrics[0].startswith("test.foo.time:")
+    assert metrics[0].endswith("|ms")
+    assert "test.foo.queries:0|c" in metrics
+    sink.emit(statsd_span)
+
+
+@pytest.mark.django_db
+def test_debug_span_queries_log(settings, monkeypatch):
+    from collections import deque
+
+    from django.db import connection
+
+    from pootle_project.models import Project
+
+    settings.POOTLE_INSTRUMENTATION = True
+    settings.POOTLE_INSTRUMENTATION_SINKS = []
+    # queries are counted past the length of the queries log
+    monkeypatch.setattr(connection, "queries_log", deque(maxlen=2))
+    with span("foo") as counted_span:
+        for i in range(3):
+            Project.objects.count()
+    assert counted_span.queries == 3
+    assert counted_span.db_time >= 0
+    assert len(connection.queries_log) == 2
+    assert connection.queries_log.maxlen == 2
+
+
+@pytest.mark.django_db
+def test_debug_span_replica_queries(settings, replica_db):
+    from django.db import connections
+
+    from pootle_project.models import Project
+
+    settings.POOTLE_INSTRUMENTATION = True
+    settings.POOTLE_INSTRUMENTATION_SINKS = []
+    replica = connections[replica_db]
+    assert not replica.force_debug_cursor
+    # queries sent to replicas are counted along with the primary
+    with span("foo") as counted_span:
+        Project.objects.count()
+        with replica.cursor() as cursor:
+            cursor.execute("SELECT 1")
+    assert counted_span.queries == 2
+    assert not replica.force_debug_cursor
+
+
+@pytest.mark.django_db
+def test_debug_span_metrics_access(rf, settings, admin, member):
+    from django.contrib.auth.models import AnonymousUser
+    from django.core.exceptions import PermissionDenied
+
+    from pootle.core.views.instrumentation import instrumentation_metrics
+
+    settings.POOTLE_INSTRUMENTATION = True
+    settings.POOTLE_INSTRUMENTATION_SINKS = [
+        "pootle.core.debug.PrometheusSink"]
+    settings.POOTLE_INSTRUMENTATION_METRICS_IPS = []
+    request = rf.get("/++metrics/")
+    for user in [AnonymousUser(), member]:
+        request.user = user
+        with pytest.raises(PermissionDenied):
+            instrumentation_metrics(request)
+    request.user = admin
+    assert instrumentation_metrics(request).status_code == 200
+    request.user = AnonymousUser()
+    settings.POOTLE_INSTRUMENTATION_METRICS_IPS = [request.META["REMOTE_ADDR"]]
+    assert instrumentation_metrics(request).status_code == 200
+
+
+@pytest.mark.django_db
+def test_debug_span_middleware(rf, settings, admin):
+    from django.http import Http404, HttpResponse
+
+    from pootle.core.views.instrumentation import instrumentation_metrics
+    from pootle.middleware.instrumentation import InstrumentationMiddleware
+
+    middleware = InstrumentationMiddleware(instrumentation_metrics)
+    request = rf.get("/++metrics/")
+    request.user = admin
+    settings.POOTLE_INSTRUMENTATION = False
+    with pytest.raises(Http404):
+        middleware(request)
+    response = InstrumentationMiddleware(lambda r: HttpResponse())(request)
+    assert "X-Pootle-Instrumentation" not in response
+
+    settings.POOTLE_INSTRUMENTATION = True
+    settings.POOTLE_INSTRUMENTATION_SINKS = [
+        "pootle.core.debug.PrometheusSink"]
+    response = middleware(request)
+    assert response.status_code == 200
+    assert "queries=" in response["X-Pootle-Instrumentation"]
+    # the first request is included in the metrics
+    response = middleware(request)
+    assert 'pootle_span_count{span="request"} 1' in response.content
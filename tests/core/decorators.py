@@ -6,11 +6,14 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
+from uuid import uuid4
+
 import pytest
 
 from django.http import Http404
 
-from pootle.core.cache import get_cache
+from pootle.core.cache import (
+    LocalCache, cache_stats, get_cache, local_cache)
 from pootle.core.decorators import get_path_obj, persistent_property
 from pootle_language.models import Language
 from pootle_project.models import Project
@@ -226,3 +229,137 @@ def test_deco_persistent_property():
     assert get_cache("lru").get('pootle.foo.0.2.3.foo-cache.bar') == "Baz"
     # cached version this time
     assert foo.bar == "Baz"
+
+
+def test_deco_persistent_property_local_cache():
+
+    class Foo(object):
+        ns = "pootle.foo.local"
+        cache_key = uuid4().hex
+        calls = 0
+
+        @persistent_property
+        def bar(self):
+            self.calls += 1
+            return dict(baz=self.calls)
+
+    cache_stats.clear()
+    cache_key = "pootle.foo.local..%s.bar" % Foo.cache_key
+    foo = Foo()
+    assert foo.bar == dict(baz=1)
+    assert local_cache.get(cache_key) == dict(baz=1)
+
+    # each hit gets a new copy
+    foo.bar["baz"] = 23
+    assert foo.bar == dict(baz=1)
+
+    # local cache is used before the shared cache
+    get_cache("lru").delete(cache_key)
+    assert foo.bar == dict(baz=1)
+    assert foo.calls == 1
+    stats = cache_stats.get("pootle.foo.local.bar")
+    assert stats["misses"] == 1
+    assert stats["local_hits"] == 3
+    assert stats["hits"] == 0
+
+    # shared cache is used if local cache is missing
+    local_cache.delete(cache_key)
+    get_cache("lru").set(cache_key, dict(baz=7))
+    assert foo.bar == dict(baz=7)
+    assert local_cache.get(cache_key) == dict(baz=7)
+    assert cache_stats.get("pootle.foo.local.bar")["hits"] == 1
+
+
+def test_deco_persistent_property_single_flight(monkeypatch):
+
+    class Foo(object):
+        ns = "pootle.foo.lock"
+        cache_key = uuid4().hex
+
+        @persistent_property
+        def bar(self):
+            raise AssertionError("Should not be computed")
+
+    cache = get_cache("lru")
+    cache_key = "pootle.foo.lock..%s.bar" % Foo.cache_key
+    lock_key = "%s.lock" % cache_key
+
+    class Waiter(object):
+
+        def __init__(self):
+            self.waited = 0
+
+        def __call__(self, interval):
+            # the other process finishes computing after some time
+            self.waited += 1
+            if self.waited == 3:
+                cache.set(cache_key, "Baz")
+                cache.delete(lock_key)
+
+    cache_stats.clear()
+    cache.set(lock_key, 1)
+    waiter = Waiter()
+    monkeypatch.setattr("pootle.core.decorators.time.sleep", waiter)
+    assert Foo().bar == "Baz"
+    assert waiter.waited == 3
+    stats = cache_stats.get("pootle.foo.lock.bar")
+    assert stats["waits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_deco_persistent_property_stale(settings):
+
+    class Foo(object):
+        ns = "pootle.foo.stale"
+        stale_cache_key = uuid4().hex
+
+        def __init__(self, revision):
+            self.cache_key = "%s.%s" % (self.stale_cache_key, revision)
+
+        @persistent_property
+        def bar(self):
+            return self.cache_key
+
+    settings.POOTLE_CACHE_STALE_WHILE_REVALIDATE = True
+    cache_stats.clear()
+    cache = get_cache("lru")
+    foo = Foo(1)
+    assert foo.bar == foo.cache_key
+    assert (
+        cache.get("pootle.foo.stale..%s.bar.stale" % Foo.stale_cache_key)
+        == foo.cache_key)
+
+    # another process is computing the new revision
+    new_foo = Foo(2)
+    cache.set("pootle.foo.stale..%s.bar.lock" % new_foo.cache_key, 1)
+    assert new_foo.bar == foo.cache_key
+    assert cache_stats.get("pootle.foo.stale.bar")["stale"] == 1
+
+
+def test_local_cache(settings):
+    cache = LocalCache(size=2, timeout=60)
+    cache.set("foo", [1])
+    cache.set("bar", [2])
+    assert cache.get("foo") == [1]
+    cache.set("baz", [3])
+    # least recently used is removed
+    assert cache.get("bar") is None
+    assert cache.get("foo") == [1]
+    assert len(cache) == 2
+    cache.delete("foo")
+    assert cache.get("foo") is None
+    cache.clear()
+    assert not len(cache)
+
+    # expired values are removed
+    cache = LocalCache(size=2, timeout=-1)
+    cache.set("foo", [1])
+    assert cache.get("foo") is None
+    cache = LocalCache(size=2, timeout=60)
+    cache.set("foo", [1], timeout=-1)
+    assert cache.get("foo") is None
+
+    settings.POOTLE_LOCAL_CACHE_SIZE = 0
+    cache = LocalCache()
+    cache.set("foo", [1])
+    assert cache.get("foo") is None
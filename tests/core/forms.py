@@ -345,9 +345,13 @@ def test_form_project_paths(project0, member, admin):
                 for p
                 in pathlib.PosixPath(store).parents
                 if str(p) != ".")))
+    # matches come before the parents of matching stores
     paths = sorted(
         stores | dirs,
-        key=lambda path: (posixpath.dirname(path), posixpath.basename(path)))
+        key=lambda path: (
+            "1" not in path,
+            posixpath.dirname(path),
+            posixpath.basename(path)))
     assert form.is_valid()
     results = form.search()
     assert len(results["results"]) == 2
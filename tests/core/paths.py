@@ -9,15 +9,29 @@
 import pathlib
 import posixpath
 from hashlib import md5
+from uuid import uuid4
 
 import pytest
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils.encoding import force_bytes
 
 from pootle.core.paths import Paths
 from pootle_store.models import Store
 
 
+def _rank(path, q):
+    name = posixpath.basename(path.rstrip("/")).lower()
+    if path.lower().startswith(q) or name.startswith(q):
+        rank = 0
+    elif q in path.lower():
+        rank = 1
+    else:
+        rank = 2
+    return rank, posixpath.dirname(path), posixpath.basename(path)
+
+
 @pytest.mark.django_db
 def test_paths_util(project0):
 
@@ -39,8 +53,9 @@ def test_paths_util(project0):
         == project0.directory.revisions.get(key="stats").value)
     assert (
         paths_util.cache_key
-        == ("%s.%s.%s"
-            % (md5(force_bytes(paths_util.q)).hexdigest(),
+        == ("%s.%s.%s.%s"
+            % (project0.pootle_path,
+               md5(force_bytes(paths_util.q)).hexdigest(),
                paths_util.rev_cache_key,
                paths_util.show_all)))
     assert (
@@ -69,9 +84,7 @@ def test_paths_util(project0):
                 if str(p) != ".")))
     assert (
         paths_util.paths
-        == sorted(
-            stores | dirs,
-            key=lambda path: (posixpath.dirname(path), posixpath.basename(path))))
+        == sorted(stores | dirs, key=lambda path: _rank(path, "1")))
     paths_util = DummyPathsUtil(project0, "1", show_all=True)
     assert (
         Store.objects.exclude(is_template=True).filter(
@@ -91,11 +104,84 @@ def test_paths_util(project0):
                 if str(p) != ".")))
     assert (
         paths_util.paths
-        == sorted(
-            stores | dirs,
-            key=lambda path: (posixpath.dirname(path), posixpath.basename(path))))
+        == sorted(stores | dirs, key=lambda path: _rank(path, "1")))
     assert (
         paths_util.paths
+        == sorted(stores | dirs, key=lambda path: _rank(path, "1")))
+
+
+@pytest.mark.django_db
+def test_paths_util_index(project0):
+
+    class DummyPathsUtil(Paths):
+
+        @property
+        def store_qs(self):
+            return Store.objects.filter(
+                translation_project__project=project0)
+
+    paths_util = DummyPathsUtil(project0, "STORE0")
+    assert (
+        paths_util.index_cache_key
+        == "%s.%s.%s" % (
+            project0.pootle_path,
+            paths_util.rev_cache_key,
+            paths_util.show_all))
+    assert (
+        paths_util.index
         == sorted(
-            stores | dirs,
-            key=lambda path: (posixpath.dirname(path), posixpath.basename(path))))
+            set(paths_util.all_stores.values_list("tp_path", flat=True))))
+    assert paths_util.get_parents("foo.po") == []
+    assert (
+        paths_util.get_parents("foo/bar/baz.po")
+        == ["foo/", "foo/bar/"])
+
+    # searches are answered from the index, and are not case sensitive
+    with CaptureQueriesContext(connection) as queries:
+        paths = DummyPathsUtil(project0, "STORE0").paths
+    assert len(queries) == 1
+    assert "store0.po" in paths
+    assert paths == DummyPathsUtil(project0, "store0").paths
+
+
+@pytest.mark.django_db
+def test_paths_util_ranking(project0):
+
+    class DummyPathsUtil(Paths):
+        ns = "pootle.paths.%s" % uuid4().hex
+        index = [
+            "/Foo/qux.po",
+            "/bar/baz.po",
+            "/bar/foo.po",
+            "/foo.po",
+            "/qux/afoo.po",
+            "/qux/foo/z.po"]
+
+        @property
+        def store_qs(self):
+            return Store.objects.none()
+
+    paths_util = DummyPathsUtil(project0, "foo")
+    assert (
+        paths_util.get_prefix_matches("foo")
+        == ["/foo.po", "/Foo/qux.po"])
+    assert paths_util.get_prefix_matches("qux/") == [
+        "/qux/afoo.po", "/qux/foo/z.po"]
+    assert paths_util.get_prefix_matches("baz") == []
+    # paths and names starting with the search come first, then other
+    # matches, then the parents of matching stores
+    assert paths_util.paths == [
+        "foo.po",
+        "Foo/",
+        "Foo/qux.po",
+        "bar/foo.po",
+        "qux/foo/",
+        "qux/afoo.po",
+        "qux/foo/z.po",
+        "bar/",
+        "qux/"]
+    # searches starting with "/" only match from the start of the path
+    assert DummyPathsUtil(project0, "/FOO").paths == [
+        "foo.po",
+        "Foo/",
+        "Foo/qux.po"]
@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+from uuid import uuid4
+
+import pytest
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from pootle.core.cache import get_cache, local_cache
+from pootle.core.contextmanagers import (
+    replica_safe, replica_scope, use_primary)
+from pootle.core.decorators import persistent_property, replica_reads
+from pootle.core.routers import ReplicaRouter, get_read_db, replica_state
+from pootle.middleware.replica import ReplicaMiddleware
+from pootle_app.management.commands import PootleCommand
+from pootle_project.models import Project
+from pootle_revision.models import Revision
+from pootle_store.unit.search import DBSearchBackend
+
+
+def _create_replica_revision(alias):
+    with connections[alias].schema_editor() as editor:
+        editor.create_model(Revision)
+    Revision.objects.using(alias).create(
+        content_type_id=ContentType.objects.get_for_model(Revision).id,
+        object_id=1,
+        key="replica",
+        value="replica")
+    replica_state.reset()
+
+
+def _on_replica():
+    return Revision.objects.filter(key="replica").exists()
+
+
+@pytest.mark.django_db
+def test_replica_router_no_replicas():
+    replica_state.reset()
+    with replica_safe() as db:
+        assert db is None
+        assert get_read_db() is None
+        assert not _on_replica()
+
+
+@pytest.mark.django_db
+def test_replica_router_reads(replica_db):
+    _create_replica_revision(replica_db)
+    assert not _on_replica()
+    with replica_safe() as db:
+        assert db == replica_db
+        assert _on_replica()
+        with replica_safe() as nested_db:
+            assert nested_db == replica_db
+        assert _on_replica()
+        with use_primary():
+            assert get_read_db() is None
+            assert not _on_replica()
+        assert _on_replica()
+    assert get_read_db() is None
+    assert not _on_replica()
+
+    # querysets can be sent to the replica after the context exits
+    with replica_safe() as db:
+        qs = Revision.objects.using(db).filter(key="replica")
+    assert qs.exists()
+
+
+@pytest.mark.django_db
+def test_replica_router_read_your_writes(replica_db):
+    _create_replica_revision(replica_db)
+    content_type = ContentType.objects.get_for_model(Revision)
+    with replica_safe():
+        assert _on_replica()
+        Revision.objects.create(
+            content_type=content_type,
+            object_id=2,
+            key="primary",
+            value="primary")
+        assert get_read_db() is None
+        assert not _on_replica()
+        assert Revision.objects.filter(key="primary").exists()
+    with replica_safe() as db:
+        assert db is None
+    replica_state.reset()
+    with replica_safe() as db:
+        assert db == replica_db
+
+
+@pytest.mark.django_db
+def test_replica_router_reads_decorator(replica_db):
+    _create_replica_revision(replica_db)
+
+    @replica_reads
+    def read():
+        return _on_replica()
+
+    @replica_reads
+    def read_events():
+        for i in range(2):
+            yield _on_replica()
+
+    assert read()
+    events = read_events()
+    assert next(events)
+    # the context is left while the generator is suspended
+    assert not _on_replica()
+    assert next(events)
+    assert list(events) == []
+
+
+@pytest.mark.django_db
+def test_replica_router_search_results(replica_db, member):
+    # the accessible projects are cached before reading from the replica
+    Project.accessible_by_user(member)
+    backend = DBSearchBackend(
+        member,
+        category=None,
+        checks=None,
+        soptions=[],
+        sfields=[],
+        search=None,
+        month=None,
+        user=member,
+        **{"modified-since": None})
+    with replica_safe():
+        results = backend.results
+    assert results.db == replica_db
+
+
+@pytest.mark.django_db
+def test_replica_router_cache_timeout(replica_db, settings):
+    _create_replica_revision(replica_db)
+    settings.POOTLE_DB_REPLICA_CACHE_TIMEOUT = 30
+    cache = get_cache("lru")
+
+    class Foo(object):
+        ns = "pootle.foo.replica"
+        cache_key = uuid4().hex
+
+        @persistent_property
+        def primary(self):
+            return _on_replica()
+
+        @persistent_property
+        def replica(self):
+            with replica_safe() as db:
+                return Revision.objects.using(db).filter(
+                    key="replica").exists()
+
+        @persistent_property
+        def replica_context(self):
+            return _on_replica()
+
+    def _ttl(name):
+        return cache.ttl("pootle.foo.replica..%s.%s" % (Foo.cache_key, name))
+
+    foo = Foo()
+    assert foo.primary is False
+    assert _ttl("primary") > 30
+
+    # values read from a replica may be older than their revisions
+    assert foo.replica is True
+    assert 0 < _ttl("replica") <= 30
+    with replica_safe():
+        assert foo.replica_context is True
+    assert 0 < _ttl("replica_context") <= 30
+
+    # unless the thread has written, and reads from the primary
+    Foo.cache_key = uuid4().hex
+    ReplicaRouter().db_for_write(Revision)
+    assert Foo().replica is False
+    assert _ttl("replica") > 30
+    local_cache.clear()
+
+
+def test_replica_scope(replica_db):
+    router = ReplicaRouter()
+    router.db_for_write(Revision)
+    with replica_scope():
+        # writes from before the scope do not keep reads on the primary
+        with replica_safe() as db:
+            assert db == replica_db
+        router.db_for_write(Revision)
+        with replica_scope():
+            # nested scopes, eg sync jobs, still read their writes
+            with replica_safe() as db:
+                assert db is None
+        assert replica_state.written
+    assert not replica_state.written
+    with replica_safe() as db:
+        assert db == replica_db
+
+
+def test_replica_scope_command(replica_db):
+    router = ReplicaRouter()
+    router.db_for_write(Revision)
+    reads = []
+
+    def _handle(**options):
+        with replica_safe() as db:
+            reads.append(db)
+
+    command = PootleCommand()
+    command.handle = _handle
+    command.execute(verbosity=0, no_color=True, skip_checks=True)
+    assert reads == [replica_db]
+    assert not replica_state.written
+
+
+def test_replica_router_migrate(replica_db):
+    router = ReplicaRouter()
+    assert router.allow_migrate(replica_db, "pootle_revision") is False
+    assert router.allow_migrate(DEFAULT_DB_ALIAS, "pootle_revision") is None
+
+
+def test_replica_middleware(replica_db):
+    factory = RequestFactory()
+
+    def _write(request):
+        ReplicaRouter().db_for_write(Revision)
+        assert get_read_db() is None
+        return HttpResponse()
+
+    def _read(request):
+        with replica_safe() as db:
+            return HttpResponse(db or "")
+
+    response = ReplicaMiddleware(_read)(factory.get("/"))
+    assert response.content == replica_db
+    assert ReplicaMiddleware.cookie not in response.cookies
+
+    response = ReplicaMiddleware(_write)(factory.post("/"))
+    assert response.cookies[ReplicaMiddleware.cookie].value == "1"
+    assert not replica_state.written
+
+    request = factory.get("/")
+    request.COOKIES[ReplicaMiddleware.cookie] = "1"
+    assert ReplicaMiddleware(_read)(request).content == ""
+    assert ReplicaMiddleware(_read)(factory.get("/")).content == replica_db
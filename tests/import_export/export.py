@@ -6,12 +6,21 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
+import os
+from io import BytesIO
+from zipfile import ZipFile
+
 import pytest
 
+from translate.storage import tmx
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from import_export.utils import TPTMXExporter
 from pootle.core.debug import memusage
+from pootle_store.constants import OBSOLETE, TRANSLATED
 
 
 @pytest.mark.pootle_memusage
@@ -54,6 +63,67 @@ def test_download_exported_tmx(client, tp0):
     assert response.url == exporter.get_url()
 
 
+def _get_tmx_reference(tp):
+    source_language = tp.project.source_language.code
+    target_language = tp.language.code
+    tmxfile = tmx.tmxfile()
+    for store in tp.stores.live():
+        for unit in store.units.filter(state=TRANSLATED):
+            tmxfile.addtranslation(unit.source, source_language,
+                                   unit.target, target_language,
+                                   unit.developer_comment)
+    bs = BytesIO()
+    tmxfile.serialize(bs)
+    return bs.getvalue()
+
+
+@pytest.mark.django_db
+def test_tmx_exporter_stream(tp0, media_test_dir):
+    exporter = TPTMXExporter(tp0)
+    exporter.batch_size = 7
+    # a unit in the last store that sorts before the units of the
+    # other stores by id is still exported with its store
+    unit = exporter.units.last()
+    assert unit.id != exporter.units.order_by("id").last().id
+    unit.developer_comment = u"A comment & <markup>"
+    unit.target = u"Line one\nline two"
+    unit.save()
+    # units are exported in the order of their index in the store, rather
+    # than the order they were created in
+    store_units = list(unit.store.units.filter(state=TRANSLATED))
+    assert len(store_units) > 1
+    indices = [store_unit.index for store_unit in store_units]
+    for store_unit, index in zip(store_units, reversed(indices)):
+        unit.store.units.filter(pk=store_unit.pk).update(index=index)
+    total = exporter.units.count()
+    assert total > exporter.batch_size
+    bs = BytesIO()
+    # the units are fetched in batches rather than per store
+    with CaptureQueriesContext(connection) as queries:
+        assert exporter.write_tmx(bs) == total
+    assert len(queries) == (total // exporter.batch_size) + 1
+    # units are exported store by store, in the same order as the stores
+    paths = [unit["store__pootle_path"] for unit in exporter.iter_units()]
+    assert paths == sorted(paths)
+    assert bs.getvalue() == _get_tmx_reference(tp0)
+
+    filepath, __ = exporter.export()
+    with ZipFile(filepath) as zf:
+        assert zf.namelist() == [exporter.filename.rstrip(".zip")]
+        assert zf.read(zf.namelist()[0]) == _get_tmx_reference(tp0)
+    # no temporary files are left behind
+    assert os.listdir(exporter.directory) == [exporter.filename]
+
+
+@pytest.mark.django_db
+def test_tmx_exporter_stream_empty(tp0):
+    exporter = TPTMXExporter(tp0)
+    exporter.units.update(state=OBSOLETE)
+    bs = BytesIO()
+    assert exporter.write_tmx(bs) == 0
+    assert bs.getvalue() == _get_tmx_reference(tp0)
+
+
 @pytest.mark.django_db
 def test_view_context_with_exported_tmx(exported_tp_view_response):
 
@@ -6,6 +6,7 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
+import json
 import os
 
 import pytest
@@ -15,8 +16,14 @@ from django.core.files.uploadedfile import SimpleUploadedFile
 import pytest_pootle
 from pytest_pootle.utils import create_store
 
-from import_export.exceptions import UnsupportedFiletypeError
-from import_export.utils import import_file
+from django.test import RequestFactory
+from django.urls import reverse
+from rq.job import get_current_job
+
+from import_export.exceptions import FileImportError, UnsupportedFiletypeError
+from import_export.utils import (
+    get_import_job, import_file, queue_import_file, validate_import_file)
+from import_export.views import handle_upload_form
 from pootle_app.models.permissions import check_user_permission
 from pootle_statistics.models import SubmissionTypes
 from pootle_store.constants import NEW, OBSOLETE, PARSED, TRANSLATED
@@ -49,6 +56,140 @@ def test_import_success(project0_nongnu, store0, admin):
     assert store.state == PARSED
 
 
+@pytest.mark.django_db
+def test_import_validate(project0_nongnu, store0):
+    file_dir = os.path.join(
+        os.path.dirname(pytest_pootle.__file__),
+        "data/po/tutorial/en")
+    with open(os.path.join(file_dir, IMPORT_SUCCESS), "r") as f:
+        store, rev = validate_import_file(f)
+        # the file is rewound for the import
+        assert f.tell() == 0
+    assert store == store0
+    assert rev == 0
+
+
+@pytest.mark.django_db
+def test_import_validate_failure(po_directory, en_tutorial_po,
+                                 file_import_failure):
+    filename, exception = file_import_failure
+    file_dir = os.path.join(
+        os.path.dirname(pytest_pootle.__file__),
+        "data/po/tutorial/en")
+    with open(os.path.join(file_dir, filename), "r") as f:
+        with pytest.raises(exception):
+            validate_import_file(f)
+
+
+@pytest.mark.django_db
+def test_import_queue(project0_nongnu, store0, admin, member, member2,
+                      import_spool_dir, client):
+    file_dir = os.path.join(
+        os.path.dirname(pytest_pootle.__file__),
+        "data/po/tutorial/en")
+    assert store0.state == NEW
+    with open(os.path.join(file_dir, IMPORT_SUCCESS), "r") as f:
+        # the test queues run jobs synchronously
+        job = queue_import_file(f, IMPORT_SUCCESS, admin, requested_by=member)
+    assert Store.objects.get(pk=store0.pk).state == PARSED
+    assert job.meta["stage"] == "finished"
+    assert job.meta["name"] == IMPORT_SUCCESS
+    assert job.meta["pootle_path"] == store0.pootle_path
+    assert job.meta["requested_by"] == member.id
+    assert "error" not in job.meta
+    # the spooled file is removed once imported
+    assert not os.listdir(import_spool_dir)
+    assert get_import_job(job.id).meta == job.meta
+
+    url = reverse("pootle-xhr-import-status", kwargs=dict(job_id=job.id))
+    client.force_login(member)
+    response = client.get(url, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+    assert response.status_code == 200
+    data = json.loads(response.content)
+    assert data["id"] == job.id
+    assert data["stage"] == "finished"
+    assert data["pootle_path"] == store0.pootle_path
+    # only the requesting user and superusers can see the job
+    client.force_login(member2)
+    response = client.get(url, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+    assert response.status_code == 404
+    client.force_login(admin)
+    response = client.get(url, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+    assert response.status_code == 200
+    response = client.get(
+        reverse("pootle-xhr-import-status",
+                kwargs=dict(job_id="DOESNOTEXIST")),
+        HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_import_queue_failure(po_directory, en_tutorial_po,
+                              file_import_failure, member, import_spool_dir):
+    filename, exception = file_import_failure
+    file_dir = os.path.join(
+        os.path.dirname(pytest_pootle.__file__),
+        "data/po/tutorial/en")
+    with open(os.path.join(file_dir, filename), "r") as f:
+        with pytest.raises(exception):
+            queue_import_file(f, filename, member)
+    assert not os.listdir(import_spool_dir)
+
+
+@pytest.mark.django_db
+def test_import_upload_form_failure(project0_nongnu, store0, admin,
+                                    import_spool_dir):
+    file_dir = os.path.join(
+        os.path.dirname(pytest_pootle.__file__),
+        "data/po/tutorial/en")
+    files = []
+    for name in [IMPORT_SUCCESS, "path_header_missing.po"]:
+        with open(os.path.join(file_dir, name), "r") as f:
+            files.append(
+                SimpleUploadedFile(
+                    name, f.read(), "text/x-gettext-translation"))
+    request = RequestFactory().post(
+        "/", dict(file=files, user_id=admin.id))
+    request.user = admin
+    ctx = handle_upload_form(request, store0.translation_project)
+    assert ctx["upload_form"].errors["file"]
+    # the jobs queued before the error are returned with it
+    assert (
+        [job["name"] for job in ctx["import_jobs"]]
+        == [IMPORT_SUCCESS])
+    assert ctx["import_jobs"][0]["stage"] == "finished"
+
+
+@pytest.mark.django_db
+def test_import_queue_update_failure(project0_nongnu, store0, member,
+                                     import_spool_dir, monkeypatch):
+    from import_export import utils
+    from pootle_store.models import Store as StoreModel
+
+    def _update(*args, **kwargs):
+        raise Exception("Update failed")
+
+    jobs = []
+
+    def _get_current_job():
+        jobs.append(get_current_job())
+        return jobs[-1]
+
+    monkeypatch.setattr(StoreModel, "update", _update)
+    monkeypatch.setattr(utils, "get_current_job", _get_current_job)
+    file_dir = os.path.join(
+        os.path.dirname(pytest_pootle.__file__),
+        "data/po/tutorial/en")
+    with open(os.path.join(file_dir, IMPORT_SUCCESS), "r") as f:
+        # the failure is raised again so that the job fails
+        with pytest.raises(FileImportError):
+            queue_import_file(f, IMPORT_SUCCESS, member)
+    job = jobs[0]
+    assert job.meta["stage"] == "failed"
+    assert job.meta["error"] == "There was an error uploading your file"
+    assert not os.listdir(import_spool_dir)
+
+
 @pytest.mark.django_db
 def test_import_failure(po_directory, en_tutorial_po,
                         file_import_failure, member):
@@ -204,6 +204,75 @@ def test_delete_purge_user(en_tutorial_po_member_updated,
                        lambda m: m.delete(purge=True))
 
 
+@pytest.mark.django_db
+def test_purge_user_progress(en_tutorial_po_member_updated,
+                             member, evil_member):
+    """Test purging user with a progress callback"""
+    stages = []
+    _test_user_purging(en_tutorial_po_member_updated,
+                       member, evil_member,
+                       lambda m: accounts.utils.UserPurger(
+                           m, progress=stages.append).purge())
+    assert stages == [
+        "units_created",
+        "units_edited",
+        "units_reviewed",
+        "units_commented",
+        "units_state_changed",
+        "updating_stores"]
+
+
+@pytest.mark.django_db
+def test_queue_purge_user(en_tutorial_po_member_updated,
+                          member, evil_member):
+    """Test purging user in a background job"""
+    jobs = []
+    _test_user_purging(en_tutorial_po_member_updated,
+                       member, evil_member,
+                       lambda m: jobs.append(
+                           accounts.utils.queue_user_deletion(
+                               m, purge=True)))
+    assert jobs[0].meta["username"] == "evil_member"
+    assert jobs[0].meta["stage"] == "finished"
+    assert not get_user_model().objects.filter(
+        username="evil_member").exists()
+
+
+@pytest.mark.django_db
+def test_queue_merge_user(en_tutorial_po, member, member2):
+    """Test merging user in a background job"""
+    unit = _create_submission_and_suggestion(en_tutorial_po, member)
+    job = accounts.utils.queue_user_merge(member, member2, delete=False)
+    assert job.meta["stage"] == "finished"
+    _test_user_merged(unit, member, member2)
+    assert get_user_model().objects.filter(username="member").exists()
+
+
+@pytest.mark.django_db
+def test_queue_merge_user_failure(en_tutorial_po, member, member2,
+                                  monkeypatch):
+    """Test a failed merge is recorded and fails the background job"""
+    from rq.job import get_current_job
+
+    jobs = []
+
+    def _get_current_job():
+        jobs.append(get_current_job())
+        return jobs[-1]
+
+    def _merge(self):
+        raise Exception("Merge failed")
+
+    monkeypatch.setattr(accounts.utils, "get_current_job", _get_current_job)
+    monkeypatch.setattr(accounts.utils.UserMerger, "merge", _merge)
+    with pytest.raises(Exception) as e:
+        accounts.utils.queue_user_merge(member, member2)
+    assert str(e.value) == "Merge failed"
+    assert jobs[0].meta["stage"] == "failed"
+    assert jobs[0].meta["error"] == "Merge failed"
+    assert get_user_model().objects.filter(username="member").exists()
+
+
 @pytest.mark.django_db
 def test_verify_user(member_with_email):
     """Test verifying user using `verify_user` function"""
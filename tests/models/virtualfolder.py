@@ -9,13 +9,16 @@
 from __future__ import absolute_import
 
 from django.core.exceptions import ValidationError
+from django.db import transaction
 
 import pytest
 
 from pytest_pootle.factories import VirtualFolderDBFactory
 
 from pootle_language.models import Language
+from pootle_store.contextmanagers import batch_new_stores
 from pootle_store.models import Store
+from virtualfolder.contextmanagers import get_store_batch
 from virtualfolder.models import VirtualFolder
 
 
@@ -222,3 +225,91 @@ def test_vfolder_membership_new_store(tp0):
     assert Store.objects.get(pk=normal_store.pk).priority == 1.0
     vf0.delete()
     assert Store.objects.get(pk=wierd_store.pk).priority == 1.0
+
+
+@pytest.mark.pootle_vfolders
+@pytest.mark.django_db
+def test_vfolder_membership_new_store_glob(tp0):
+    vf0 = VirtualFolder.objects.create(
+        name="vf0",
+        priority=7.0,
+        all_languages=True,
+        all_projects=True,
+        filter_rules="glob/*")
+    glob_dir = tp0.directory.child_dirs.create(name="glob", tp=tp0)
+    glob_store = Store.objects.create(
+        parent=glob_dir,
+        translation_project=tp0,
+        name="foo.po")
+    assert glob_store in vf0.stores.all()
+    assert Store.objects.get(pk=glob_store.pk).priority == 7
+
+
+@pytest.mark.pootle_vfolders
+@pytest.mark.django_db
+def test_vfolder_membership_new_stores_batch(tp0):
+    vf0 = VirtualFolder.objects.create(
+        name="vf0",
+        priority=7.0,
+        all_languages=True,
+        all_projects=True,
+        filter_rules="batched*.po")
+    with batch_new_stores():
+        batch = get_store_batch()
+        with batch_new_stores():
+            # nested batches are merged
+            assert get_store_batch() is batch
+        stores = [
+            Store.objects.create(
+                parent=tp0.directory,
+                translation_project=tp0,
+                name="batched%s.po" % i)
+            for i in range(3)]
+        normal_store = Store.objects.create(
+            parent=tp0.directory,
+            translation_project=tp0,
+            name="normal.po")
+        assert len(batch) == 4
+        # nothing is added until the context exits
+        assert not vf0.stores.exists()
+    # candidate vfolders are only looked up once for the tp
+    assert len(batch.candidates) == 1
+    assert get_store_batch() is None
+    assert (
+        sorted(vf0.stores.values_list("pk", flat=True))
+        == sorted(store.pk for store in stores))
+    assert all(
+        priority == 7
+        for priority
+        in Store.objects.filter(
+            pk__in=[store.pk for store in stores]).values_list(
+                "priority", flat=True))
+    assert Store.objects.get(pk=normal_store.pk).priority == 1.0
+
+
+@pytest.mark.pootle_vfolders
+@pytest.mark.django_db
+def test_vfolder_membership_new_stores_batch_error(tp0):
+    vf0 = VirtualFolder.objects.create(
+        name="vf0",
+        priority=7.0,
+        all_languages=True,
+        all_projects=True,
+        filter_rules="batched*.po")
+    with pytest.raises(ValueError):
+        with batch_new_stores():
+            store = Store.objects.create(
+                parent=tp0.directory,
+                translation_project=tp0,
+                name="batched0.po")
+            with transaction.atomic():
+                Store.objects.create(
+                    parent=tp0.directory,
+                    translation_project=tp0,
+                    name="batched1.po")
+                raise ValueError("Sync failed")
+    assert get_store_batch() is None
+    # stores created before the error are still added to their vfolders,
+    # while those that were rolled back are skipped
+    assert list(vf0.stores.values_list("pk", flat=True)) == [store.pk]
+    assert Store.objects.get(pk=store.pk).priority == 7
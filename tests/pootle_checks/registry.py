@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import pytest
+
+from translate.filters import checks
+
+from pootle_checks.constants import EXCLUDED_FILTERS
+from pootle_checks.registry import CheckerRegistry, checker_registry
+
+
+def test_checker_registry():
+    registry = CheckerRegistry()
+    checker = registry.get("standard", "language0")
+    assert isinstance(checker, checks.TeeChecker)
+    assert registry.get("standard", "language0") is checker
+    assert registry.constructed[("standard", "language0")] == 1
+    for name in EXCLUDED_FILTERS:
+        assert name not in checker.combinedfilters
+
+    # checkers are built for each language and checkstyle
+    assert registry.get("standard", "language1") is not checker
+    assert registry.get("mozilla", "language0") is not checker
+    assert isinstance(
+        registry.get("mozilla", "language0").checkers[0],
+        checks.MozillaChecker)
+    assert len(registry.constructed) == 3
+
+    registry.clear("standard")
+    assert ("mozilla", "language0") in registry.checkers
+    assert registry.get("standard", "language0") is not checker
+    assert registry.constructed[("standard", "language0")] == 2
+    registry.clear()
+    assert not registry.checkers
+
+
+@pytest.mark.django_db
+def test_checker_registry_tp(tp0):
+    checker = tp0.checker
+    assert tp0.checker is checker
+    assert checker is checker_registry.get(
+        tp0.project.checkstyle, tp0.language.code)
+    constructed = checker_registry.constructed[
+        (tp0.project.checkstyle, tp0.language.code)]
+    for unit in tp0.stores.first().units[:5]:
+        unit.update_qualitychecks()
+    assert (
+        checker_registry.constructed[
+            (tp0.project.checkstyle, tp0.language.code)]
+        == constructed)
+
+    # changing the checkstyle gives the tp a different checker
+    tp0.project.checkstyle = "mozilla"
+    tp0.project.save()
+    assert tp0.checker is not checker
+    assert isinstance(tp0.checker.checkers[0], checks.MozillaChecker)
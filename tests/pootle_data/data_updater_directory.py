@@ -0,0 +1,349 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+from importlib import import_module
+
+import pytest
+
+from django.apps import apps
+from django.db import connection
+from django.db.models import Max, Sum
+from django.test.utils import CaptureQueriesContext
+
+from pootle.core.delegate import revision
+from pootle.core.signals import update_data
+from pootle_app.models import Directory
+from pootle_data.directory_data import (
+    DirectoryDataUpdater, RelatedTPsDirectoryDataUpdater)
+from pootle_data.models import DirectoryData, StoreData, TPData
+from pootle_data.utils import SUM_FIELDS
+from pootle_language.models import Language
+from pootle_project.models import Project, ProjectResource, ProjectSet
+from pootle_store.constants import FUZZY, TRANSLATED
+
+
+def _test_related_tps_data(directory, tp_data, info=True):
+    expected = tp_data.aggregate(
+        **{k: Sum(k) for k in SUM_FIELDS})
+    expected.update(
+        tp_data.aggregate(
+            max_unit_revision=Max("max_unit_revision"),
+            last_submission=Max("last_submission"),
+            last_created_unit=Max("last_created_unit")))
+    data = DirectoryData.objects.get(directory=directory)
+    for k in SUM_FIELDS:
+        assert getattr(data, k) == (expected[k] or 0)
+    assert data.max_unit_revision == (expected["max_unit_revision"] or 0)
+    assert data.last_submission_id == expected["last_submission"]
+    assert data.last_created_unit_id == expected["last_created_unit"]
+    if not info:
+        return
+    if data.last_submission_id:
+        assert (
+            data.last_submission_info
+            == data.last_submission.get_submission_info())
+    if data.last_created_unit_id:
+        assert (
+            data.last_created_unit_info
+            == data.last_created_unit.get_last_created_unit_info())
+
+
+def _test_directory_data(directory):
+    store_data = StoreData.objects.filter(
+        store__pootle_path__startswith=directory.pootle_path,
+        store__obsolete=False)
+    expected = store_data.aggregate(
+        **{k: Sum(k) for k in SUM_FIELDS})
+    expected.update(
+        store_data.aggregate(
+            max_unit_revision=Max("max_unit_revision"),
+            last_submission=Max("last_submission"),
+            last_created_unit=Max("last_created_unit")))
+    data = DirectoryData.objects.get(directory=directory)
+    for k in SUM_FIELDS:
+        assert getattr(data, k) == (expected[k] or 0)
+    assert data.max_unit_revision == (expected["max_unit_revision"] or 0)
+    assert data.last_submission_id == expected["last_submission"]
+    assert data.last_created_unit_id == expected["last_created_unit"]
+
+
+@pytest.mark.django_db
+def test_data_directory_rollups(tp0):
+    directories = Directory.objects.filter(tp=tp0)
+    assert (
+        DirectoryData.objects.filter(directory__tp=tp0).count()
+        == directories.count())
+    for directory in directories:
+        _test_directory_data(directory)
+
+
+@pytest.mark.django_db
+def test_data_directory_rollups_update(subdir0):
+    store = subdir0.child_stores.first()
+    unit = store.units.filter(state=TRANSLATED).first()
+    unit.state = FUZZY
+    unit.save()
+    for directory in [subdir0, subdir0.parent]:
+        _test_directory_data(directory)
+    store.makeobsolete()
+    for directory in [subdir0, subdir0.parent]:
+        _test_directory_data(directory)
+
+
+@pytest.mark.django_db
+def test_data_directory_rollups_recreate(tp0):
+    DirectoryData.objects.filter(directory__tp=tp0).delete()
+    DirectoryDataUpdater(tp0).update()
+    for directory in Directory.objects.filter(tp=tp0):
+        _test_directory_data(directory)
+    # nothing changes on a second update
+    with CaptureQueriesContext(connection) as queries:
+        DirectoryDataUpdater(tp0).update()
+    assert len(queries) == 3
+
+
+@pytest.mark.django_db
+def test_data_directory_rollups_stores(subdir0):
+    tp = subdir0.tp
+    store = subdir0.child_stores.first()
+    chain = [subdir0, subdir0.parent]
+    others = Directory.objects.filter(tp=tp).exclude(
+        pk__in=[d.pk for d in chain])
+    assert others.exists()
+    DirectoryData.objects.filter(directory__tp=tp).update(total_words=0)
+    with CaptureQueriesContext(connection) as queries:
+        DirectoryDataUpdater(tp, stores=[store]).update()
+    # directories, store data and existing data, and fetching and updating
+    # the changed rows
+    assert len(queries) == 5
+    for directory in chain:
+        _test_directory_data(directory)
+    # only the parents of the store are updated
+    assert not DirectoryData.objects.filter(
+        directory__in=others).exclude(total_words=0).exists()
+
+
+@pytest.mark.django_db
+def test_data_directory_rollups_migration(tp0):
+    migration = import_module(
+        "pootle_data.migrations.0012_populate_directory_data")
+    DirectoryData.objects.filter(directory__tp=tp0).delete()
+    tps = set(
+        Directory.objects.filter(
+            tp__isnull=False,
+            data__isnull=True).values_list("tp_id", flat=True))
+    assert tp0.id in tps
+    with CaptureQueriesContext(connection) as queries:
+        migration.populate_directory_data(apps, None)
+    # existing data, missing directories, store data for each TP rather
+    # than each directory, and creating the rows
+    assert len(queries) == 3 + len(tps)
+    for directory in Directory.objects.filter(tp=tp0):
+        _test_directory_data(directory)
+
+
+@pytest.mark.django_db
+def test_data_project_directory_stats_rollups(project0, subdir0):
+    resource = ProjectResource(
+        Directory.objects.live().filter(
+            name=subdir0.name,
+            parent__translationproject__project=project0),
+        "/projects/%s/%s/" % (project0.code, subdir0.name))
+    # directory resources are read from the directories' rollups
+    rollups = DirectoryData.objects.filter(
+        directory__tp__project=project0,
+        directory__tp_path=subdir0.tp_path)
+    store_data = StoreData.objects.filter(
+        store__translation_project__project=project0,
+        store__tp_path__startswith=subdir0.tp_path,
+        store__obsolete=False)
+    stats = resource.data_tool.get_stats(include_children=False)
+    for k in ["total_words", "fuzzy_words", "translated_words",
+              "critical_checks"]:
+        v = resource.data_tool.stats_mapping[k]
+        assert (
+            stats[v]
+            == rollups.aggregate(total=Sum(k))["total"]
+            == store_data.aggregate(total=Sum(k))["total"])
+    children = resource.data_tool.get_stats()["children"]
+    assert (
+        sorted(children.keys())
+        == sorted(
+            rollups.values_list(
+                "directory__tp__language__code", flat=True)))
+    for code, child in children.items():
+        child_data = store_data.filter(
+            store__translation_project__language__code=code)
+        assert (
+            child["total"]
+            == child_data.aggregate(total=Sum("total_words"))["total"])
+
+
+@pytest.mark.django_db
+def test_data_related_tps_rollups(language0, project0):
+    tp_data = TPData.objects.exclude(tp__project__disabled=True)
+    _test_related_tps_data(
+        language0.directory,
+        tp_data.filter(tp__language=language0))
+    _test_related_tps_data(
+        project0.directory,
+        TPData.objects.filter(tp__project=project0).exclude(
+            tp__language__code="templates"))
+    _test_related_tps_data(
+        Directory.objects.projects,
+        tp_data.exclude(tp__language__code="templates"))
+    DirectoryData.objects.filter(
+        directory=language0.directory).delete()
+    RelatedTPsDirectoryDataUpdater(languages=[language0]).update()
+    _test_related_tps_data(
+        language0.directory,
+        tp_data.filter(tp__language=language0))
+
+
+@pytest.mark.django_db
+def test_data_related_tps_rollups_update(tp0):
+    language = tp0.language
+    unit = tp0.stores.first().units.filter(state=TRANSLATED).first()
+    unit.state = FUZZY
+    unit.save()
+    tp_data = TPData.objects.exclude(tp__project__disabled=True)
+    _test_related_tps_data(
+        language.directory,
+        tp_data.filter(tp__language=language))
+    _test_related_tps_data(
+        tp0.project.directory,
+        TPData.objects.filter(tp__project=tp0.project).exclude(
+            tp__language__code="templates"))
+    _test_related_tps_data(
+        Directory.objects.projects,
+        tp_data.exclude(tp__language__code="templates"))
+
+
+@pytest.mark.django_db
+def test_data_related_tps_rollups_disabled(tp0):
+    language = tp0.language
+    project = tp0.project
+    project.disabled = True
+    project.save()
+    tp_data = TPData.objects.exclude(tp__project__disabled=True)
+    _test_related_tps_data(
+        language.directory,
+        tp_data.filter(tp__language=language))
+    _test_related_tps_data(
+        Directory.objects.projects,
+        tp_data.exclude(tp__language__code="templates"))
+    project.disabled = False
+    project.save()
+    tp_data = TPData.objects.exclude(tp__project__disabled=True)
+    _test_related_tps_data(
+        language.directory,
+        tp_data.filter(tp__language=language))
+
+
+@pytest.mark.django_db
+def test_data_related_tps_rollups_delete(tp0):
+    language = tp0.language
+    project = tp0.project
+    tp0.delete()
+    _test_related_tps_data(
+        language.directory,
+        TPData.objects.filter(tp__language=language).exclude(
+            tp__project__disabled=True))
+    _test_related_tps_data(
+        project.directory,
+        TPData.objects.filter(tp__project=project).exclude(
+            tp__language__code="templates"))
+
+
+@pytest.mark.django_db
+def test_data_related_tps_rollups_migration(language0, project0):
+    migration = import_module(
+        "pootle_data.migrations.0014_populate_related_directory_data")
+    projects = Directory.objects.projects
+    DirectoryData.objects.filter(
+        directory__in=[
+            language0.directory, project0.directory, projects]).delete()
+    migration.populate_related_directory_data(apps, None)
+    tp_data = TPData.objects.exclude(tp__project__disabled=True)
+    _test_related_tps_data(
+        language0.directory,
+        tp_data.filter(tp__language=language0),
+        info=False)
+    _test_related_tps_data(
+        project0.directory,
+        TPData.objects.filter(tp__project=project0).exclude(
+            tp__language__code="templates"),
+        info=False)
+    _test_related_tps_data(
+        projects,
+        tp_data.exclude(tp__language__code="templates"),
+        info=False)
+    # the info is added on the next update
+    RelatedTPsDirectoryDataUpdater(
+        languages=[language0], projects=[project0]).update()
+    _test_related_tps_data(
+        projects,
+        tp_data.exclude(tp__language__code="templates"))
+
+
+@pytest.mark.django_db
+def test_data_related_tps_rollups_unchanged(tp0):
+    language = tp0.language
+    DirectoryData.objects.filter(directory=language.directory).delete()
+    # the related rollups are updated even if the TPData is unchanged
+    update_data.send(tp0.__class__, instance=tp0)
+    _test_related_tps_data(
+        language.directory,
+        TPData.objects.filter(tp__language=language).exclude(
+            tp__project__disabled=True))
+
+
+@pytest.mark.django_db
+def test_data_related_tps_rollups_missing(tp0, project_set):
+    language = tp0.language
+    project = tp0.project
+    language_stats = language.data_tool.get_stats()["children"]
+    project_set_stats = project_set.data_tool.get_stats()["children"]
+    DirectoryData.objects.filter(
+        directory__in=[tp0.directory, project.directory]).delete()
+    # children that have no rollup are aggregated from their TPData
+    for directory in [language.directory, Directory.objects.projects]:
+        revision.get(Directory)(directory).set(keys=["stats"], value="X")
+    language = Language.objects.get(pk=language.pk)
+    assert language.data_tool.get_stats()["children"] == language_stats
+    project_set = ProjectSet(Project.objects.exclude(disabled=True))
+    assert project_set.data_tool.get_stats()["children"] == project_set_stats
+
+
+@pytest.mark.django_db
+def test_data_related_tps_rollups_batch(tp0, member, monkeypatch):
+    from pootle_data.contextmanagers import batch_related_data
+
+    updates = []
+    _update = RelatedTPsDirectoryDataUpdater.update
+
+    def _counted_update(self, *args, **kwargs):
+        updates.append((set(self.languages), set(self.projects)))
+        return _update(self, *args, **kwargs)
+
+    monkeypatch.setattr(
+        RelatedTPsDirectoryDataUpdater, "update", _counted_update)
+    units = tp0.stores.first().units.filter(state=TRANSLATED)[:2]
+    with batch_related_data():
+        for unit in units:
+            unit.state = FUZZY
+            unit.save(user=member)
+    # the languages and projects are rolled up once, on exit
+    assert updates == [(set([tp0.language]), set([tp0.project]))]
+    tp_data = TPData.objects.exclude(tp__project__disabled=True)
+    _test_related_tps_data(
+        tp0.language.directory,
+        tp_data.filter(tp__language=tp0.language))
+    _test_related_tps_data(
+        Directory.objects.projects,
+        tp_data.exclude(tp__language__code="templates"))
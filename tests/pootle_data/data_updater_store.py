@@ -14,7 +14,9 @@ from pytest_pootle.factories import StoreDBFactory
 
 from translate.filters.decorators import Category
 
+from django.db import connection
 from django.db.models import Max
+from django.test.utils import CaptureQueriesContext
 
 from pootle.core.delegate import crud, review
 from pootle.core.signals import update_checks, update_data
@@ -396,3 +398,31 @@ def test_data_store_updater_defaults(tp0):
             assert (
                 aggregate_data[k]
                 == store.data_tool.updater.aggregate_defaults[k])
+
+
+@pytest.mark.django_db
+def test_data_store_set_check_data(store0):
+    existing = list(
+        store0.check_data.order_by("pk").values("category", "name", "count"))
+    assert len(existing) > 2
+    unchanged, changed = existing[:2]
+    checks = [
+        unchanged,
+        dict(changed, count=changed["count"] + 7),
+        dict(category=Category.CRITICAL, name="new_check", count=3)]
+    updater = store0.data_tool.updater
+    with CaptureQueriesContext(connection) as queries:
+        updater.set_check_data(dict(checks=checks))
+    # a single statement for each of delete, update and insert
+    statements = [
+        query["sql"].split()[0]
+        for query
+        in queries.captured_queries]
+    assert statements.count("DELETE") == 1
+    assert statements.count("UPDATE") == 1
+    assert statements.count("INSERT") == 1
+    assert (
+        sorted(store0.check_data.values_list("category", "name", "count"))
+        == sorted(
+            (check["category"], check["name"], check["count"])
+            for check in checks))
@@ -296,3 +296,26 @@ def test_form_language_suggestions_reject_comment(language0, tp0, admin,
     for suggestion in form.suggestions_to_save:
         assert ("#%s" % suggestion.id) in mailoutbox[0].body
     assert "reject" in mailoutbox[0].subject.lower()
+
+
+@pytest.mark.django_db
+def test_form_language_suggestions_count(language0, tp0, admin):
+    form = LanguageSuggestionAdminForm(
+        language=language0,
+        user=admin,
+        data=dict(page_no=1, results_per_page=10))
+    assert form.is_valid()
+    assert (
+        form.count_choices(form.fields["suggestions"].queryset)
+        == form.language_team.suggestion_count
+        == form.suggestions_qs.count())
+    assert form.batch().paginator.count == form.suggestions_qs.count()
+    form = LanguageSuggestionAdminForm(
+        language=language0,
+        user=admin,
+        data=dict(page_no=1, results_per_page=10, filter_tp=tp0.id))
+    assert form.is_valid()
+    assert (
+        form.batch().paginator.count
+        == form.suggestions_qs.filter(
+            unit__store__translation_project=tp0).count())
@@ -9,12 +9,14 @@
 import pytest
 
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
-from pootle.core.delegate import language_team
+from pootle.core.delegate import language_team, review
 from pootle_language.models import Language
 from pootle_language.teams import LanguageTeam
 from pootle_store.constants import OBSOLETE
-from pootle_store.models import Suggestion
+from pootle_store.models import Suggestion, Unit
 
 
 @pytest.mark.django_db
@@ -172,3 +174,59 @@ def test_language_team_suggestions(language0):
             team.suggestions.values_list(
                 "user__username",
                 "user__full_name")))
+
+
+@pytest.mark.django_db
+def test_language_team_roster(language0, member, member2):
+    team = language_team.get(Language)(language0)
+    team.add_member(member, "reviewer")
+    assert (
+        team.roster[member.id]
+        == set(["suggest", "translate", "review"]))
+
+    # the roster is shared by other instances of the team
+    with CaptureQueriesContext(connection) as queries:
+        roster = language_team.get(Language)(language0).roster
+    assert roster == team.roster
+    assert not [
+        query for query in queries.captured_queries
+        if "pootle_app_permissionset" in query["sql"]]
+
+    # changing permission sets directly expires the roster
+    permission_set = team.get_permission_set(member)
+    permission_set.positive_permissions.remove(
+        *team.get_permissions_for_role("admin").filter(codename="review"))
+    team = language_team.get(Language)(language0)
+    assert team.roster[member.id] == set(["suggest", "translate"])
+    assert list(team.submitters) == [member]
+    team.add_member(member2, "member")
+    assert list(team.members) == [member2]
+    team.remove_member(member)
+    assert member.id not in team.roster
+    assert member.id not in language_team.get(Language)(language0).roster
+
+
+@pytest.mark.django_db
+def test_language_team_suggestion_queue(language0, member2):
+    team = language_team.get(Language)(language0)
+    suggestions = team.suggestions
+    assert team.suggestion_count == suggestions.count()
+    assert team.get_suggestions() == list(suggestions[:10])
+    assert team.get_suggestions(offset=3, limit=5) == list(suggestions[3:8])
+    users = team.users_with_suggestions
+    assert users == set(
+        suggestions.values_list("user__username", "user__full_name"))
+
+    unit = Unit.objects.filter(
+        store__translation_project__language=language0,
+        store__translation_project__project__disabled=False,
+        store__obsolete=False,
+        state__gt=OBSOLETE).first()
+    review.get(Suggestion)().add(
+        unit, "A new suggestion", user=member2)
+    team = language_team.get(Language)(language0)
+    assert team.suggestion_count == suggestions.count()
+    assert team.get_suggestions(limit=1)[0].target == "A new suggestion"
+    assert (
+        team.users_with_suggestions
+        == users | set([(member2.username, member2.full_name)]))
@@ -18,7 +18,7 @@ from pytest_pootle.utils import create_store
 from pootle.core.delegate import (comparable_event, grouped_events,
                                   lifecycle, log, review)
 from pootle_log.utils import (ComparableLogEvent, GroupedEvents, Log,
-                              LogEvent, StoreLog, UnitLog)
+                              LogEvent, StoreLog, UnitLog, merge_events)
 from pootle_statistics.models import (
     Submission, SubmissionFields, SubmissionTypes)
 from pootle_store.constants import TRANSLATED, UNTRANSLATED
@@ -577,6 +577,60 @@ def test_log_get_events(site_users, store0):
             for x in expected])
 
 
+@pytest.mark.django_db
+def test_log_get_sorted_events(member, tp0):
+    event_log = Log()
+    kwargs = dict(users=[member.id], tp=tp0)
+    expected = [
+        (ev.action, ev.value.pk)
+        for ev in sorted(
+            event_log.get_events(**kwargs),
+            key=(lambda ev: ev.sort_key))]
+    assert expected
+    result = [
+        (ev.action, ev.value.pk)
+        for ev in event_log.get_sorted_events(**kwargs)]
+    assert result == expected
+    result = [
+        (ev.action, ev.value.pk)
+        for ev in event_log.get_sorted_events(reverse=True, **kwargs)]
+    assert result == list(reversed(expected))
+    result = [
+        (ev.action, ev.value.pk)
+        for ev in event_log.get_sorted_events(offset=3, limit=5, **kwargs)]
+    assert result == expected[3:8]
+    result = [
+        (ev.action, ev.value.pk)
+        for ev in event_log.get_sorted_events(
+            event_sources=("suggestion", ), **kwargs)]
+    assert result == [
+        ev for ev in expected
+        if ev[0].startswith("suggestion_")]
+
+
+def test_log_merge_events():
+
+    class DummyEvent(object):
+
+        def __init__(self, sort_key):
+            self.sort_key = sort_key
+
+    streams = [
+        [DummyEvent((1, 0)), DummyEvent((4, 0)), DummyEvent((4, 1))],
+        [],
+        [DummyEvent((2, 0)), DummyEvent((3, 0)), DummyEvent((5, 0))]]
+    assert (
+        [ev.sort_key for ev in merge_events(streams)]
+        == [(1, 0), (2, 0), (3, 0), (4, 0), (4, 1), (5, 0)])
+    assert (
+        [ev.sort_key
+         for ev
+         in merge_events(
+             [reversed(stream) for stream in streams],
+             reverse=True)]
+        == [(5, 0), (4, 1), (4, 0), (3, 0), (2, 0), (1, 0)])
+
+
 @pytest.mark.django_db
 def test_log_store(store0):
     store_log = log.get(store0.__class__)(store0)
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import pytest
+
+from pootle.core.delegate import revision
+from pootle.core.signals import update_revisions
+from pootle_app.models import Directory
+from pootle_revision.contextmanagers import batch_revisions
+from pootle_revision.models import Revision
+from pootle_revision.utils import RevisionBatch
+from pootle_store.models import Store
+
+
+def _get_revisions(directories, keys):
+    revisions = revision.get(Directory)
+    return {
+        (directory.pootle_path, key): revisions(directory).get(key=key)
+        for directory in directories
+        for key in keys}
+
+
+@pytest.mark.django_db
+def test_revision_batch_add(store0, subdir0):
+    batch = RevisionBatch()
+    assert not batch
+    batch.add(Store, instance=store0, keys=["foo", "bar"])
+    batch.add(Directory, instance=subdir0, keys=["bar"])
+    tp_path = store0.translation_project.pootle_path
+    store_parents = set(
+        ["/projects/",
+         "/projects/%s/" % store0.translation_project.project.code,
+         "/%s/" % store0.translation_project.language.code,
+         tp_path])
+    assert batch.paths["foo"] == store_parents
+    assert batch.paths["bar"] == store_parents | set([subdir0.pootle_path])
+    other = RevisionBatch()
+    other.add(Directory, instance=subdir0, keys=["baz"])
+    batch.merge(other)
+    assert batch.paths["baz"] == other.paths["baz"]
+
+
+@pytest.mark.django_db
+def test_revision_batch_flush(store0, subdir0):
+    directories = [store0.parent, subdir0, subdir0.parent]
+    keys = ["foo", "bar"]
+    assert not any(_get_revisions(directories, keys).values())
+    with batch_revisions():
+        update_revisions.send(Store, instance=store0, keys=["foo"])
+        update_revisions.send(Directory, instance=subdir0, keys=keys)
+
+        # nothing is written until the context exits
+        assert not any(_get_revisions(directories, keys).values())
+        assert not Revision.objects.filter(key__in=keys).exists()
+
+    revisions = _get_revisions(directories, keys)
+    assert all(revisions.values())
+
+    # a single new revision is set for the batch
+    assert len(set(revisions.values())) == 1
+    assert (
+        Revision.objects.filter(key="foo").count()
+        == len(set(Revision.objects.filter(
+            key="foo").values_list("object_id", flat=True))))
+
+
+@pytest.mark.django_db
+def test_revision_batch_nested(store0, subdir0):
+    with batch_revisions() as outer:
+        with batch_revisions():
+            update_revisions.send(Directory, instance=subdir0, keys=["foo"])
+        assert subdir0.pootle_path in outer.paths["foo"]
+        assert not revision.get(Directory)(subdir0).get(key="foo")
+    assert revision.get(Directory)(subdir0).get(key="foo")
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from pootle.core.delegate import revision, revision_updater
+from pootle_app.models import Directory
+from pootle_revision.utils import RevisionCache, revision_cache
+
+
+def test_revision_cache_parent_paths():
+    cache = RevisionCache()
+    assert cache.get_parent_paths("/") == ["/"]
+    assert (
+        cache.get_parent_paths("/language0/project0/subdir0/")
+        == ["/",
+            "/language0/",
+            "/language0/project0/",
+            "/language0/project0/subdir0/"])
+
+
+@pytest.mark.django_db
+def test_revision_cache_get(subdir0):
+    revisions = revision.get(Directory)
+    revision_updater.get(Directory)(subdir0).update(keys=["stats", "checks"])
+    tp_dir = subdir0.parent
+    expected = dict(
+        subdir=revisions(subdir0).get(key="stats"),
+        subdir_checks=revisions(subdir0).get(key="checks"),
+        tp=revisions(tp_dir).get(key="stats"),
+        lang=revisions(tp_dir.parent).get(key="stats"))
+    assert all(expected.values())
+    revision_cache.activate()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            assert revisions(subdir0).get(key="stats") == expected["subdir"]
+        assert len(queries) == 2
+        with CaptureQueriesContext(connection) as queries:
+            assert (
+                revisions(subdir0).get(key="checks")
+                == expected["subdir_checks"])
+            assert revisions(tp_dir).get(key="stats") == expected["tp"]
+            assert revisions(tp_dir.parent).get(key="stats") == expected["lang"]
+            assert revisions(subdir0).get(key="foo") == ""
+        assert len(queries) == 0
+
+        # updating revisions invalidates the cache
+        revision_updater.get(Directory)(subdir0).update(keys=["stats"])
+        assert revisions(subdir0).get(key="stats") != expected["subdir"]
+        assert revisions(tp_dir).get(key="stats") != expected["tp"]
+    finally:
+        revision_cache.deactivate()
+    assert not revision_cache.active
+    assert revision_cache.revisions == {}
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from pootle_app.models.permissions import check_user_permission
+from pootle_store.unit.bundle import UnitEditBundle
+from pootle_store.util import find_altsrcs
+
+
+@pytest.mark.django_db
+def test_unit_edit_bundle(get_edit_unit, language0, member):
+    units = list(get_edit_unit.store.units[:5])
+    tp = get_edit_unit.store.translation_project
+    bundle = UnitEditBundle(
+        units, member, alt_src_langs={tp.id: [language0]})
+    with CaptureQueriesContext(connection) as queries:
+        bundle.alt_srcs
+        bundle.checks
+        bundle.latest_target_submissions
+        bundle.suggestions
+    # one query for each kind of related data
+    assert len(queries) == 4
+    for unit in units:
+        assert (
+            bundle.checks.get(unit.id, [])
+            == list(unit.get_qualitychecks()))
+        assert (
+            bundle.suggestions.get(unit.id, [])
+            == list(unit.get_suggestions()))
+        assert (
+            bundle.latest_target_submissions.get(unit.id)
+            == unit.get_latest_target_submission())
+        assert (
+            [x.data for x in bundle.alt_srcs[unit.id]]
+            == [x.data for x in find_altsrcs(unit, [language0])])
+    directory = get_edit_unit.store.parent
+    permissions = bundle.get_permissions(directory)
+    for codename in bundle.permission_codenames:
+        assert (
+            permissions[codename]
+            == check_user_permission(member, codename, directory))
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import os
+
+from translate.storage import factory
+
+from pootle_store.store.pool import ParsePool
+
+
+PO_FILE = """
+msgid "foo"
+msgstr "%s"
+"""
+
+
+def _write_po(tmpdir, name, target="bar"):
+    path = os.path.join(str(tmpdir), name)
+    with open(path, "w") as f:
+        f.write(PO_FILE % target)
+    return path
+
+
+def test_parse_pool(tmpdir):
+    pool = ParsePool(size=10)
+    path = _write_po(tmpdir, "foo.po")
+    parsed = pool.parse(path, factory.getobject)
+    assert parsed.units[0].target == "bar"
+    assert pool.parse(path, factory.getobject) is parsed
+    assert pool.stats == dict(files=1, hits=1, misses=1, hit_rate=0.5)
+
+    # another parser is pooled separately
+    assert (
+        pool.parse(path, factory.getobject, parser_key="other")
+        is not parsed)
+
+    # changing the file invalidates the pooled file
+    _write_po(tmpdir, "foo.po", target="changed")
+    reparsed = pool.parse(path, factory.getobject)
+    assert reparsed is not parsed
+    assert reparsed.units[0].target == "changed"
+    assert pool.misses == 3
+    pool.clear()
+    assert not len(pool)
+    assert pool.stats == dict(files=0, hits=0, misses=0, hit_rate=0.0)
+
+
+def test_parse_pool_cull(tmpdir, settings):
+    settings.PARSE_POOL_SIZE = 4
+    settings.PARSE_POOL_CULL_FREQUENCY = 2
+    pool = ParsePool()
+    paths = [
+        _write_po(tmpdir, "foo%s.po" % i)
+        for i in range(5)]
+    for path in paths[:4]:
+        pool.parse(path, factory.getobject)
+    assert len(pool) == 4
+    # touch the first file so it is kept
+    pool.parse(paths[0], factory.getobject)
+    pool.parse(paths[4], factory.getobject)
+    assert len(pool) == 3
+    assert (
+        sorted(key[0] for key in pool.files)
+        == sorted([paths[0], paths[3], paths[4]]))
+
+
+def test_parse_pool_disabled(tmpdir):
+    pool = ParsePool(size=0)
+    path = _write_po(tmpdir, "foo.po")
+    assert (
+        pool.parse(path, factory.getobject)
+        is not pool.parse(path, factory.getobject))
+    assert not len(pool)
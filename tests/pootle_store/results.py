@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import pytest
+
+from pootle_store.constants import FUZZY
+from pootle_store.models import Unit
+from pootle_store.templatetags.store_tags import (
+    pluralize_source, pluralize_target)
+from pootle_store.unit import results
+from pootle_store.unit.results import GroupedResults, UnitResult
+
+
+def _unit_data(unit):
+    # serializes a unit without any per-store memoisation
+    unit = UnitResult(unit)
+    return {
+        'id': unit.id,
+        'url': unit.translate_url,
+        'isfuzzy': unit.state == FUZZY,
+        'source': [source[1] for source in pluralize_source(unit)],
+        'target': [target[1]
+                   for target
+                   in pluralize_target(unit, unit.nplurals)]}
+
+
+def _unit_results(uids):
+    units = {
+        unit["id"]: unit
+        for unit
+        in Unit.objects.filter(pk__in=uids).values(
+            *GroupedResults.select_fields)}
+    return [_unit_data(units[uid]) for uid in uids]
+
+
+@pytest.mark.django_db
+def test_grouped_results(monkeypatch):
+    uids = list(Unit.objects.values_list("id", flat=True)[:200])
+    calls = []
+    reverse = results.reverse
+
+    def _reverse(*args, **kwargs):
+        calls.append(args)
+        return reverse(*args, **kwargs)
+
+    monkeypatch.setattr(results, "reverse", _reverse)
+    data = GroupedResults(uids).data
+    # urls are resolved once for each store
+    assert len(calls) == len(data)
+    monkeypatch.undo()
+    units = [
+        unit
+        for group in data
+        for store_data in group.values()
+        for unit in store_data["units"]]
+    assert units == _unit_results(uids)
+
+
+@pytest.mark.django_db
+def test_store_results(store0, monkeypatch):
+    units = list(
+        store0.units.values(*GroupedResults.select_fields))
+    calls = []
+    reverse = results.reverse
+
+    def _reverse(*args, **kwargs):
+        calls.append(args)
+        return reverse(*args, **kwargs)
+
+    monkeypatch.setattr(results, "reverse", _reverse)
+    data = results.StoreResults(units).data
+    # the url is resolved once for the store rather than for each unit
+    assert len(calls) == 1
+    monkeypatch.undo()
+    assert data["units"] == [_unit_data(unit) for unit in units]
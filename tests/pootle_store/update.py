@@ -7,11 +7,17 @@
 # AUTHORS file for copyright and authorship information.
 
 import logging
+from collections import Counter
+
 import pytest
 
+from pytest_pootle.benchmark import generate_store
+from pytest_pootle.factories import StoreDBFactory
 from pytest_pootle.utils import create_store
 
+from pootle_store import getters
 from pootle_store.constants import POOTLE_WINS, SOURCE_WINS
+from pootle_store.utils import UnitWordcount
 
 
 @pytest.mark.django_db
@@ -119,3 +125,32 @@ def test_store_update_conflict_pootle_wins(store0, caplog):
     assert unit0.target == "bar0"
     assert unit1.target == "foo1"
     assert unit2.target == "baz2"
+
+
+@pytest.mark.django_db
+def test_store_update_wordcount_chunks(tp0, monkeypatch):
+    counted = []
+
+    def _counter(string):
+        counted.append(string)
+        return len(string.split())
+
+    wordcounter = UnitWordcount(_counter, cache_size=10)
+    monkeypatch.setattr(getters, "wordcounter", wordcounter)
+    store = StoreDBFactory(
+        translation_project=tp0,
+        parent=tp0.directory,
+        name="wordcount_chunks.po")
+    file_store = generate_store(25)
+    store.update(store=file_store, resolve_conflict=POOTLE_WINS)
+    assert store.units.count() == 25
+    strings = set()
+    for unit in store.units:
+        strings.update(unit.source_f.strings)
+        if unit.target_f:
+            strings.update(unit.target_f.strings)
+    assert len(strings) > wordcounter.cache_size
+    # new units are counted in chunks that fit in the cache, so that each
+    # string is only counted once
+    assert set(counted) == strings
+    assert set(Counter(counted).values()) == set([1])
@@ -21,7 +21,7 @@ from pootle_statistics.models import (
     MUTED, UNMUTED, Submission, SubmissionFields, SubmissionTypes)
 from pootle_store.constants import FUZZY, TRANSLATED
 from pootle_store.models import QualityCheck, Unit, UnitChange
-from pootle_store.utils import UnitLifecycle
+from pootle_store.utils import UnitLifecycle, UnitWordcount
 
 
 @pytest.mark.django_db
@@ -437,3 +437,30 @@ def test_mute_qualitycheck(store_po, member):
 
     sub = unit.submission_set.get(quality_check__id=check_id)
     assert sub.submitter == member
+
+
+def test_unit_wordcount_cache():
+    counted = []
+
+    def _counter(string):
+        counted.append(string)
+        return len(string.split())
+
+    wc = UnitWordcount(_counter, cache_size=3)
+    assert wc.count(u"foo bar") == 2
+    assert wc.count(u"foo bar") == 2
+    assert counted == [u"foo bar"]
+    assert (
+        wc.count_many([u"foo", u"foo bar", u"foo", u"baz qux quux"])
+        == [1, 2, 1, 3])
+    # each uncached string is counted once
+    assert counted == [u"foo bar", u"foo", u"baz qux quux"]
+    assert wc.count_words(multistring([u"foo", u"foo bar"]).strings) == 3
+    assert len(counted) == 3
+
+    # the least recently counted string is dropped when the cache is full
+    wc.count(u"one more")
+    assert len(wc.cache) == 3
+    assert wc.get_key(u"baz qux quux") not in wc.cache
+    wc.count(u"baz qux quux")
+    assert counted[-1] == u"baz qux quux"
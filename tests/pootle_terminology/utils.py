@@ -12,7 +12,7 @@ import pytest
 
 from pootle.core.delegate import (
     stemmer, stopwords, terminology, terminology_matcher)
-from pootle_terminology.utils import UnitTerminology
+from pootle_terminology.utils import TerminologyIndex, UnitTerminology
 
 
 @pytest.mark.django_db
@@ -121,3 +121,44 @@ def test_terminology_matcher(store0, terminology0):
     assert (
         matcher.matches
         == matcher.similar(results))
+
+
+@pytest.mark.django_db
+def test_terminology_index(store0, terminology0):
+
+    for store in terminology0.stores.all():
+        for unit in store.units.all():
+            terminology.get(unit.__class__)(unit).stem()
+
+    unit = store0.units.first()
+    matcher = terminology_matcher.get(unit.__class__)(unit)
+    index = matcher.index
+    assert isinstance(index, TerminologyIndex)
+    assert index.language_id == matcher.language_id
+    assert index.revision == matcher.rev_cache_key
+    assert index.cache_key == "%s.%s" % (
+        matcher.language_id, matcher.rev_cache_key)
+    term_units = index.terminology_units.filter(stems__isnull=False)
+    assert index.index["terms"]
+    assert (
+        sorted(index.index["terms"].keys())
+        == sorted(set(term_units.values_list("id", flat=True))))
+    for term_unit in term_units.distinct():
+        source, target, tokens, stems = index.index["terms"][term_unit.id]
+        assert source == term_unit.source_f
+        assert target == term_unit.target_f
+        assert (
+            stems
+            == set(term_unit.stems.values_list("root", flat=True)))
+        for stem in stems:
+            assert term_unit.id in index.index["stems"][stem]
+    terms = list(index.get_terms(matcher.stems))
+    assert (
+        [term[0] for term in terms]
+        == sorted(
+            term_units.filter(
+                stems__root__in=matcher.stems).distinct().values_list(
+                    "id", flat=True)))
+    for unit_id, source, target, comparison in terms:
+        assert comparison.text == source
+        assert comparison.stems == index.index["terms"][unit_id][3]
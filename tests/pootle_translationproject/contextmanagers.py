@@ -360,3 +360,29 @@ def test_contextmanager_update_tp_after_suggestion(tp0, store0, member,
     with update_unit_test(SuggestionRejectTest(unit)):
         with update_tp_after(tp0):
             sugg_review(suggestions=[sugg1], reviewer=member).reject()
+
+
+@pytest.mark.django_db
+def test_contextmanager_update_tp_after_tp_receivers(tp0, monkeypatch):
+    import gc
+
+    from pootle.core.signals import update_data, update_scores
+    from pootle_translationproject import contextmanagers
+
+    def _handle_update_stores(sender, updated):
+        # receivers are not dropped if garbage is collected during the update
+        gc.collect()
+        update_data.send(sender.__class__, instance=sender)
+        update_scores.send(sender.__class__, instance=sender)
+
+    receivers = (len(update_data.receivers), len(update_scores.receivers))
+    monkeypatch.setattr(
+        contextmanagers, "_handle_update_stores", _handle_update_stores)
+    updated = contextmanagers.Updated()
+    contextmanagers._update_stores(tp0, updated)
+    assert updated.tp_data is True
+    assert updated.tp_scores is True
+    # and are not left connected afterwards
+    assert (
+        (len(update_data.receivers), len(update_scores.receivers))
+        == receivers)
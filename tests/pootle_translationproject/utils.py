@@ -16,7 +16,7 @@ from translate.filters.decorators import Category
 from translate.misc.multistring import multistring
 
 from pootle.core.plugin import getter
-from pootle.core.delegate import paths, tp_tool
+from pootle.core.delegate import paths, revision, tp_tool
 from pootle.core.url_helpers import split_pootle_path
 from pootle_app.models import Directory
 from pootle_language.models import Language
@@ -37,6 +37,28 @@ def test_paths_tp_util(tp0):
                 "pk", flat=True)))
 
 
+@pytest.mark.django_db
+def test_paths_tp_util_shared_revision(tp0, project0):
+    tp1 = project0.translationproject_set.exclude(pk=tp0.pk).first()
+    tp1_stores = set(
+        tp1.stores.exclude(obsolete=True).values_list("tp_path", flat=True))
+    assert tp1_stores != set(
+        tp0.stores.exclude(obsolete=True).values_list("tp_path", flat=True))
+
+    # TPs can share a revision, eg when revisions are updated in a batch
+    for tp in [tp0, tp1]:
+        revision.get(Directory)(tp.directory).set(
+            keys=["stats"], value="shared")
+    assert (
+        paths.get(tp0.__class__)(tp0, "").rev_cache_key
+        == paths.get(tp1.__class__)(tp1, "").rev_cache_key
+        == "shared")
+    assert paths.get(tp0.__class__)(tp0, "").index
+    assert (
+        set(paths.get(tp1.__class__)(tp1, "").index)
+        == tp1_stores)
+
+
 @pytest.mark.django_db
 def test_tp_tool_move(language0, project0, templates, no_templates_tps):
     tp = project0.translationproject_set.get(language=language0)
@@ -21,7 +21,14 @@ from pootle_word.utils import TextComparison
 
 
 def test_stemmer():
-    assert stemmer.get() is stem
+    site_stemmer = stemmer.get()
+    assert site_stemmer is stemmer.get()
+    site_stemmer.cache_clear()
+    assert site_stemmer("cycling") == stem("cycling")
+    assert site_stemmer("cycling") == stem("cycling")
+    cache_info = site_stemmer.cache_info()
+    assert cache_info.hits == 1
+    assert cache_info.misses == 1
 
 
 def test_stopwords():
@@ -52,6 +59,11 @@ def test_text_comparer():
         in comparer.split(comparer.text.lower())
         if word not in comparer.stopwords]
     assert comparer.stems == set(comparer.stemmer(t) for t in comparer.tokens)
+    assert comparer.token_set == set(comparer.tokens)
+
+    # tokens and stems are only calculated once
+    assert comparer.tokens is comparer.tokens
+    assert comparer.stems is comparer.stems
     other_text = "cycle home"
     other = text_comparison.get()(other_text)
     assert (
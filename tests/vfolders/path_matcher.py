@@ -169,3 +169,63 @@ def test_vfolder_path_matcher_rules(vfolder0):
     assert (
         list(vfolder0.path_matcher.rules)
         == ["foo", "bar"])
+
+
+@pytest.mark.pootle_vfolders
+@pytest.mark.django_db
+def test_vfolder_path_matcher_rules_regex(vfolder0, tp0):
+    vfolder0.filter_rules = "store0.po, subdir0/*"
+    path_matcher = vfolder0.path_matcher
+    assert (
+        path_matcher.rules_regex
+        == ("^%s(%s|%s)"
+            % (path_matcher.tp_path,
+               PathFilter().path_regex("store0.po"),
+               PathFilter().path_regex("subdir0/*"))))
+    vfolder0.languages.add(tp0.language)
+    vfolder0.projects.add(tp0.project)
+    matching = set(
+        tp0.stores.filter(
+            pootle_path__regex=path_matcher.rules_regex).values_list(
+                "pk", flat=True))
+    assert matching
+    assert path_matcher.matching_store_ids == matching
+    assert (
+        set(path_matcher.matching_stores.values_list("pk", flat=True))
+        == matching)
+
+
+@pytest.mark.pootle_vfolders
+@pytest.mark.django_db
+def test_vfolder_path_matcher_update_stores(tp0):
+    VirtualFolder.objects.all().delete()
+    vf0 = VirtualFolder.objects.create(
+        name="vf0",
+        priority=5,
+        filter_rules="store0.po,subdir0/store4.po")
+    vf1 = VirtualFolder.objects.create(
+        name="vf1",
+        priority=3,
+        filter_rules="store0.po")
+    for vf in [vf0, vf1]:
+        vf.languages.add(tp0.language)
+        vf.projects.add(tp0.project)
+        vf.save()
+    store0 = tp0.stores.get(name="store0.po")
+    store4 = tp0.stores.get(name="store4.po")
+    assert (
+        vf0.path_matcher.existing_store_ids
+        == set([store0.pk, store4.pk]))
+    assert (
+        list(Store.objects.filter(
+            pk__in=[store0.pk, store4.pk]).values_list("priority", flat=True))
+        == [5, 5])
+    vf0.filter_rules = "store1.po"
+    vf0.save()
+    store1 = tp0.stores.get(name="store1.po")
+    assert vf0.path_matcher.existing_store_ids == set([store1.pk])
+    assert Store.objects.get(pk=store0.pk).priority == 3
+    assert Store.objects.get(pk=store1.pk).priority == 5
+    assert Store.objects.get(pk=store4.pk).priority == 1
+    vf1.delete()
+    assert Store.objects.get(pk=store0.pk).priority == 1
@@ -98,3 +98,20 @@ def test_get_edit_unit(project0_nongnu, get_edit_unit, client,
         for check
         in list(unit.get_warning_qualitychecks()))
     assert response.context["failing_checks"] == failing_checks
+    assert "tm_suggestions" not in result
+
+
+@pytest.mark.django_db
+def test_get_unit_tm(get_edit_unit, client, request_users):
+    user = request_users["user"]
+    if user.username != "nobody":
+        client.login(
+            username=user.username,
+            password=request_users["password"])
+    unit = get_edit_unit
+    response = client.get(
+        "/xhr/units/%s/tm/" % unit.id,
+        HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+    result = json.loads(response.content)
+    assert result["uid"] == unit.id
+    assert result["tm_suggestions"] == unit.get_tm_suggestions()
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import json
+import re
+
+import pytest
+
+from pootle_store.models import Unit
+
+
+def _strip_timesince(editor):
+    return re.sub(r">[^<]*</time>", "></time>", editor)
+
+
+def _get_edit_units(client, uids):
+    return client.get(
+        "/xhr/units/edit/",
+        dict(uids=",".join(str(uid) for uid in uids)),
+        HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+
+
+@pytest.mark.django_db
+def test_get_edit_units(get_edit_unit, client, request_users):
+    user = request_users["user"]
+    if user.username != "nobody":
+        client.login(
+            username=user.username,
+            password=request_users["password"])
+    units = list(
+        Unit.objects.get_translatable(user).filter(
+            store=get_edit_unit.store).order_by("-index")[:5])
+    uids = [unit.id for unit in units]
+    response = _get_edit_units(client, uids)
+    result = json.loads(response.content)
+    assert [unit["uid"] for unit in result["units"]] == uids
+
+    # the payload is the same as that of the single unit endpoint
+    for unit in result["units"]:
+        response = client.get(
+            "/xhr/units/%s/edit/" % unit["uid"],
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        expected = json.loads(response.content)
+        assert (
+            _strip_timesince(unit["editor"])
+            == _strip_timesince(expected["editor"]))
+        assert unit["sources"] == expected["sources"]
+        assert unit["is_obsolete"] == expected["is_obsolete"]
+
+
+@pytest.mark.django_db
+def test_get_edit_units_bad(client, admin):
+    client.force_login(admin)
+    assert _get_edit_units(client, []).status_code == 400
+    response = client.get(
+        "/xhr/units/edit/",
+        dict(uids="1,foo"),
+        HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+    assert response.status_code == 400
+    # units that dont exist are ignored
+    result = json.loads(_get_edit_units(client, [-1]).content)
+    assert result["units"] == []